@@ -5,15 +5,39 @@
 # with your Spotify credentials or set SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET env vars.
 #
 # Run:
-#    pip install streamlit spotipy pandas
+#    pip install streamlit spotipy
 #    streamlit run app.py
 # ==============================================
 
+import inspect
 import os
+import time
+import uuid
+
 import streamlit as st
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import pandas as pd
+
+from beatbuddy import perf
+from beatbuddy.api import start_api_server
+from beatbuddy.cards import CARDS_PER_PAGE, cards_html, page_count
+from beatbuddy.client import get_shared_client
+from beatbuddy.library import export_saved, import_tracks
+from beatbuddy.mood import DEFAULT_MOOD, detect_mood_from_text
+from beatbuddy.recommend import recommend
+from beatbuddy.scheduler import RateLimited, spotify_scheduler
+from beatbuddy.search import (
+    LANGUAGES,
+    LATEST_SINCE,
+    iter_text_pages,
+    search_cache,
+    search_text_pool,
+    search_text_tracks,
+)
+from beatbuddy.sessions import get_sessions
+from beatbuddy.similar import get_similar_index
+from beatbuddy.store import get_user_store, saved_key
+from beatbuddy.thumbs import get_thumbnail_cache
+from beatbuddy.typeahead import get_prefix_index
+from beatbuddy.warmup import start_warmup, warmup_status
 
 # ------------------------------------------------
 # 🔐 STEP 1: SPOTIFY CREDENTIALS (env vars preferred)
@@ -25,6 +49,17 @@ CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET", "16d3a882fdf84aefac24c0e93fff
 # 🎨 STEP 2: SETUP STREAMLIT PAGE + STYLES
 # ------------------------------------------------
 st.set_page_config(page_title="BeatBuddy — Mood Recommender 🎵", page_icon="🎧", layout="wide")
+
+# st.session_state only holds this ID (plus widget values); the session's chat
+# and result handles live in its slot, swept once idle (beatbuddy.sessions).
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:12])
+session = get_sessions().touch(session_id, st.session_state.get("user"))
+
+# Per-rerun phase timing (BEATBUDDY_PERF=1); closed at the end of the script,
+# or by this session's next rerun if st.stop()/a rerun cuts it short.
+perf_record = None
+if perf.ENABLED:
+    perf_record = perf.begin_rerun(session_id)
 st.markdown(
     """
     <style>
@@ -53,6 +88,9 @@ st.markdown(
     .small-muted { color: #6b7280; font-size:0.92em }
     .chat-container { display:flex; flex-direction:column; gap:10px; }
     .user-bubble { align-self: flex-end; background:#0ea5a9; color:white; padding:10px 14px; border-radius:14px; max-width:75%; }
+    .track-card { display:flex; gap:12px; align-items:center; }
+    .track-cover { border-radius:8px; object-fit:cover; background:#e5e7eb; flex-shrink:0; }
+    .track-title { font-size:1.25em; font-weight:700; }
     .bot-bubble { align-self: flex-start; background:#f3f4f6; color:#0f172a; padding:10px 14px; border-radius:14px; max-width:75%; }
     </style>
     <div class="app-header">
@@ -71,59 +109,62 @@ st.caption("English, Hindi & Punjabi Songs — Powered by Spotify API")
 DEFAULT_LANGUAGE = "English"
 DEFAULT_LATEST = True
 DEFAULT_NUM_RESULTS = 10
-DEFAULT_MOOD = "chill"
 
 # ------------------------------------------------
-# Spotify client helper (lazy, stored in session_state)
+# Spotify client helper (one shared, pooled client per process)
 # ------------------------------------------------
 def get_sp_client():
-    if st.session_state.get("sp_client"):
-        return st.session_state["sp_client"]
-
     if not CLIENT_ID or not CLIENT_SECRET:
         st.session_state["sp_error"] = "Missing Spotify credentials. Set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET (or edit the file)."
         return None
 
     try:
-        auth_manager = SpotifyClientCredentials(client_id=CLIENT_ID, client_secret=CLIENT_SECRET)
-        sp = spotipy.Spotify(auth_manager=auth_manager)
-        st.session_state["sp_client"] = sp
-        return sp
+        with perf.phase("spotify.auth"):
+            return get_shared_client(CLIENT_ID, CLIENT_SECRET)
     except Exception as e:
         st.session_state["sp_error"] = f"Spotify auth error: {e}"
         return None
 
+
+def busy_message(e: RateLimited) -> str:
+    return f"Spotify is busy right now, please try again in {e.retry_after:.0f}s."
+
 # ------------------------------------------------
-# Fetch songs from Spotify
+# Fetch songs: one cached candidate pool per (mood, language), filtered and ranked locally (beatbuddy.recommend)
 # ------------------------------------------------
 def fetch_songs(mood, language, latest, limit=10):
     sp = get_sp_client()
     if sp is None:
-        return pd.DataFrame()
+        return ()
+
+    try:
+        with perf.phase("search"):
+            tracks = recommend(sp, [mood], [language], latest, limit)
+        return tracks
+    except RateLimited as e:
+        st.session_state["sp_error"] = busy_message(e)
+        return ()
+    except Exception as e:
+        st.session_state["sp_error"] = f"Error fetching tracks: {e}"
+        return ()
+
 
-    query = f"{mood} {language} song"
-    if latest:
-        query += " year:2022-2025"
+def fetch_songs_blend(moods, languages, latest, limit=10):
+    """Fan-out recommendations: all (mood, language) queries run in parallel, merged into one list."""
+    sp = get_sp_client()
+    if sp is None:
+        return ()
 
     try:
-        results = sp.search(q=query, type="track", limit=limit, market="IN")
-        tracks = []
-        for item in results.get("tracks", {}).get("items", []):
-            album = item.get("album", {})
-            images = album.get("images") or []
-            track = {
-                "title": item.get("name"),
-                "artist": (item.get("artists") or [{}])[0].get("name"),
-                "album": album.get("name"),
-                "release_date": album.get("release_date"),
-                "url": item.get("external_urls", {}).get("spotify"),
-                "image": images[0].get("url") if images else None,
-            }
-            tracks.append(track)
-        return pd.DataFrame(tracks)
+        with perf.phase("search"):
+            tracks = recommend(sp, moods, languages, latest, limit)
+        return tracks
+    except RateLimited as e:
+        st.session_state["sp_error"] = busy_message(e)
+        return ()
     except Exception as e:
         st.session_state["sp_error"] = f"Error fetching tracks: {e}"
-        return pd.DataFrame()
+        return ()
 
 
 # ------------------------------------------------
@@ -132,125 +173,153 @@ def fetch_songs(mood, language, latest, limit=10):
 def search_songs(query: str, language: str, latest: bool, limit: int = 10):
     sp = get_sp_client()
     if sp is None:
-        return pd.DataFrame()
+        return ()
+
+    try:
+        with perf.phase("search"):
+            tracks = search_text_tracks(sp, query, language, latest, limit)
+        return tracks
+    except RateLimited as e:
+        st.session_state["sp_error"] = busy_message(e)
+        return ()
+    except Exception as e:
+        st.session_state["sp_error"] = f"Error searching tracks: {e}"
+        return ()
+
+
+def search_songs_pages(query: str, language: str, latest: bool, total: int = 200):
+    """Deep search: yield one list of tracks per page (deduped) as soon as it arrives."""
+    sp = get_sp_client()
+    if sp is None:
+        return
+
+    try:
+        for tracks in iter_text_pages(sp, query, language, latest, total):
+            yield tracks
+    except RateLimited as e:
+        st.session_state["sp_error"] = busy_message(e)
+    except Exception as e:
+        st.session_state["sp_error"] = f"Error searching tracks: {e}"
 
-    q = query.strip()
-    if language:
-        q = f"{q} language:{language}"
-    if latest:
-        q = f"{q} year:2022-2025"
+
+def search_songs_pool(query: str, language: str, latest: bool, total: int = 200):
+    """Deep search results in ranking order (pages come from the shared cache once fetched)."""
+    sp = get_sp_client()
+    if sp is None:
+        return ()
 
     try:
-        results = sp.search(q=q, type="track", limit=limit, market="IN")
-        tracks = []
-        for item in results.get("tracks", {}).get("items", []):
-            album = item.get("album", {})
-            images = album.get("images") or []
-            track = {
-                "title": item.get("name"),
-                "artist": (item.get("artists") or [{}])[0].get("name"),
-                "album": album.get("name"),
-                "release_date": album.get("release_date"),
-                "url": item.get("external_urls", {}).get("spotify"),
-                "image": images[0].get("url") if images else None,
-            }
-            tracks.append(track)
-        return pd.DataFrame(tracks)
+        with perf.phase("search"):
+            return search_text_pool(sp, query, language, latest, total)
+    except RateLimited as e:
+        st.session_state["sp_error"] = busy_message(e)
+        return ()
     except Exception as e:
         st.session_state["sp_error"] = f"Error searching tracks: {e}"
-        return pd.DataFrame()
+        return ()
+
+
+def resolve_search(handle):
+    """Tracks for a ``(query, language, latest, total, deep)`` search handle."""
+    query, language, latest, total, deep = handle
+    if deep:
+        return search_songs_pool(query, language, latest, total)
+    return search_songs(query, language, latest, total)
+
+
+def detect_mood(text: str) -> str:
+    with perf.phase("mood"):
+        return detect_mood_from_text(text)
 
 # ------------------------------------------------
-# Simple rule-based mood detector
+# Typeahead: suggestions from the local prefix index (beatbuddy.typeahead), never from Spotify
 # ------------------------------------------------
-def detect_mood_from_text(text: str) -> str:
-    if not text or not text.strip():
-        return DEFAULT_MOOD
-
-    t = text.lower()
-
-    # emoji hints
-    emoji_map = {
-        "😊": "happy",
-        "🙂": "happy",
-        "😄": "happy",
-        "😃": "happy",
-        "😂": "happy",
-        "😍": "romantic",
-        "❤️": "romantic",
-        "💖": "romantic",
-        "😢": "sad",
-        "😭": "sad",
-        "😞": "sad",
-        "🎉": "party",
-        "🎶": "chill",
-        "🔥": "energetic",
-    }
+# st.fragment (Streamlit >= 1.37) reruns only the search box while typing;
+# text_input(live=...) commits after a pause in typing rather than on Enter.
+TYPEAHEAD_FRAGMENT = hasattr(st, "fragment")
+TYPEAHEAD_INPUT = {"live": "200ms"} if "live" in inspect.signature(st.text_input).parameters else {}
+SUGGESTIONS = 6
 
-    mood_keywords = {
-        "happy": ["happy", "joy", "joyful", "smile", "sun", "wonderful", "blessed", "cheer", "yay", "glad"],
-        "sad": ["sad", "tears", "cry", "lonely", "broken", "hurt", "goodbye", "miss you", "pain", "sorrow"],
-        "romantic": ["love", "darling", "baby", "forever", "kiss", "heart", "romance", "romantic", "beloved"],
-        "energetic": ["dance", "party", "pump", "energy", "run", "jump", "beat", "rock", "hype"],
-        "chill": ["chill", "calm", "relax", "smooth", "easy", "breathe", "mellow", "laid back"],
-        "party": ["party", "club", "night", "shots", "crowd", "celebrate", "turn up", "fest"],
-    }
 
-    scores = {k: 0 for k in mood_keywords}
+def suggest_terms(query: str, limit: int = SUGGESTIONS):
+    with perf.phase("typeahead"):
+        suggestions = get_prefix_index().suggest(query, limit * 2)
+    typed = (query or "").strip().lower()
+    return [text for text in dict.fromkeys(text for text, _ in suggestions) if text.lower() != typed][:limit]
+
+
+def pick_search_term(text: str, rerun_app: bool = False):
+    """Button callback: put ``text`` in the search box and run the search."""
+    st.session_state["search_query"] = text
+    st.session_state["search_go"] = True
+    st.session_state["search_rerun"] = rerun_app
+    perf.count("typeahead.picked")
+
+
+def search_box():
+    """Search input plus suggestion buttons; the only part rerun per keystroke when fragments are available."""
+    if st.session_state.pop("search_rerun", False):
+        # a suggestion was picked inside the fragment: the results live outside it
+        st.rerun(scope="app")
+    query = st.text_input("Search (genre, keyword, artist, or mood):", key="search_query", **TYPEAHEAD_INPUT)
+    suggestions = suggest_terms(query)
+    if suggestions:
+        cols = st.columns(3)
+        for i, text in enumerate(suggestions):
+            cols[i % 3].button(text, key=f"suggest_{i}", on_click=pick_search_term, args=(text, TYPEAHEAD_FRAGMENT))
+
+
+if TYPEAHEAD_FRAGMENT:
+    search_box = st.fragment(search_box)
+
+# ------------------------------------------------
+# Album art for cards: local right-sized thumbnail when BEATBUDDY_THUMBS=1
+# ------------------------------------------------
+def card_image_src(url, width):
+    thumbs = get_thumbnail_cache()
+    if url and thumbs is not None:
+        return thumbs.data_uri(url, width) or url
+    return url
 
-    # emoji scoring
-    for e, m in emoji_map.items():
-        if e in text:
-            scores[m] += 2
 
-    # keyword scoring with basic negation handling
-    negations = ["not ", "never ", "no ", "don't ", "cant ", "can't "]
-    for mood, keys in mood_keywords.items():
-        for kw in keys:
-            if kw in t:
-                negated = any(neg in t and t.find(neg) < t.find(kw) and t.find(kw) - t.find(neg) < 12 for neg in negations)
-                scores[mood] += -1 if negated else 1
+def prefetch_card_images(urls, width):
+    thumbs = get_thumbnail_cache()
+    if thumbs is not None:
+        thumbs.prefetch(urls, width)
 
-    # fallback heuristics
-    if all(v == 0 for v in scores.values()):
-        if any(w in t for w in ["!", "yay", "whoa", "yeah"]):
-            return "happy"
-        if any(w in t for w in ["sad", "cry", "tears"]):
-            return "sad"
-        return DEFAULT_MOOD
+# ------------------------------------------------
+# Warm-up: preload the quick-mood sets once per process (BEATBUDDY_WARMUP=0 disables,
+# BEATBUDDY_WARMUP_ALL_LANGUAGES=1 covers every language, not just the default)
+# ------------------------------------------------
+if CLIENT_ID and CLIENT_SECRET and os.getenv("BEATBUDDY_WARMUP", "1") != "0":
+    warmup_languages = list(LANGUAGES) if os.getenv("BEATBUDDY_WARMUP_ALL_LANGUAGES") == "1" else [DEFAULT_LANGUAGE]
+    start_warmup(lambda: get_shared_client(CLIENT_ID, CLIENT_SECRET), warmup_languages, DEFAULT_LATEST, DEFAULT_NUM_RESULTS)
 
-    best = max(scores.items(), key=lambda kv: kv[1])[0]
-    return best
+# ------------------------------------------------
+# JSON API beside the UI (BEATBUDDY_API_PORT=8502, see beatbuddy.api): same process,
+# so it shares the client, caches and scheduler with every session. A port another
+# app process already serves is logged once and left to that process.
+# ------------------------------------------------
+if os.getenv("BEATBUDDY_API_PORT"):
+    start_api_server(
+        lambda: get_shared_client(CLIENT_ID, CLIENT_SECRET), os.getenv("BEATBUDDY_API_HOST", "127.0.0.1"), int(os.environ["BEATBUDDY_API_PORT"])
+    )
 
 # ------------------------------------------------
 # Views: recommendations page (open in new tab) or main chat UI
 # ------------------------------------------------
 
-# ------- User / Login UI (simple in-memory store) -------
+# ------- User / Login UI (persistent store shared by all sessions, see beatbuddy.store) -------
 def init_user_store():
-    if "users" not in st.session_state:
-        st.session_state["users"] = {"demo": "demo"}
-    if "saved_tracks" not in st.session_state:
-        st.session_state["saved_tracks"] = {}
     if "view_local" not in st.session_state:
         st.session_state["view_local"] = None
 
 def register_user(username: str, password: str) -> bool:
-    init_user_store()
-    if not username or not password:
-        return False
-    if username in st.session_state["users"]:
-        return False
-    st.session_state["users"][username] = password
-    st.session_state["saved_tracks"][username] = []
-    return True
+    return get_user_store().register(username, password)
 
 def login_user(username: str, password: str) -> bool:
-    init_user_store()
-    if st.session_state["users"].get(username) == password:
+    if get_user_store().authenticate(username, password):
         st.session_state["user"] = username
-        if username not in st.session_state["saved_tracks"]:
-            st.session_state["saved_tracks"][username] = []
         return True
     return False
 
@@ -275,7 +344,7 @@ def safe_rerun():
     # fallback: toggle a dummy query param to force a rerun
     try:
         qp = st.query_params or {}
-        qp["_rerun"] = [str(int(pd.Timestamp.now().timestamp()))]
+        qp["_rerun"] = [str(int(time.time()))]
         st.experimental_set_query_params(**qp)
     except Exception:
         # last resort: stop the script (Streamlit will reload on user refresh)
@@ -284,6 +353,117 @@ def safe_rerun():
         except Exception:
             pass
 
+def more_like(seeds, limit=DEFAULT_NUM_RESULTS):
+    """Tracks like ``seeds`` from the local similarity index (no Spotify call), leaving out saved ones."""
+    user = st.session_state.get("user")
+    want = limit
+    with perf.phase("similar"):
+        while True:
+            found = get_similar_index().similar(list(seeds), want)
+            if not user:
+                return found
+            # only the candidates are checked against the library; ask for more if too many are saved
+            saved = get_user_store().saved_among(user, [saved_key(t) for t in found])
+            kept = tuple(t for t in found if saved_key(t) not in saved)
+            if len(kept) >= limit or len(found) < want:
+                return kept[:limit]
+            want *= 2
+
+
+def render_more_like(key: str):
+    """The "More like ..." list opened from list ``key`` (the session keeps only its seed tracks)."""
+    if session.similar is None or session.similar[0] != key:
+        return
+    seeds = session.similar[1]
+    about = f"{seeds[0].get('title')} — {seeds[0].get('artist')}" if len(seeds) == 1 else f"your {len(seeds)} latest saved tracks"
+    head = st.columns([4, 1])
+    with head[1]:
+        hide = st.button("Hide", key=f"{key}_like_hide")
+    if hide:
+        session.similar = None
+        return
+    with head[0]:
+        st.markdown(f"**More like {about}**")
+    tracks = more_like(seeds)
+    if tracks:
+        render_track_cards(tracks, f"{key}_like", like=False)
+    else:
+        st.info("Nothing similar in the local pool yet. Search or get recommendations to grow it.")
+
+
+def render_track_cards(tracks, key: str, image_width: int = 120, action: str = "save", total: int = None, like: bool = True):
+    """Render a result list as one HTML block, a page at a time.
+
+    ``tracks`` is a sequence of Track records (or dicts), or a ``(offset, limit) -> list`` loader
+    plus ``total`` so large libraries are read one page at a time.
+    ``action`` is "save" (multi-select + one button to save to the dashboard)
+    or "remove" (same, removing from the logged-in user's saved tracks), so a
+    list costs a handful of widgets whatever its length. ``like`` adds a
+    "More like this" picker answered from the local similarity index.
+    """
+    if callable(tracks):
+        load_page = tracks
+    else:
+        rows = tracks if isinstance(tracks, (list, tuple)) else list(tracks)
+        total = len(rows)
+        load_page = lambda offset, limit: rows[offset:offset + limit]
+    if not total:
+        return
+
+    pages = page_count(total)
+    page = 1
+    if pages > 1:
+        page = int(st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page"))
+    start = (page - 1) * CARDS_PER_PAGE
+    shown = load_page(start, CARDS_PER_PAGE)
+
+    with perf.phase("render"):
+        prefetch_card_images([r.get("image") for r in shown], image_width)
+        st.markdown(cards_html(shown, lambda url: card_image_src(url, image_width), image_width, start), unsafe_allow_html=True)
+
+    labels = [f"{start + i + 1}. {r.get('title')} — {r.get('artist')}" for i, r in enumerate(shown)]
+    track_actions(shown, labels, key, page, action)
+    if like:
+        pick_cols = st.columns([3, 1])
+        with pick_cols[0]:
+            seed = st.selectbox("More like:", range(len(shown)), format_func=labels.__getitem__, key=f"{key}_like_seed_{page}")
+        with pick_cols[1]:
+            if st.button("More like this", key=f"{key}_like_go_{page}"):
+                session.similar = (key, (shown[seed],))
+        render_more_like(key)
+
+
+def track_actions(shown, labels, key: str, page: int, action: str):
+    """Save / remove picker for the tracks on one page."""
+    user = st.session_state.get("user")
+    if not user:
+        st.markdown("<div class='small-muted'>Login to save tracks to your dashboard.</div>", unsafe_allow_html=True)
+        return
+
+    store = get_user_store()
+    keys = [saved_key(r) for r in shown]
+    if action == "remove":
+        options = list(range(len(shown)))
+    else:
+        already = store.saved_among(user, keys)
+        options = [i for i, k in enumerate(keys) if k not in already]
+        if len(options) < len(shown):
+            st.markdown(f"<div class='small-muted'>{len(shown) - len(options)} of these are already on your dashboard.</div>", unsafe_allow_html=True)
+    if not options:
+        return
+
+    verb = "Remove" if action == "remove" else "Save"
+    picked = st.multiselect(f"{verb} tracks:", options=options, format_func=labels.__getitem__, key=f"{key}_pick_{page}")
+    if picked and st.button(f"{verb} selected", key=f"{key}_{action}_{page}"):
+        if action == "remove":
+            for i in picked:
+                store.remove_track(user, keys[i])
+            safe_rerun()
+        else:
+            added = store.save_tracks(user, [shown[i] for i in picked])
+            st.success(f"Saved {added} track(s) to your dashboard")
+
+
 # Render a compact login/register area at the top
 if st.session_state.get("user"):
     user = st.session_state.get("user")
@@ -324,52 +504,55 @@ if st.session_state.get("user"):
     st.markdown("<div class='card'><h3>Search songs</h3></div>", unsafe_allow_html=True)
     cols = st.columns([3, 1, 1])
     with cols[0]:
-        search_query = st.text_input("Search (genre, keyword, artist, or mood):", key="search_query")
+        search_box()
+        search_query = st.session_state.get("search_query", "")
     with cols[1]:
         search_language = st.selectbox("Language:", ["English", "Hindi", "Punjabi"], index=0, key="search_language")
     with cols[2]:
         search_latest = st.checkbox("Latest only", value=True, key="search_latest")
 
-    search_limit = st.slider("Results", 5, 30, 10, key="search_limit")
-    if st.button("Search"):
+    deep_search = st.checkbox("Deep search (several pages, fetched in parallel)", value=False, key="search_deep")
+    if deep_search:
+        search_limit = st.slider("Results", 50, 500, 200, step=50, key="search_total")
+    else:
+        search_limit = st.slider("Results", 5, 30, 10, key="search_limit")
+    new_search = st.button("Search") or st.session_state.pop("search_go", False)
+    if new_search:
         if not search_query or not search_query.strip():
             st.warning("Please enter a search term (genre, keyword, artist, or mood).")
+        elif deep_search:
+            # show each page the moment it lands, then hand over to the full list below
+            preview = st.empty()
+            live = preview.container()
+            for page in search_songs_pages(search_query, search_language, search_latest, int(search_limit)):
+                live.markdown("\n".join(f"- **{t.title}** — {t.artist}" for t in page))
+            preview.empty()
+            session.search = (search_query, search_language, search_latest, int(search_limit), True)
         else:
-            with st.spinner("Searching Spotify..."):
-                sr = search_songs(search_query, search_language, search_latest, int(search_limit))
-            st.session_state["search_results"] = sr
+            session.search = (search_query, search_language, search_latest, int(search_limit), False)
 
-    # show search results (if any)
-    if st.session_state.get("search_results") is not None:
-        dfsr = st.session_state.get("search_results")
-        if dfsr.empty:
-            st.info("No results found for your search.")
+    # show search results (if any): resolved from the shared cache on every rerun
+    if session.search is not None:
+        st.session_state.pop("sp_error", None)
+        if new_search and not session.search[4]:
+            with st.spinner("Searching Spotify..."):
+                results = resolve_search(session.search)
         else:
-            st.markdown(f"<div class='small-muted' style='margin-bottom:8px'>Showing {len(dfsr)} results. You can save tracks to your dashboard.</div>", unsafe_allow_html=True)
-            for idx, row in dfsr.iterrows():
-                st.markdown("<div class='card' style='display:flex; gap:12px; align-items:center;'>", unsafe_allow_html=True)
-                cols = st.columns([1, 4])
-                with cols[0]:
-                    if row.get("image"):
-                        st.image(row.get("image"), width=100)
-                with cols[1]:
-                    st.markdown(f"### {row.get('title')}")
-                    st.write(f"**{row.get('artist')}** — {row.get('album')}")
-                    st.write(f"📅 {row.get('release_date')}")
-                    if row.get('url'):
-                        st.markdown(f"[▶️ Listen on Spotify]({row.get('url')})")
-                    user = st.session_state.get('user')
-                    if st.button('Save to dashboard', key=f'save_search_{idx}'):
-                        st.session_state['saved_tracks'].setdefault(user, []).append({
-                            'title': row.get('title'),
-                            'artist': row.get('artist'),
-                            'album': row.get('album'),
-                            'release_date': row.get('release_date'),
-                            'url': row.get('url'),
-                            'image': row.get('image')
-                        })
-                        st.success('Saved to your dashboard')
-                st.markdown("</div>", unsafe_allow_html=True)
+            results = resolve_search(session.search)
+        if results:
+            st.markdown(f"<div class='small-muted' style='margin-bottom:8px'>Showing {len(results)} results. You can save tracks to your dashboard.</div>", unsafe_allow_html=True)
+            render_track_cards(results, "search", image_width=100)
+        elif st.session_state.get("sp_error"):
+            st.error("Spotify authentication or network error.")
+            st.write(st.session_state.get("sp_error"))
+        else:
+            st.info("No results found for your search.")
+            # only a search that found nothing gets a "did you mean" (from the local index)
+            fix = get_prefix_index().correct(session.search[0])
+            if fix:
+                perf.count("typeahead.corrections")
+                st.markdown(f"Did you mean **{fix}**?")
+                st.button(f"Search '{fix}'", key="search_fix", on_click=pick_search_term, args=(fix,))
 
 qp = st.query_params
     
@@ -378,26 +561,54 @@ qp = st.query_params
 if st.session_state.get("view_local") == "dashboard" and st.session_state.get("user"):
     st.markdown("<div class='card'><h2>Your Dashboard</h2></div>", unsafe_allow_html=True)
     user = st.session_state.get("user")
-    saved = st.session_state.get("saved_tracks", {}).get(user, [])
-    if not saved:
+    with st.expander("Import tracks or playlists"):
+        import_text = st.text_area("Paste Spotify track / playlist links or track IDs (one per line):", key="import_text", height=120)
+        if st.button("Import", key="import_go") and import_text.strip():
+            sp = get_sp_client()
+            if sp is None:
+                st.error(st.session_state.get("sp_error", "Spotify is not available."))
+            else:
+                try:
+                    with st.spinner("Fetching track details from Spotify..."), perf.phase("import"):
+                        result = import_tracks(sp, get_user_store(), user, import_text)
+                except RateLimited as e:
+                    st.error(busy_message(e))
+                except Exception as e:
+                    st.error(f"Import failed: {e}")
+                else:
+                    note = f"Imported {result['added']} track(s) in {result['requests']} Spotify request(s)"
+                    if result["skipped"]:
+                        note += f", {result['skipped']} already saved"
+                    if result["missing"]:
+                        note += f", {len(result['missing'])} not found"
+                    st.session_state["import_note"] = note + "."
+                    safe_rerun()
+        if st.session_state.get("import_note"):
+            st.success(st.session_state.pop("import_note"))
+
+    saved_total = get_user_store().saved_count(user)
+    if not saved_total:
         st.info("You have no saved tracks yet. Save recommendations to see them here.")
     else:
-        for idx, t in enumerate(saved):
-            st.markdown("<div class='card' style='display:flex; gap:12px; align-items:center;'>", unsafe_allow_html=True)
-            cols = st.columns([1, 4])
-            with cols[0]:
-                if t.get("image"):
-                    st.image(t.get("image"), width=120)
-            with cols[1]:
-                st.markdown(f"### {t.get('title')}")
-                st.write(f"**{t.get('artist')}** — {t.get('album')}")
-                st.write(f"📅 {t.get('release_date')}")
-                if t.get('url'):
-                    st.markdown(f"[▶️ Listen on Spotify]({t.get('url')})")
-                if st.button(f"Remove", key=f"remove_{idx}"):
-                    st.session_state['saved_tracks'][user].pop(idx)
-                    safe_rerun()
-            st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(f"<div class='small-muted'>{saved_total} saved tracks, newest first.</div>", unsafe_allow_html=True)
+        if st.button("More like my saved tracks", key="dashboard_like_all"):
+            session.similar = ("dashboard", tuple(next(get_user_store().iter_saved(user, batch=200), ())))
+        render_track_cards(
+            lambda offset, limit: get_user_store().saved_page(user, offset, limit), "dashboard", action="remove", total=saved_total
+        )
+        # built only on request (not on every rerun), reading the store a page at a time
+        if st.button("Prepare export", key="export_prepare"):
+            ex_csv, ex_jsonl = st.columns(2)
+            with ex_csv:
+                st.download_button(
+                    "Export CSV", "".join(export_saved(get_user_store(), user, "csv")).encode(),
+                    file_name=f"beatbuddy-{user}.csv", mime="text/csv", key="export_csv",
+                )
+            with ex_jsonl:
+                st.download_button(
+                    "Export JSONL", "".join(export_saved(get_user_store(), user, "jsonl")).encode(),
+                    file_name=f"beatbuddy-{user}.jsonl", mime="application/x-ndjson", key="export_jsonl",
+                )
 
     if st.button("Back"):
         st.session_state["view_local"] = None
@@ -415,43 +626,16 @@ if qp.get("view", [None])[0] == "recommend":
 
     st.markdown(f"<div class='card'><h2>Recommendations for mood: <span class='mood-badge'>{mood_q}</span></h2></div>", unsafe_allow_html=True)
     with st.spinner("Fetching recommendations..."):
-        df = fetch_songs(mood_q, language_q, latest_q, num_q)
+        tracks = fetch_songs(mood_q, language_q, latest_q, num_q)
 
-    if df.empty:
+    if not tracks:
         if st.session_state.get("sp_error"):
             st.error("Spotify authentication or network error.")
             st.write(st.session_state.get("sp_error"))
         else:
             st.warning("No songs found for the selected mood / filters.")
     else:
-        for idx, row in df.iterrows():
-            st.markdown("<div class='card' style='display:flex; gap:12px; align-items:center;'>", unsafe_allow_html=True)
-            cols = st.columns([1, 4])
-            with cols[0]:
-                if row.get("image"):
-                    st.image(row.get("image"), width=120)
-            with cols[1]:
-                st.markdown(f"### {row.get('title')}")
-                st.write(f"**{row.get('artist')}** — {row.get('album')}")
-                st.write(f"📅 {row.get('release_date')}")
-                if row.get("url"):
-                    st.markdown(f"[▶️ Listen on Spotify]({row.get('url')})")
-                # Save to dashboard (requires login)
-                if st.session_state.get('user'):
-                    user = st.session_state.get('user')
-                    if st.button('Save to dashboard', key=f'save_rec_{idx}'):
-                        st.session_state['saved_tracks'].setdefault(user, []).append({
-                            'title': row.get('title'),
-                            'artist': row.get('artist'),
-                            'album': row.get('album'),
-                            'release_date': row.get('release_date'),
-                            'url': row.get('url'),
-                            'image': row.get('image')
-                        })
-                        st.success('Saved to your dashboard')
-                else:
-                    st.markdown("<div class='small-muted'>Login to save tracks to your dashboard.</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        render_track_cards(tracks, "rec")
 
     st.markdown("---")
     st.markdown("[← Back to BeatBuddy](./)")
@@ -460,24 +644,14 @@ else:
     # ------------------------------
     # Main chat UI
     # ------------------------------
-    if "messages" not in st.session_state:
-        st.session_state["messages"] = [
-            {"from": "bot", "text": "Hello! I'm BeatBuddy. How are you feeling today? Tell me in a few words or paste song lyrics."}
-        ]
-
-    def render_chat():
-        st.markdown("<div class='card'>", unsafe_allow_html=True)
-        st.subheader("Chat with BeatBuddy")
-        st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
-        for m in st.session_state["messages"]:
-            if m["from"] == "user":
-                st.markdown(f"<div class='user-bubble'>{m['text']}</div>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<div class='bot-bubble'>{m['text']}</div>", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+    chat = session.chat
+    # messages that scroll out of the window go to the user's archive once logged in
+    chat_user = st.session_state.get("user")
+    chat.archive = (lambda message: get_user_store().archive_chat(chat_user, [message])) if chat_user else None
 
-    render_chat()
+    st.subheader("Chat with BeatBuddy")
+    # filled once, after the handlers below have added this rerun's messages
+    chat_slot = st.empty()
 
     # Top prompt area (chat style)
     user_text = st.text_input("You:", value="", key="chat_input")
@@ -489,14 +663,17 @@ else:
 
     # Quick mood buttons
     st.markdown("---")
-    st.markdown("**Quick moods:**")
+    warm = warmup_status()
+    if warm and warm["state"] == "ready":
+        st.markdown("**Quick moods:** <span class='small-muted'>⚡ preloaded</span>", unsafe_allow_html=True)
+    else:
+        st.markdown("**Quick moods:**")
     moods = ["happy", "sad", "romantic", "energetic", "chill", "party"]
     cols = st.columns(len(moods))
     for i, m in enumerate(moods):
         if cols[i].button(m.title()):
-            st.session_state["messages"].append({"from": "user", "text": m})
-            st.session_state["messages"].append({"from": "bot", "text": f"Got it — you'll get {m} songs. Open recommendations?"})
-            render_chat()
+            chat.add("user", m)
+            chat.add("bot", f"Got it — you'll get {m} songs. Open recommendations?", mood=m)
             params = {"view": "recommend", "mood": m, "language": DEFAULT_LANGUAGE, "latest": str(DEFAULT_LATEST).lower(), "num_results": str(DEFAULT_NUM_RESULTS)}
             # build query string
             qs = "&".join([f"{k}={v}" for k, v in params.items()])
@@ -505,11 +682,10 @@ else:
 
     # handle send
     if send and user_text:
-        st.session_state["messages"].append({"from": "user", "text": user_text})
-        detected = detect_mood_from_text(user_text)
+        chat.add("user", user_text)
+        detected = detect_mood(user_text)
         bot_reply = f"I think you're feeling *{detected}*. Would you like me to recommend some songs for that mood?"
-        st.session_state["messages"].append({"from": "bot", "text": bot_reply})
-        render_chat()
+        chat.add("bot", bot_reply, mood=detected)
 
         # recommend link
         params = {"view": "recommend", "mood": detected, "language": DEFAULT_LANGUAGE, "latest": str(DEFAULT_LATEST).lower(), "num_results": str(DEFAULT_NUM_RESULTS)}
@@ -520,9 +696,9 @@ else:
     # quick recommend button uses the last bot-detected mood or default
     if recommend_quick:
         # find last user message
-        last_user = next((m for m in reversed(st.session_state["messages"]) if m["from"] == "user"), None)
+        last_user = chat.last_user_text()
         if last_user:
-            detected = detect_mood_from_text(last_user["text"])
+            detected = detect_mood(last_user)
         else:
             detected = DEFAULT_MOOD
         params = {"view": "recommend", "mood": detected, "language": DEFAULT_LANGUAGE, "latest": str(DEFAULT_LATEST).lower(), "num_results": str(DEFAULT_NUM_RESULTS)}
@@ -530,6 +706,9 @@ else:
         recommend_url = f"./?{qs}"
         st.markdown(f"<div style='margin-top:8px'><a target='_blank' href='{recommend_url}' style='background:#0ea5a9;color:white;padding:10px 14px;border-radius:10px;text-decoration:none;'>Open recommendations in a new tab</a></div>", unsafe_allow_html=True)
 
+    with perf.phase("render"):
+        chat_slot.markdown(chat.html(), unsafe_allow_html=True)
+
     # Main area below shows a more detailed "detect + recommend" panel
     st.markdown("---")
     left, right = st.columns([2, 3])
@@ -539,10 +718,11 @@ else:
         st.subheader("Know your mood — automatically")
         text_input = st.text_area("Describe your mood or paste lyrics:", height=140, key="d_text")
         auto_detect = st.checkbox("Auto-detect mood from text", value=True, key="auto_detect")
-        language = st.selectbox("Language:", ["English", "Hindi", "Punjabi"], index=0, key="ui_language")
-        latest = st.checkbox("Only latest songs (after 2022)", value=DEFAULT_LATEST, key="ui_latest")
+        language = st.selectbox("Language:", ["English", "Hindi", "Punjabi", "All languages"], index=0, key="ui_language")
+        latest = st.checkbox(f"Only latest songs ({LATEST_SINCE} or later)", value=DEFAULT_LATEST, key="ui_latest")
         num_results = st.slider("Number of results", 5, 20, DEFAULT_NUM_RESULTS, key="ui_num")
         manual_mood = st.selectbox("Or choose a mood manually:", ["(auto)", "happy", "sad", "romantic", "energetic", "chill", "party"], key="manual_mood")
+        blend_mood = st.selectbox("Blend with another mood:", ["(none)", "happy", "sad", "romantic", "energetic", "chill", "party"], key="blend_mood")
         detect_btn = st.button("Detect Mood & Recommend 🎯", key="detect_btn")
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -555,54 +735,63 @@ else:
             if manual_mood and manual_mood != "(auto)":
                 mood_to_use = manual_mood
             elif auto_detect:
-                mood_to_use = detect_mood_from_text(text_input)
+                mood_to_use = detect_mood(text_input)
             else:
                 mood_to_use = DEFAULT_MOOD
 
             st.markdown(f"<div style='margin-bottom:8px'>Detected mood: <span class='mood-badge'>{mood_to_use}</span></div>", unsafe_allow_html=True)
 
+            moods_to_use = [mood_to_use]
+            if blend_mood != "(none)" and blend_mood != mood_to_use:
+                moods_to_use.append(blend_mood)
+            languages_to_use = list(LANGUAGES) if language == "All languages" else [language]
+
             with st.spinner("Fetching recommended songs..."):
-                df = fetch_songs(mood_to_use, language, latest, num_results)
+                if len(moods_to_use) > 1 or len(languages_to_use) > 1:
+                    tracks = fetch_songs_blend(moods_to_use, languages_to_use, latest, num_results)
+                else:
+                    tracks = fetch_songs(mood_to_use, language, latest, num_results)
 
-            if df.empty:
+            if not tracks:
                 if st.session_state.get("sp_error"):
                     st.error("Spotify authentication or network error.")
                     st.write(st.session_state.get("sp_error"))
                 else:
                     st.warning("No songs found. Try changing the mood / language / number of results.")
             else:
-                st.success(f"Found {len(df)} {language} songs for mood: {mood_to_use}")
-                for idx, row in df.iterrows():
-                    st.markdown("<div class='card' style='display:flex; gap:12px; align-items:center;'>", unsafe_allow_html=True)
-                    cols = st.columns([1, 4])
-                    with cols[0]:
-                        if row.get("image"):
-                            st.image(row.get("image"), width=120)
-                    with cols[1]:
-                        st.markdown(f"### {row.get('title')}")
-                        st.write(f"**{row.get('artist')}** — {row.get('album')}")
-                        st.write(f"📅 {row.get('release_date')}")
-                        if row.get("url"):
-                            st.markdown(f"[▶️ Listen on Spotify]({row.get('url')})")
-                        if st.session_state.get('user'):
-                            user = st.session_state.get('user')
-                            if st.button('Save to dashboard', key=f'save_det_{idx}'):
-                                st.session_state['saved_tracks'].setdefault(user, []).append({
-                                    'title': row.get('title'),
-                                    'artist': row.get('artist'),
-                                    'album': row.get('album'),
-                                    'release_date': row.get('release_date'),
-                                    'url': row.get('url'),
-                                    'image': row.get('image')
-                                })
-                                st.success('Saved to your dashboard')
-                        else:
-                            st.markdown("<div class='small-muted'>Login to save tracks to your dashboard.</div>", unsafe_allow_html=True)
-                    st.markdown("</div>", unsafe_allow_html=True)
+                st.success(f"Found {len(tracks)} {language} songs for mood: {' + '.join(moods_to_use)}")
+                render_track_cards(tracks, "det")
 
         else:
             st.info("Click 'Detect Mood & Recommend' to get suggestions based on your text or chosen mood.")
 
         st.markdown("</div>", unsafe_allow_html=True)
 
+# ------------------------------------------------
+# Performance panel (BEATBUDDY_PERF=1, users listed in BEATBUDDY_ADMINS only)
+# ------------------------------------------------
+if perf.ENABLED and st.session_state.get("user") in perf.ADMINS:
+    with st.expander("⏱ Performance"):
+        snap = perf.registry.snapshot()
+        st.markdown("**Latency by phase (ms, process-wide)**")
+        st.table([{"phase": name, **summary} for name, summary in snap["phases"].items()])
+        st.markdown("**Counters**")
+        st.json(snap["counters"])
+        st.markdown("**Search cache**")
+        st.json(search_cache.stats())
+        st.markdown("**Spotify scheduler**")
+        st.json(spotify_scheduler.stats())
+        st.markdown("**Memory (sessions and shared results)**")
+        st.json(get_sessions().memory_report({"search cache": search_cache.values()}))
+        st.markdown("**Warm-up**")
+        st.json(warmup_status())
+        st.markdown(f"**Last {min(len(snap['recent']), 20)} reruns**")
+        st.table([
+            {"session": r["session"], "total_ms": r["total_ms"], "complete": r["complete"], **r["phases"], "errors": len(r["errors"])}
+            for r in snap["recent"][-20:][::-1]
+        ])
+        st.download_button("Export JSON lines", perf.registry.export_jsonl(), file_name="beatbuddy-perf.jsonl", mime="application/x-ndjson")
+
+perf.end_rerun(perf_record)
+
 # End of file
@@ -0,0 +1,31 @@
+"""Helpers shared by the BeatBuddy Streamlit app.
+
+Everything here lives in an imported module rather than in ``app.py`` so that
+process-wide state (caches, the Spotify client, ...) survives Streamlit reruns.
+"""
+import os
+import sqlite3
+
+# local state (track catalog, ...) lives here; override with BEATBUDDY_DATA_DIR
+DATA_DIR = os.getenv("BEATBUDDY_DATA_DIR", ".beatbuddy")
+
+
+def data_path(name: str) -> str:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def thread_connection(local, path: str, timeout: float = 5) -> sqlite3.Connection:
+    """The calling thread's connection to the SQLite file ``path``, kept on ``local`` (a ``threading.local``).
+
+    Opened on first use in autocommit mode with ``sqlite3.Row`` rows, in WAL
+    mode so readers never block the writer (or each other).
+    """
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+    return conn
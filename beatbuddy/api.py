@@ -0,0 +1,335 @@
+# ------------------------------------------------
+# Headless JSON API (/mood, /recommend, /search) on asyncio, sharing the app's caches
+# ------------------------------------------------
+# Run on its own (SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET from the environment):
+#    python -m beatbuddy.api --port 8502
+# or beside the Streamlit UI, in the same process (same client, caches and scheduler):
+#    BEATBUDDY_API_PORT=8502 streamlit run app.py
+#
+#    GET  /mood?text=...                        {"mood": "happy", "scores": {...}}
+#    POST /mood  {"texts": [...]}               {"moods": [...]}
+#    GET  /recommend?mood=happy&language=English&latest=1&limit=10
+#         (mood may repeat; text=... detects the mood first)
+#    GET  /search?q=...&language=English&latest=1&limit=10
+#    GET  /suggest?q=ari&limit=8                {"suggestions": [{"text": ..., "kind": "artist"}, ...]}
+#    GET  /similar?id=<track id>&limit=10       tracks like a known track (local data only)
+#    GET  /health
+#
+# The event loop only parses requests and writes JSON. Anything that may
+# call Spotify runs on a thread pool (BEATBUDDY_API_WORKERS), so a slow
+# Spotify request never holds up other connections.
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from beatbuddy import perf
+from beatbuddy.mood import MOODS, analyze_mood, detect_mood_from_text
+from beatbuddy.recommend import recommend
+from beatbuddy.catalog import get_catalog
+from beatbuddy.scheduler import RateLimited, spotify_scheduler
+from beatbuddy.search import LANGUAGES, search_cache, search_text_tracks
+from beatbuddy.similar import get_similar_index
+from beatbuddy.typeahead import get_prefix_index
+
+API_WORKERS = int(os.getenv("BEATBUDDY_API_WORKERS", "32"))
+MAX_LIMIT = 50
+MAX_BODY = 1 << 20
+MAX_TEXTS = 10_000
+IDLE_TIMEOUT = 30.0
+
+_server = None
+# the error that kept this process from serving the API, so it is not retried (and logged) every rerun
+_server_error = None
+_server_lock = threading.Lock()
+log = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """A request the API refuses; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _flag(params, name, default):
+    value = _param(params, name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+def _limit(params, default=10):
+    try:
+        limit = int(_param(params, "limit", default))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _languages(params):
+    by_name = {lang.lower(): lang for lang in LANGUAGES}
+    names = params.get("language") or [LANGUAGES[0]]
+    unknown = [n for n in names if n.lower() not in by_name]
+    if unknown:
+        raise ApiError(400, f"unknown language {unknown[0]!r} (one of {', '.join(LANGUAGES)})")
+    return list(dict.fromkeys(by_name[n.lower()] for n in names))
+
+
+class BeatBuddyApi:
+    """Routes, request parsing and the thread pool behind one API server."""
+
+    def __init__(self, client_factory, workers=API_WORKERS):
+        self.client_factory = client_factory
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="beatbuddy-api")
+        self.port = None
+        self.requests = Counter()
+        # (method, path) -> (handler, runs on the thread pool)
+        self.routes = {
+            ("GET", "/mood"): (self.mood, False),
+            ("POST", "/mood"): (self.mood, True),
+            ("GET", "/recommend"): (self.recommend, True),
+            ("GET", "/search"): (self.search, True),
+            ("GET", "/suggest"): (self.suggest, False),
+            ("GET", "/similar"): (self.similar, True),
+            ("GET", "/health"): (self.health, False),
+        }
+
+    # ---- handlers: (query params, parsed JSON body or None) -> JSON payload ----
+    def _client(self):
+        try:
+            sp = self.client_factory()
+        except Exception as e:
+            raise ApiError(503, f"Spotify client unavailable: {e}")
+        if sp is None:
+            raise ApiError(503, "Spotify client unavailable")
+        return sp
+
+    def mood(self, params, body):
+        if isinstance(body, dict) and isinstance(body.get("texts"), list):
+            from beatbuddy.mood_batch import detect_moods
+
+            if len(body["texts"]) > MAX_TEXTS:
+                raise ApiError(413, f"at most {MAX_TEXTS} texts per request")
+            return {"moods": detect_moods(body["texts"])[0].tolist()}
+        text = body.get("text") if isinstance(body, dict) else _param(params, "text")
+        if text is None:
+            raise ApiError(400, "pass ?text=... or a JSON body with text / texts")
+        mood, scores = analyze_mood(str(text))
+        return {"mood": mood, "scores": scores}
+
+    def recommend(self, params, body):
+        moods = params.get("mood") or []
+        if not moods and _param(params, "text") is not None:
+            moods = [detect_mood_from_text(_param(params, "text"))]
+        if not moods:
+            raise ApiError(400, "pass mood=... (repeatable) or text=...")
+        unknown = [m for m in moods if m not in MOODS]
+        if unknown:
+            raise ApiError(400, f"unknown mood {unknown[0]!r} (one of {', '.join(MOODS)})")
+        languages, latest, limit = _languages(params), _flag(params, "latest", True), _limit(params)
+        tracks = recommend(self._client(), moods, languages, latest, limit)
+        return {"moods": moods, "languages": languages, "latest": latest, "tracks": [t.to_dict() for t in tracks]}
+
+    def search(self, params, body):
+        query = (_param(params, "q") or "").strip()
+        if not query:
+            raise ApiError(400, "pass q=...")
+        language, latest, limit = _languages(params)[0], _flag(params, "latest", True), _limit(params)
+        tracks = search_text_tracks(self._client(), query, language, latest, limit)
+        return {"query": query, "language": language, "latest": latest, "tracks": [t.to_dict() for t in tracks]}
+
+    def suggest(self, params, body):
+        query = _param(params, "q") or ""
+        suggestions = get_prefix_index().suggest(query, _limit(params, 8))
+        return {"query": query, "suggestions": [{"text": text, "kind": kind} for text, kind in suggestions]}
+
+    def similar(self, params, body):
+        track_id = _param(params, "id")
+        if not track_id:
+            raise ApiError(400, "pass id=<Spotify track ID>")
+        index = get_similar_index()
+        seed = index.get(track_id)
+        if seed is None and get_catalog() is not None:
+            seed = next(iter(get_catalog().get([track_id])), None)
+        if seed is None:
+            raise ApiError(404, f"track {track_id!r} has not been seen yet")
+        tracks = index.similar(seed, _limit(params))
+        return {"track": seed.to_dict(), "tracks": [t.to_dict() for t in tracks]}
+
+    def health(self, params, body):
+        return {
+            "ok": True,
+            "requests": dict(self.requests),
+            "cache": search_cache.stats(),
+            "scheduler": spotify_scheduler.stats(),
+        }
+
+    # ---- HTTP ----
+    async def dispatch(self, method, target, raw):
+        """``(status, payload, extra headers)`` for one request."""
+        url = urlsplit(target)
+        route = self.routes.get((method, url.path))
+        if route is None:
+            known = any(path == url.path for _, path in self.routes)
+            return (405, {"error": "method not allowed"}, ()) if known else (404, {"error": "not found"}, ())
+        handler, blocking = route
+        started = time.perf_counter()
+        try:
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                raise ApiError(400, "body is not valid JSON")
+            params = parse_qs(url.query)
+            if blocking:
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(self.executor, contextvars.copy_context().run, handler, params, body)
+            else:
+                payload = handler(params, body)
+            return 200, payload, ()
+        except ApiError as e:
+            return e.status, {"error": str(e)}, ()
+        except RateLimited as e:
+            wait = math.ceil(e.retry_after)
+            return 429, {"error": "Spotify is rate limiting us, retry later", "retry_after": wait}, (("Retry-After", str(wait)),)
+        except Exception as e:
+            return 502, {"error": f"upstream error: {e}"}, ()
+        finally:
+            if perf.ENABLED:
+                perf.registry.observe(f"api {url.path}", (time.perf_counter() - started) * 1000)
+
+    async def handle(self, reader, writer):
+        """Serve one keep-alive connection until the client closes it or goes idle."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "request headers too large"}, False)
+                    return
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split(" ")
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "bad request line"}, False)
+                    return
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                if "transfer-encoding" in headers:
+                    await self._respond(writer, 411, {"error": "send a Content-Length body"}, False)
+                    return
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    await self._respond(writer, 413, {"error": f"body must be at most {MAX_BODY} bytes"}, False)
+                    return
+                try:
+                    raw = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                status, payload, extra = await self.dispatch(method, target, raw)
+                self.requests[status] += 1
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive, headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        head = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close",
+        ]
+        head.extend(f"{name}: {value}" for name, value in headers)
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8502, ready=None):
+        """Serve until cancelled; ``ready()`` is called once the socket is bound (``self.port`` set)."""
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready()
+        async with server:
+            await server.serve_forever()
+
+
+def start_api_server(client_factory, host="127.0.0.1", port=8502, workers=API_WORKERS):
+    """Start the process-wide API server on a daemon thread once; later calls return it.
+
+    Returns ``None`` if the port cannot be bound (e.g. another process owns
+    it); that failure is logged once and not retried by later calls.
+    """
+    global _server, _server_error
+    with _server_lock:
+        if _server is None and _server_error is None:
+            api = BeatBuddyApi(client_factory, workers)
+            bound, failure = threading.Event(), []
+
+            def run():
+                try:
+                    asyncio.run(api.serve(host, port, bound.set))
+                except Exception as e:
+                    failure.append(e)
+                    bound.set()
+
+            threading.Thread(target=run, name="beatbuddy-api", daemon=True).start()
+            bound.wait(10)
+            if failure:
+                _server_error = failure[0]
+                log.warning("BeatBuddy API not started on %s:%s: %s", host, port, _server_error)
+                return None
+            _server = api
+    return _server
+
+
+def _env_client():
+    from beatbuddy.client import get_shared_client
+
+    return get_shared_client(os.environ["SPOTIFY_CLIENT_ID"], os.environ["SPOTIFY_CLIENT_SECRET"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m beatbuddy.api", description="BeatBuddy JSON API.")
+    parser.add_argument("--host", default=os.getenv("BEATBUDDY_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BEATBUDDY_API_PORT", "8502")))
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="threads for Spotify-bound requests")
+    args = parser.parse_args(argv)
+
+    api = BeatBuddyApi(_env_client, args.workers)
+    try:
+        asyncio.run(api.serve(args.host, args.port, lambda: print(f"BeatBuddy API on http://{args.host}:{api.port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
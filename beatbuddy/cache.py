@@ -0,0 +1,246 @@
+# ------------------------------------------------
+# Process-wide result cache (TTL + LRU, stale-while-revalidate, single-flight)
+# ------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from beatbuddy import perf
+
+
+class ResultCache:
+    """Thread-safe cache shared by every session in the process.
+
+    * entries younger than ``ttl`` are served as-is;
+    * entries between ``ttl`` and ``stale_ttl`` are served stale while one
+      background refresh runs;
+    * older entries are dropped and reloaded;
+    * identical concurrent loads are coalesced into a single loader call;
+    * the least recently used entry is evicted once ``maxsize`` is reached.
+
+    Loader errors are never cached; they are raised to every waiting caller.
+    ``background_context()``, if given, wraps background refreshes (e.g. to
+    lower their request priority).
+
+    ``shared`` (a :class:`beatbuddy.shared_cache.SharedCacheStore`) adds a
+    host-wide second tier: loaded values are written through to it, a miss
+    here is served from it when another process (or this one before a
+    restart) already loaded the key, ``preload()`` fills this tier from it at
+    start-up and ``snapshot()`` writes this tier back at shutdown. Entries
+    keep their real age across processes, so fresh / stale still apply.
+    """
+
+    def __init__(self, maxsize=512, ttl=15 * 60, stale_ttl=6 * 60 * 60, refresh_workers=2, background_context=None, shared=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.background_context = background_context
+        self.shared = shared
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="beatbuddy-refresh")
+        self._counters = dict.fromkeys(
+            ("hits", "stale_hits", "misses", "shared_hits", "coalesced", "refreshes", "evictions", "errors", "shared_errors"), 0
+        )
+
+    def get_or_load(self, key, loader, refresh_loader=None):
+        """Return the cached value for ``key``, calling ``loader()`` when needed.
+
+        A stale entry is reloaded in the background with ``refresh_loader()``
+        (default: ``loader``), so a loader can tell a cold miss from a refresh.
+        """
+        refresh_loader = refresh_loader or loader
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._data.move_to_end(key)
+                    self._counters["hits"] += 1
+                    perf.count("cache.hits")
+                    return value
+                if age < self.stale_ttl:
+                    self._data.move_to_end(key)
+                    self._counters["stale_hits"] += 1
+                    perf.count("cache.stale_hits")
+                    if key not in self._inflight:
+                        fut = Future()
+                        self._inflight[key] = fut
+                        self._counters["refreshes"] += 1
+                        self._refresher.submit(self._refresh_in_background, key, refresh_loader, fut)
+                    return value
+                del self._data[key]
+
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+                self._counters["misses"] += 1
+                perf.count("cache.misses")
+            else:
+                self._counters["coalesced"] += 1
+                perf.count("cache.coalesced")
+
+        if owner:
+            if self.shared is None or not self._load_shared(key, refresh_loader, fut):
+                self._load(key, loader, fut)
+        return fut.result()
+
+    def get_fresh(self, key):
+        """The cached value if it is younger than ``ttl``, else ``None``; never loads."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                return None
+            self._data.move_to_end(key)
+            self._counters["hits"] += 1
+        perf.count("cache.hits")
+        return entry[0]
+
+    def _load(self, key, loader, fut):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._counters["errors"] += 1
+            fut.set_exception(e)
+            return
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value, time.monotonic())
+        if self.shared is not None:
+            self._write_shared([(key, value, time.time())])
+        fut.set_result(value)
+
+    def _store(self, key, value, stored_at):
+        # caller holds self._lock
+        self._data[key] = (value, stored_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _load_shared(self, key, refresh_loader, fut) -> bool:
+        """Resolve a miss from the shared tier; ``False`` if it has no usable copy."""
+        try:
+            hit = self.shared.get(key)
+        except Exception:
+            with self._lock:
+                self._counters["shared_errors"] += 1
+            return False
+        if hit is None:
+            return False
+        value, stored_at = hit
+        age = max(0.0, time.time() - stored_at)
+        if age >= self.stale_ttl:
+            return False
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, value, time.monotonic() - age)
+            self._counters["shared_hits"] += 1
+            if age >= self.ttl:
+                # stale everywhere: serve it and refresh once, like a stale hit
+                refresh = Future()
+                self._inflight[key] = refresh
+                self._counters["refreshes"] += 1
+                self._refresher.submit(self._refresh_in_background, key, refresh_loader, refresh)
+        perf.count("cache.shared_hits")
+        fut.set_result(value)
+        return True
+
+    def _write_shared(self, items):
+        try:
+            self.shared.put_many(items)
+        except Exception:
+            # the shared tier is an optimization; a locked or broken file never fails a request
+            with self._lock:
+                self._counters["shared_errors"] += 1
+
+    def preload(self) -> int:
+        """Fill this tier with the newest shared entries that are not yet expired; returns how many."""
+        if self.shared is None:
+            return 0
+        try:
+            entries = self.shared.recent(self.maxsize, self.stale_ttl)
+        except Exception:
+            return 0
+        wall, mono = time.time(), time.monotonic()
+        with self._lock:
+            # oldest first, so the newest end up most recently used
+            for key, value, stored_at in reversed(entries):
+                if key not in self._data:
+                    self._store(key, value, mono - max(0.0, wall - stored_at))
+        return len(entries)
+
+    def snapshot(self) -> int:
+        """Write every entry to the shared tier and prune expired ones there (run at shutdown)."""
+        if self.shared is None:
+            return 0
+        wall, mono = time.time(), time.monotonic()
+        with self._lock:
+            items = [(key, value, wall - (mono - stored_at)) for key, (value, stored_at) in self._data.items()]
+        self._write_shared(items)
+        try:
+            self.shared.prune(self.stale_ttl)
+        except Exception:
+            pass
+        return len(items)
+
+    def _refresh_in_background(self, key, loader, fut):
+        if self.background_context is None:
+            return self._load(key, loader, fut)
+        with self.background_context():
+            return self._load(key, loader, fut)
+
+    def refresh(self, key, loader):
+        """Reload ``key`` now while readers keep getting the current value; joins a running load."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+                self._counters["refreshes"] += 1
+        if owner:
+            self._load(key, loader, fut)
+        return fut.result()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop this process's entries (the shared tier is left alone)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def values(self) -> list:
+        """Every cached value (a snapshot), for memory accounting."""
+        with self._lock:
+            return [value for value, _ in self._data.values()]
+
+    def items(self) -> list:
+        """Every ``(key, value)`` pair (a snapshot)."""
+        with self._lock:
+            return [(key, value) for key, (value, _) in self._data.items()]
+
+    def stats(self) -> dict:
+        """Counters plus current size, for sizing ``maxsize`` / ``ttl``."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._data)
+            stats["maxsize"] = self.maxsize
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,47 @@
+# ------------------------------------------------
+# Track cards as one HTML block (one st.markdown call per list instead of ~8 per row)
+# ------------------------------------------------
+from html import escape
+
+CARDS_PER_PAGE = 10
+
+
+def _text(value) -> str:
+    return "" if value is None else escape(str(value))
+
+
+def cards_html(tracks, image_src=None, image_width=120, start=0) -> str:
+    """HTML for a list of track cards, numbered from ``start + 1``.
+
+    ``image_src(url)`` may swap the cover URL (e.g. for a local thumbnail data URI).
+    """
+    parts = ["<div class='card-list'>"]
+    for number, t in enumerate(tracks, start + 1):
+        image = t.get("image")
+        image = image if isinstance(image, str) and image else None
+        if image and image_src is not None:
+            image = image_src(image)
+        cover = (
+            f"<img src='{escape(image)}' width='{image_width}' height='{image_width}' loading='lazy' class='track-cover'>"
+            if image else f"<div class='track-cover' style='width:{image_width}px;height:{image_width}px'></div>"
+        )
+        url = t.get("url")
+        listen = (
+            f"<a href='{escape(url)}' target='_blank'>▶️ Listen on Spotify</a>" if isinstance(url, str) and url else ""
+        )
+        parts.append(
+            "<div class='card track-card'>"
+            f"{cover}"
+            "<div>"
+            f"<div class='track-title'><span class='small-muted'>{number}.</span> {_text(t.get('title'))}</div>"
+            f"<div><strong>{_text(t.get('artist'))}</strong> — {_text(t.get('album'))}</div>"
+            f"<div>📅 {_text(t.get('release_date'))}</div>"
+            f"<div>{listen}</div>"
+            "</div></div>"
+        )
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def page_count(n: int, page_size: int = CARDS_PER_PAGE) -> int:
+    return max(1, (n + page_size - 1) // page_size)
@@ -0,0 +1,185 @@
+# ------------------------------------------------
+# Local persistent track catalog (SQLite + FTS5 full-text index)
+# ------------------------------------------------
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from beatbuddy import data_path, thread_connection
+from beatbuddy.track import Track, intern_track
+
+TRACK_FIELDS = ("id", "title", "artist", "album", "release_date", "url", "image")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    release_date TEXT,
+    url TEXT,
+    image TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_results (
+    key TEXT PRIMARY KEY,
+    track_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    title, artist, album, content='tracks', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts(rowid, title, artist, album) VALUES (new.rowid, new.title, new.artist, new.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album) VALUES ('delete', old.rowid, old.title, old.artist, old.album);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE ON tracks BEGIN
+    INSERT INTO tracks_fts(tracks_fts, rowid, title, artist, album) VALUES ('delete', old.rowid, old.title, old.artist, old.album);
+    INSERT INTO tracks_fts(rowid, title, artist, album) VALUES (new.rowid, new.title, new.artist, new.album);
+END;
+"""
+
+
+def track_id(track) -> str:
+    """Spotify track ID, taken from the track dict or the tail of its URL."""
+    if track.get("id"):
+        return track["id"]
+    url = track.get("url") or ""
+    return url.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0] if "/track/" in url else None
+
+
+def _fts_query(text: str) -> str:
+    # every word must match (as a prefix); quoting keeps FTS syntax out of user input
+    words = [w.replace('"', '""') for w in text.split()]
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class TrackCatalog:
+    """Every track BeatBuddy has seen, keyed by Spotify track ID, plus the
+    track IDs returned for each search so repeated queries can be answered
+    locally.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans
+            self.fts = False
+
+    def _conn(self) -> sqlite3.Connection:
+        return thread_connection(self._local, self.path)
+
+    @staticmethod
+    def _row_to_track(row) -> Track:
+        return intern_track(Track(row["title"], row["artist"], row["album"], row["release_date"], row["url"], row["image"], row["id"]))
+
+    def upsert(self, tracks) -> list:
+        """Insert or refresh tracks; returns their IDs (``None`` for tracks without one)."""
+        now = time.time()
+        ids, rows = [], []
+        for t in tracks:
+            tid = track_id(t)
+            ids.append(tid)
+            if tid:
+                rows.append((tid, t.get("title"), t.get("artist"), t.get("album"), t.get("release_date"), t.get("url"), t.get("image"), now))
+        if rows:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    """INSERT INTO tracks (id, title, artist, album, release_date, url, image, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(id) DO UPDATE SET
+                           title=excluded.title, artist=excluded.artist, album=excluded.album,
+                           release_date=excluded.release_date, url=excluded.url, image=excluded.image,
+                           updated_at=excluded.updated_at""",
+                    rows,
+                )
+        return ids
+
+    def get(self, ids) -> tuple:
+        """Tracks for ``ids`` in the given order; unknown IDs are skipped."""
+        ids = [i for i in ids if i]
+        if not ids:
+            return ()
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT * FROM tracks WHERE id IN ({marks})", chunk):
+                found[row["id"]] = self._row_to_track(row)
+        return tuple(found[i] for i in ids if i in found)
+
+    def store_query(self, key: str, tracks):
+        ids = [i for i in self.upsert(tracks) if i]
+        self._conn().execute(
+            "INSERT OR REPLACE INTO query_results (key, track_ids, fetched_at) VALUES (?, ?, ?)",
+            (key, json.dumps(ids), time.time()),
+        )
+
+    def lookup_query(self, key: str, max_age=None):
+        """Tracks last returned for ``key``, or ``None`` if unknown or older than ``max_age`` seconds."""
+        row = self._conn().execute("SELECT track_ids, fetched_at FROM query_results WHERE key = ?", (key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row["fetched_at"] > max_age):
+            return None
+        return self.get(json.loads(row["track_ids"]))
+
+    def search(self, text: str, limit: int = 10, since=None) -> tuple:
+        """Full-text search over title, artist and album of every known track
+        (only those released in or after year ``since``, if given)."""
+        text = (text or "").strip()
+        if not text:
+            return ()
+        # release dates are ISO strings ("2024", "2024-05-17"), so they compare with the year as text
+        recent, year = (" AND t.release_date >= ?", (str(since),)) if since else ("", ())
+        conn = self._conn()
+        if self.fts:
+            sql = f"""SELECT t.* FROM tracks_fts f JOIN tracks t ON t.rowid = f.rowid
+                      WHERE tracks_fts MATCH ?{recent} ORDER BY f.rank LIMIT ?"""
+            rows = conn.execute(sql, (_fts_query(text), *year, int(limit)))
+        else:
+            like = f"%{text}%"
+            sql = f"""SELECT t.* FROM tracks t
+                      WHERE (t.title LIKE ? OR t.artist LIKE ? OR t.album LIKE ?){recent} LIMIT ?"""
+            rows = conn.execute(sql, (like, like, like, *year, int(limit)))
+        return tuple(self._row_to_track(r) for r in rows)
+
+    def recent(self, limit: int = 1000) -> tuple:
+        """The ``limit`` most recently fetched tracks, newest first."""
+        rows = self._conn().execute("SELECT * FROM tracks ORDER BY updated_at DESC LIMIT ?", (int(limit),))
+        return tuple(self._row_to_track(r) for r in rows)
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Process-wide catalog, or ``None`` when disabled (BEATBUDDY_CATALOG=0) or unavailable."""
+    global _catalog
+    if _catalog is None and os.getenv("BEATBUDDY_CATALOG", "1") != "0":
+        with _catalog_lock:
+            if _catalog is None:
+                try:
+                    _catalog = TrackCatalog(os.getenv("BEATBUDDY_CATALOG_PATH") or data_path("catalog.db"))
+                except sqlite3.Error:
+                    return None
+    return _catalog
@@ -0,0 +1,78 @@
+# ------------------------------------------------
+# Chat history: bounded ring buffer + archive summary, rendered as one HTML block
+# ------------------------------------------------
+import os
+import re
+from collections import Counter, deque
+from html import escape
+
+MAX_MESSAGES = int(os.getenv("BEATBUDDY_CHAT_MAX_MESSAGES", "40"))
+GREETING = "Hello! I'm BeatBuddy. How are you feeling today? Tell me in a few words or paste song lyrics."
+
+_EMPHASIS = re.compile(r"\*([^*\n]+)\*")
+
+
+def _bubble(sender: str, text: str) -> str:
+    body = _EMPHASIS.sub(r"<em>\1</em>", escape(text))
+    return f"<div class='{'user-bubble' if sender == 'user' else 'bot-bubble'}'>{body}</div>"
+
+
+class ChatHistory:
+    """The last ``max_messages`` messages of one session's chat.
+
+    Older messages are passed to ``archive(message)`` (if set) and only
+    counted, so a session's memory and render cost stay flat however long
+    the chat runs. Messages are ``(sender, text, mood)`` tuples.
+    """
+
+    __slots__ = ("messages", "archived", "moods", "archive", "_html")
+
+    def __init__(self, max_messages=MAX_MESSAGES, archive=None, greeting=GREETING):
+        self.messages = deque(maxlen=max_messages)
+        self.archived = 0
+        self.moods = Counter()
+        self.archive = archive
+        self._html = None
+        if greeting:
+            self.add("bot", greeting)
+
+    def add(self, sender: str, text: str, mood: str = None):
+        if len(self.messages) == self.messages.maxlen:
+            oldest = self.messages[0]
+            self.archived += 1
+            if self.archive is not None:
+                try:
+                    self.archive(oldest)
+                except Exception:
+                    pass
+        self.messages.append((sender, text, mood))
+        if mood:
+            self.moods[mood] += 1
+        self._html = None
+
+    def last_user_text(self):
+        return next((text for sender, text, _ in reversed(self.messages) if sender == "user"), None)
+
+    def summary(self) -> str:
+        if not self.archived:
+            return ""
+        text = f"{self.archived} earlier message{'s' if self.archived != 1 else ''} archived"
+        if self.moods:
+            text += " · moods so far: " + ", ".join(f"{m} ×{n}" for m, n in self.moods.most_common())
+        return text
+
+    def html(self) -> str:
+        """The whole chat as one HTML string, rebuilt only after a change."""
+        if self._html is None:
+            summary = self.summary()
+            self._html = (
+                "<div class='card'>"
+                + (f"<div class='small-muted' style='margin-bottom:8px'>{escape(summary)}</div>" if summary else "")
+                + "<div class='chat-container'>"
+                + "".join(_bubble(sender, text) for sender, text, _ in self.messages)
+                + "</div></div>"
+            )
+        return self._html
+
+    def __len__(self):
+        return len(self.messages)
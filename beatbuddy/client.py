@@ -0,0 +1,118 @@
+# ------------------------------------------------
+# Shared Spotify client (one per process, pooled keep-alive connections)
+# ------------------------------------------------
+import os
+import threading
+import time
+
+import requests
+import spotipy
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+from urllib3.util.retry import Retry
+
+from beatbuddy import perf
+
+POOL_SIZE = int(os.getenv("BEATBUDDY_HTTP_POOL_SIZE", "16"))
+REQUEST_TIMEOUT = float(os.getenv("BEATBUDDY_HTTP_TIMEOUT", "10"))
+# refresh the client-credentials token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 5 * 60
+# point the client at another Spotify-compatible endpoint, e.g. benchmarks/fake_spotify.py
+API_URL = os.getenv("BEATBUDDY_SPOTIFY_API_URL")
+TOKEN_URL = os.getenv("BEATBUDDY_SPOTIFY_TOKEN_URL")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class SharedClientCredentials(SpotifyClientCredentials):
+    """Client-credentials manager that is safe to share between threads.
+
+    The token is kept in memory (no ``.cache`` file) and is refreshed once it
+    gets within ``refresh_margin`` seconds of expiry, either by the background
+    refresher or, if that is late, by the first caller that notices.
+    """
+
+    def __init__(self, client_id, client_secret, requests_session=True, refresh_margin=TOKEN_REFRESH_MARGIN):
+        super().__init__(
+            client_id=client_id,
+            client_secret=client_secret,
+            requests_session=requests_session,
+            requests_timeout=REQUEST_TIMEOUT,
+            cache_handler=MemoryCacheHandler(),
+        )
+        self.refresh_margin = refresh_margin
+        if TOKEN_URL:
+            self.OAUTH_TOKEN_URL = TOKEN_URL
+        self._token_lock = threading.Lock()
+
+    def _needs_refresh(self, token_info) -> bool:
+        return not token_info or token_info["expires_at"] - time.time() < self.refresh_margin
+
+    def get_access_token(self, as_dict=False, check_cache=True):
+        with self._token_lock:
+            token_info = self.cache_handler.get_cached_token()
+            if not check_cache or self._needs_refresh(token_info):
+                perf.count("spotify.token_fetches")
+                with perf.phase("spotify.token"):
+                    super().get_access_token(as_dict=False, check_cache=False)
+                token_info = self.cache_handler.get_cached_token()
+        return token_info if as_dict else token_info["access_token"]
+
+    def seconds_until_refresh(self) -> float:
+        token_info = self.cache_handler.get_cached_token()
+        if not token_info:
+            return 0.0
+        return max(0.0, token_info["expires_at"] - time.time() - self.refresh_margin)
+
+
+def _pooled_session() -> requests.Session:
+    session = requests.Session()
+    # connection-level retries only: 429/5xx backoff is beatbuddy.scheduler's job
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status=0,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _refresh_loop(auth_manager):
+    while True:
+        try:
+            auth_manager.get_access_token()
+            time.sleep(max(1.0, auth_manager.seconds_until_refresh()))
+        except Exception:
+            # token endpoint unreachable: callers will retry inline, try again shortly
+            time.sleep(30)
+
+
+def get_shared_client(client_id: str, client_secret: str) -> spotipy.Spotify:
+    """Return the process-wide ``spotipy.Spotify`` client for these credentials.
+
+    The first call builds the client and starts a daemon thread that keeps the
+    token fresh, so sessions never wait on the token endpoint.
+    """
+    key = (client_id, client_secret)
+    sp = _clients.get(key)
+    if sp is not None:
+        return sp
+
+    with _clients_lock:
+        sp = _clients.get(key)
+        if sp is None:
+            session = _pooled_session()
+            auth_manager = SharedClientCredentials(client_id, client_secret, requests_session=session)
+            sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=session, requests_timeout=REQUEST_TIMEOUT)
+            if API_URL:
+                sp.prefix = API_URL.rstrip("/") + "/"
+            threading.Thread(
+                target=_refresh_loop, args=(auth_manager,), name="beatbuddy-token-refresh", daemon=True
+            ).start()
+            _clients[key] = sp
+    return sp
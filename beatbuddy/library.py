@@ -0,0 +1,158 @@
+# ------------------------------------------------
+# Bulk import (pasted track / playlist links -> saved tracks) and streaming export
+# ------------------------------------------------
+import csv
+import io
+import json
+import os
+import re
+
+from beatbuddy import perf
+from beatbuddy.scheduler import spotify_scheduler
+from beatbuddy.search import MARKET, pick_image, submit_fetch
+from beatbuddy.track import Track
+
+TRACKS_PER_REQUEST = 50  # most IDs GET /v1/tracks accepts
+PLAYLIST_PAGE = 100  # largest page GET /v1/playlists/{id}/tracks returns
+# most tracks one paste may import
+MAX_IMPORT = int(os.getenv("BEATBUDDY_MAX_IMPORT", "5000"))
+# only the fields a Track is built from
+PLAYLIST_FIELDS = "total,items(track(id,name,type,is_local,artists(name),album(name,release_date,images),external_urls))"
+EXPORT_FIELDS = ("id", "title", "artist", "album", "release_date", "url", "image")
+
+_LINK = re.compile(r"(?:open\.spotify\.com/(?:intl-[a-z]+(?:-[a-z]+)?/)?|spotify:)(track|playlist)[/:]([A-Za-z0-9]{22})")
+_BARE_ID = re.compile(r"[A-Za-z0-9]{22}")
+
+
+def parse_refs(text: str):
+    """``(track_ids, playlist_ids)`` from pasted links, ``spotify:`` URIs or bare track IDs, deduplicated in order."""
+    tracks, playlists = {}, {}
+    for token in re.split(r"[\s,;]+", text or ""):
+        m = _LINK.search(token)
+        if m:
+            (tracks if m.group(1) == "track" else playlists).setdefault(m.group(2), None)
+        elif _BARE_ID.fullmatch(token):
+            tracks.setdefault(token, None)
+    return list(tracks), list(playlists)
+
+
+def _track(item):
+    if not item or item.get("type", "track") != "track" or item.get("is_local") or not item.get("id"):
+        return None
+    return Track.from_item(item, pick_image((item.get("album") or {}).get("images") or []))
+
+
+def _tracks_batch(sp, ids, market):
+    perf.count("spotify.calls")
+    with perf.phase("spotify.tracks"):
+        results = spotify_scheduler.call(sp.tracks, ids, market=market)
+    return (results or {}).get("tracks") or []
+
+
+def _playlist_page(sp, playlist_id, offset, market):
+    perf.count("spotify.calls")
+    with perf.phase("spotify.playlist"):
+        return spotify_scheduler.call(
+            sp.playlist_items, playlist_id, fields=PLAYLIST_FIELDS, limit=PLAYLIST_PAGE, offset=offset, market=market,
+            additional_types=("track",),
+        )
+
+
+def resolve_refs(sp, text: str, saved=None, market=MARKET, limit=MAX_IMPORT) -> dict:
+    """Tracks for every track / playlist link in ``text``, in as few Spotify requests as the API allows.
+
+    Track IDs are hydrated 50 per request and playlists read 100 items per
+    page, every request at once through the shared scheduler. ``saved(ids)``
+    returns which of ``ids`` are already saved: those are never requested,
+    and playlist entries among them are counted as skipped. Returns
+    ``{"tracks", "skipped", "missing", "requests", "errors"}``; ``missing``
+    lists IDs Spotify did not return.
+    """
+    track_ids, playlist_ids = parse_refs(text)
+    track_ids = track_ids[:limit]
+    saved = saved or (lambda ids: set())
+    skip = set(saved(track_ids)) if track_ids else set()
+    wanted = [t for t in track_ids if t not in skip]
+    batches = [wanted[i:i + TRACKS_PER_REQUEST] for i in range(0, len(wanted), TRACKS_PER_REQUEST)]
+    batch_futures = [submit_fetch(_tracks_batch, sp, batch, market) for batch in batches]
+    first_pages = [submit_fetch(_playlist_page, sp, pid, 0, market) for pid in playlist_ids]
+    requests, errors = len(batches) + len(playlist_ids), []
+
+    # a playlist's first page tells how many more pages to ask for
+    page_futures = []
+    for pid, fut in zip(playlist_ids, first_pages):
+        try:
+            page = fut.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        page_futures.append(fut)
+        total = min(int(page.get("total") or 0), limit)
+        more = [submit_fetch(_playlist_page, sp, pid, offset, market) for offset in range(PLAYLIST_PAGE, total, PLAYLIST_PAGE)]
+        page_futures.extend(more)
+        requests += len(more)
+
+    found = {}
+    for batch, fut in zip(batches, batch_futures):
+        try:
+            items = fut.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        # results come back in request order (a relinked track may carry another ID)
+        for requested, item in zip(batch, items):
+            track = _track(item)
+            if track is not None:
+                found[requested] = track
+    tracks = [found[t] for t in wanted if t in found]
+    missing = [t for t in wanted if t not in found]
+    skipped = len(track_ids) - len(wanted)
+
+    listed = []
+    for fut in page_futures:
+        try:
+            page = fut.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        listed.extend(t for t in (_track((entry or {}).get("track")) for entry in page.get("items") or []) if t is not None)
+    seen = skip | set(found) | {t.id for t in tracks}
+    # one lookup for every playlist entry not already known
+    fresh = list(dict.fromkeys(t.id for t in listed if t.id not in seen))
+    if fresh:
+        skip |= set(saved(fresh))
+        seen |= skip
+    for track in listed:
+        if track.id in seen:
+            skipped += track.id in skip
+            continue
+        seen.add(track.id)
+        tracks.append(track)
+    return {"tracks": tracks[:limit], "skipped": skipped, "missing": missing, "requests": requests, "errors": errors}
+
+
+def import_tracks(sp, store, username: str, text: str, market=MARKET) -> dict:
+    """Save every track linked in ``text`` for ``username``; ``resolve_refs``'s result plus ``added``."""
+    result = resolve_refs(sp, text, lambda ids: store.saved_among(username, ids), market)
+    if result["errors"] and not result["tracks"]:
+        raise result["errors"][0]
+    result["added"] = store.save_tracks(username, result["tracks"])
+    return result
+
+
+def export_saved(store, username: str, fmt: str = "csv"):
+    """Yield ``username``'s saved tracks as CSV or JSONL text, newest first, one store page per chunk."""
+    if fmt == "jsonl":
+        for page in store.iter_saved(username):
+            yield "".join(json.dumps({f: t.get(f) for f in EXPORT_FIELDS}, ensure_ascii=False) + "\n" for t in page)
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for page in store.iter_saved(username):
+        writer.writerows([t.get(f) for f in EXPORT_FIELDS] for t in page)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
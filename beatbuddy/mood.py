@@ -0,0 +1,109 @@
+# ------------------------------------------------
+# Rule-based mood detector (lexicon compiled once at import)
+# ------------------------------------------------
+DEFAULT_MOOD = "chill"
+
+# emoji hints
+EMOJI_MAP = {
+    "😊": "happy",
+    "🙂": "happy",
+    "😄": "happy",
+    "😃": "happy",
+    "😂": "happy",
+    "😍": "romantic",
+    "❤️": "romantic",
+    "💖": "romantic",
+    "😢": "sad",
+    "😭": "sad",
+    "😞": "sad",
+    "🎉": "party",
+    "🎶": "chill",
+    "🔥": "energetic",
+}
+EMOJI_WEIGHT = 2
+
+MOOD_KEYWORDS = {
+    "happy": ["happy", "joy", "joyful", "smile", "sun", "wonderful", "blessed", "cheer", "yay", "glad"],
+    "sad": ["sad", "tears", "cry", "lonely", "broken", "hurt", "goodbye", "miss you", "pain", "sorrow"],
+    "romantic": ["love", "darling", "baby", "forever", "kiss", "heart", "romance", "romantic", "beloved"],
+    "energetic": ["dance", "party", "pump", "energy", "run", "jump", "beat", "rock", "hype"],
+    "chill": ["chill", "calm", "relax", "smooth", "easy", "breathe", "mellow", "laid back"],
+    "party": ["party", "club", "night", "shots", "crowd", "celebrate", "turn up", "fest"],
+}
+MOODS = tuple(MOOD_KEYWORDS)
+
+# a keyword counts as negated when one of these starts less than NEGATION_WINDOW
+# characters before it (first occurrences only)
+NEGATIONS = ["not ", "never ", "no ", "don't ", "cant ", "can't "]
+NEGATION_WINDOW = 12
+
+# used only when every mood scores zero
+FALLBACK_HAPPY = ["!", "yay", "whoa", "yeah"]
+FALLBACK_SAD = ["sad", "cry", "tears"]
+
+TERMS = tuple(dict.fromkeys(
+    list(EMOJI_MAP)
+    + [kw for keys in MOOD_KEYWORDS.values() for kw in keys]
+    + NEGATIONS
+    + FALLBACK_HAPPY
+    + FALLBACK_SAD
+))
+
+
+# term -> ((mood, weight, negatable), ...); "party" feeds both energetic and party
+_TERM_SCORES = {}
+for _e, _m in EMOJI_MAP.items():
+    _TERM_SCORES.setdefault(_e, []).append((_m, EMOJI_WEIGHT, False))
+for _mood, _keys in MOOD_KEYWORDS.items():
+    for _kw in _keys:
+        _TERM_SCORES.setdefault(_kw, []).append((_mood, 1, True))
+_TERM_SCORES = {term: tuple(v) for term, v in _TERM_SCORES.items()}
+_NO_SCORES = dict.fromkeys(MOODS, 0)
+
+
+def first_positions(t: str) -> dict:
+    """Map every lexicon term found in the (lower-cased) text to its first index.
+
+    Each term is searched exactly once with C-level substring search; the old
+    detector re-ran ``find`` for every negation of every matching keyword.
+    """
+    return {term: t.find(term) for term in TERMS if term in t}
+
+
+def analyze_mood(text: str):
+    """Return ``(mood, scores)`` where ``scores`` maps every mood to its score."""
+    scores = dict(_NO_SCORES)
+    if not text or not text.strip():
+        return DEFAULT_MOOD, scores
+
+    first = first_positions(text.lower())
+    if not first:
+        return DEFAULT_MOOD, scores
+
+    neg_positions = [first[n] for n in NEGATIONS if n in first]
+    for term, pos in first.items():
+        contributions = _TERM_SCORES.get(term)
+        if contributions is None:
+            continue
+        negated = any(0 < pos - neg_pos < NEGATION_WINDOW for neg_pos in neg_positions)
+        for mood, weight, negatable in contributions:
+            scores[mood] += -weight if negated and negatable else weight
+
+    # fallback heuristics
+    if not any(scores.values()):
+        if any(w in first for w in FALLBACK_HAPPY):
+            return "happy", scores
+        if any(w in first for w in FALLBACK_SAD):
+            return "sad", scores
+        return DEFAULT_MOOD, scores
+
+    best = max(scores.items(), key=lambda kv: kv[1])[0]
+    return best, scores
+
+
+def mood_scores(text: str) -> dict:
+    return analyze_mood(text)[1]
+
+
+def detect_mood_from_text(text: str) -> str:
+    return analyze_mood(text)[0]
@@ -0,0 +1,128 @@
+# ------------------------------------------------
+# Batch mood classifier (NumPy lexicon matrix) for offline tagging
+# ------------------------------------------------
+import numpy as np
+
+from beatbuddy.mood import (
+    DEFAULT_MOOD,
+    EMOJI_MAP,
+    EMOJI_WEIGHT,
+    FALLBACK_HAPPY,
+    FALLBACK_SAD,
+    MOOD_KEYWORDS,
+    MOODS,
+    NEGATION_WINDOW,
+    NEGATIONS,
+    TERMS,
+)
+
+_TERM_INDEX = {term: i for i, term in enumerate(TERMS)}
+_KEYWORDS = list(dict.fromkeys(kw for keys in MOOD_KEYWORDS.values() for kw in keys))
+_KEYWORD_COLS = np.array([_TERM_INDEX[kw] for kw in _KEYWORDS])
+_NEGATION_COLS = np.array([_TERM_INDEX[n] for n in NEGATIONS])
+_FALLBACK_HAPPY_COLS = np.array([_TERM_INDEX[w] for w in FALLBACK_HAPPY])
+_FALLBACK_SAD_COLS = np.array([_TERM_INDEX[w] for w in FALLBACK_SAD])
+_MOOD_LABELS = np.array(MOODS, dtype=object)
+_MAX_TERM_LEN = max(map(len, TERMS))
+
+
+def lexicon_matrix() -> np.ndarray:
+    """Term-by-mood weight matrix, rows in ``TERMS`` order, columns in ``MOODS`` order.
+
+    Emoji rows carry ``EMOJI_WEIGHT``, keyword rows 1 (``"party"`` has two
+    columns), negation and fallback rows are all zero. At 6 moods the matrix is
+    small enough that a dense array beats any sparse format.
+    """
+    weights = np.zeros((len(TERMS), len(MOODS)), dtype=np.int32)
+    mood_col = {m: j for j, m in enumerate(MOODS)}
+    for e, m in EMOJI_MAP.items():
+        weights[_TERM_INDEX[e], mood_col[m]] += EMOJI_WEIGHT
+    for mood, keys in MOOD_KEYWORDS.items():
+        for kw in keys:
+            weights[_TERM_INDEX[kw], mood_col[mood]] += 1
+    return weights
+
+
+_WEIGHTS = lexicon_matrix()
+
+
+def first_positions(texts) -> np.ndarray:
+    """``(n, len(TERMS))`` matrix of each term's first index in each lower-cased text, -1 when absent.
+
+    All texts are joined (NUL-separated) into one array of code points; every
+    term is then located with whole-array comparisons, narrowing the candidates
+    one character at a time, and ``np.unique`` keeps the first hit per text.
+    """
+    lowered = [t.lower() if isinstance(t, str) else "" for t in texts]
+    n = len(lowered)
+    lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=n)
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(lengths[:-1] + 1, out=starts[1:])
+    joined = "\x00".join(lowered) + "\x00" * _MAX_TERM_LEN
+    codes = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+    # emoji are rare: look for them among the non-ASCII positions only
+    non_ascii = np.flatnonzero(codes >= 0x80)
+
+    first = np.full((n, len(TERMS)), -1, dtype=np.int32)
+    by_first_char = {}
+    for j, term in enumerate(TERMS):
+        hits = by_first_char.get(term[0])
+        if hits is None:
+            c = ord(term[0])
+            if c >= 0x80:
+                hits = non_ascii[codes[non_ascii] == c]
+            else:
+                hits = np.flatnonzero(codes == c)
+            by_first_char[term[0]] = hits
+        for k in range(1, len(term)):
+            hits = hits[codes[hits + k] == ord(term[k])]
+        if hits.size:
+            docs, idx = np.unique(np.searchsorted(starts, hits, side="right") - 1, return_index=True)
+            first[docs, j] = hits[idx] - starts[docs]
+    return first
+
+
+def _score_chunk(texts):
+    first = first_positions(texts)
+    present = first >= 0
+
+    contrib = present.astype(np.int32)
+
+    # a keyword is negated when a negation starts 1..NEGATION_WINDOW-1 chars
+    # before it; only texts containing a negation need the (text, kw, neg) cube
+    rows = np.flatnonzero(present[:, _NEGATION_COLS].any(axis=1))
+    if rows.size:
+        kw_pos = first[rows][:, _KEYWORD_COLS][:, :, None]
+        neg_pos = first[rows][:, _NEGATION_COLS][:, None, :]
+        gap = kw_pos - neg_pos
+        negated = ((neg_pos >= 0) & (gap > 0) & (gap < NEGATION_WINDOW)).any(axis=2)
+        contrib[rows[:, None], _KEYWORD_COLS] *= np.where(negated, -1, 1).astype(np.int32)
+    scores = contrib @ _WEIGHTS
+
+    labels = _MOOD_LABELS[scores.argmax(axis=1)]
+    unscored = ~scores.any(axis=1)
+    labels[unscored] = DEFAULT_MOOD
+    labels[unscored & present[:, _FALLBACK_SAD_COLS].any(axis=1)] = "sad"
+    labels[unscored & present[:, _FALLBACK_HAPPY_COLS].any(axis=1)] = "happy"
+    return labels, scores
+
+
+def detect_moods(texts, chunk_size=50_000):
+    """Classify many texts at once with the same rules as ``detect_mood_from_text``.
+
+    Returns ``(labels, scores)``: an object array of mood names and an
+    ``(n, len(MOODS))`` int32 score matrix whose columns follow ``MOODS``.
+    Non-string entries (``None``, NaN) are treated as empty text. Work is done
+    ``chunk_size`` rows at a time to bound memory on very large inputs.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty(0, dtype=object), np.zeros((0, len(MOODS)), dtype=np.int32)
+
+    label_chunks, score_chunks = [], []
+    for start in range(0, len(texts), chunk_size):
+        labels, scores = _score_chunk(texts[start:start + chunk_size])
+        label_chunks.append(labels)
+        score_chunks.append(scores)
+    return np.concatenate(label_chunks), np.concatenate(score_chunks)
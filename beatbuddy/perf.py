@@ -0,0 +1,228 @@
+# ------------------------------------------------
+# Per-rerun phase timing (BEATBUDDY_PERF=1 enables; off by default)
+# ------------------------------------------------
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.getenv("BEATBUDDY_PERF", "0") == "1"
+# append one JSON object per finished rerun to this file (for the log pipeline)
+PERF_LOG = os.getenv("BEATBUDDY_PERF_LOG")
+# usernames allowed to open the performance panel
+ADMINS = frozenset(u.strip() for u in os.getenv("BEATBUDDY_ADMINS", "").split(",") if u.strip())
+RECENT_RERUNS = 200
+# histogram bucket upper bounds (ms); the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_NULL = contextlib.nullcontext()
+_current = contextvars.ContextVar("beatbuddy_rerun", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds (capped at the max seen)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(float(BUCKETS_MS[i]), round(self.max, 2)) if i < len(BUCKETS_MS) else round(self.max, 2)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max, 2),
+        }
+
+
+class RerunRecord:
+    """Phases, counters and errors of one script run of one session."""
+
+    __slots__ = ("session", "started", "phases", "counters", "errors", "_lock")
+
+    def __init__(self, session: str):
+        self.session = session
+        self.started = time.time()
+        self.phases = {}
+        self.counters = {}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def add_phase(self, name, ms):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    def add_count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_error(self, name, error):
+        with self._lock:
+            self.errors.append(f"{name}: {type(error).__name__}: {error}")
+
+    def to_dict(self, total_ms, complete=True) -> dict:
+        with self._lock:
+            return {
+                "ts": round(self.started, 3),
+                "session": self.session,
+                "total_ms": round(total_ms, 2),
+                "complete": complete,
+                "phases": {k: round(v, 2) for k, v in self.phases.items()},
+                "counters": dict(self.counters),
+                "errors": list(self.errors),
+            }
+
+
+class PerfRegistry:
+    """Process-wide aggregate: histograms per phase, counter totals, recent reruns."""
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._recent = deque(maxlen=RECENT_RERUNS)
+        self._open = {}  # session -> (record, start perf_counter)
+
+    def observe(self, name, ms):
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(ms)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def begin(self, session) -> RerunRecord:
+        record = RerunRecord(session)
+        with self._lock:
+            # the previous run never reached end_rerun (st.stop / rerun / exception)
+            previous = self._open.pop(session, None)
+            self._open[session] = (record, time.perf_counter())
+        if previous is not None:
+            self._finish(*previous, complete=False)
+        return record
+
+    def end(self, record):
+        with self._lock:
+            entry = self._open.get(record.session)
+            if entry is None or entry[0] is not record:
+                return
+            del self._open[record.session]
+        self._finish(*entry, complete=True)
+
+    def _finish(self, record, started, complete):
+        total_ms = (time.perf_counter() - started) * 1000
+        row = record.to_dict(total_ms, complete)
+        if complete:
+            self.observe("rerun", total_ms)
+        with self._lock:
+            self._recent.append(row)
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+            except OSError:
+                pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "phases": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+                "recent": list(self._recent),
+            }
+
+    def export_jsonl(self) -> str:
+        with self._lock:
+            return "".join(json.dumps(row) + "\n" for row in self._recent)
+
+
+registry = PerfRegistry(PERF_LOG)
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        registry.observe(self.name, ms)
+        record = _current.get()
+        if record is not None:
+            record.add_phase(self.name, ms)
+        if exc is not None:
+            count(f"{self.name}.errors")
+            if record is not None:
+                record.add_error(self.name, exc)
+        return False
+
+
+def phase(name: str):
+    """``with phase("search"): ...`` times the block; a shared no-op when disabled."""
+    if not ENABLED:
+        return _NULL
+    return _Phase(name)
+
+
+def count(name: str, n: int = 1):
+    """Bump a counter for the current rerun and the process totals."""
+    if not ENABLED:
+        return
+    registry.count(name, n)
+    record = _current.get()
+    if record is not None:
+        record.add_count(name, n)
+
+
+def begin_rerun(session: str):
+    """Start the record for this script run; returns it (``None`` when disabled)."""
+    if not ENABLED:
+        return None
+    record = registry.begin(session)
+    _current.set(record)
+    return record
+
+
+def end_rerun(record):
+    if record is not None:
+        registry.end(record)
+        _current.set(None)
@@ -0,0 +1,113 @@
+# ------------------------------------------------
+# Recommendations: one cached candidate pool per (mood, language), ranked locally
+# ------------------------------------------------
+import datetime
+import os
+import re
+
+from beatbuddy.search import LATEST_SINCE, MARKET, PAGE_SIZE, interleave, mood_candidate_pools
+
+# tracks fetched per (mood, language); every limit / "latest" setting is cut from this
+POOL_SIZE = int(os.getenv("BEATBUDDY_POOL_SIZE", "100"))
+MAX_PER_ARTIST = 2
+# share of the score that comes from recency (the rest is Spotify's ranking)
+RECENCY_WEIGHT = 0.3
+
+_YEAR = re.compile(r"^(\d{4})")
+
+
+def release_year(date):
+    """Year of a Spotify ``release_date`` ("2024", "2024-05" or "2024-05-17"), or ``None``."""
+    m = _YEAR.match(date) if isinstance(date, str) else None
+    return int(m.group(1)) if m else None
+
+
+def _song_key(track):
+    # "Song - Remastered 2011" / "Song (feat. X)" on another album is the same song
+    title = (track.get("title") or "").lower().split(" - ")[0].split(" (")[0].strip()
+    return (title, (track.get("artist") or "").lower())
+
+
+def rank_tracks(pool, limit, latest=False, since=LATEST_SINCE, max_per_artist=MAX_PER_ARTIST, recency_weight=RECENCY_WEIGHT):
+    """Top ``limit`` tracks of a candidate pool.
+
+    Drops duplicates (same ID / URL, or same title and artist), keeps only
+    tracks released in or after ``since`` when ``latest``, orders by
+    Spotify's ranking blended with recency and allows at most
+    ``max_per_artist`` tracks per artist unless that would leave the list short.
+    """
+    this_year = datetime.date.today().year
+    n = len(pool) or 1
+    scored, seen = [], set()
+    for i, t in enumerate(pool):
+        ident, song = t.get("id") or t.get("url"), _song_key(t)
+        if song in seen or (ident and ident in seen):
+            continue
+        seen.add(song)
+        if ident:
+            seen.add(ident)
+        year = release_year(t.get("release_date"))
+        if latest and (year is None or year < since):
+            continue
+        recency = 1.0 / (1 + max(0, this_year - year)) if year else 0.0
+        scored.append(((1 - recency_weight) * (1 - i / n) + recency_weight * recency, i, t))
+    scored.sort(key=lambda s: (-s[0], s[1]))
+
+    picked, spill, per_artist = [], [], {}
+    for _, _, t in scored:
+        artist = (t.get("artist") or "").lower()
+        if per_artist.get(artist, 0) < max_per_artist:
+            per_artist[artist] = per_artist.get(artist, 0) + 1
+            picked.append(t)
+            if len(picked) >= limit:
+                break
+        else:
+            spill.append(t)
+    if len(picked) < limit:
+        picked.extend(spill[:limit - len(picked)])
+    return tuple(picked)
+
+
+def _recent_count(pool, since=LATEST_SINCE) -> int:
+    return sum(1 for t in pool if (release_year(t.get("release_date")) or 0) >= since)
+
+
+def candidate_pools(sp, pairs, latest, limit, market=MARKET, refresh=False) -> dict:
+    """Candidate pool per (mood, language) pair (an exception if it could not be fetched).
+
+    Pools come from the unfiltered mood query. When ``latest`` and a pool
+    holds fewer than ``limit`` recent tracks, the year-filtered query tops it
+    up, so rarely-recent moods still fill the list.
+    """
+    pools = mood_candidate_pools(sp, pairs, False, POOL_SIZE, market, refresh)
+    if latest:
+        short = [p for p, pool in pools.items() if isinstance(pool, Exception) or _recent_count(pool) < limit]
+        if short:
+            for pair, extra in mood_candidate_pools(sp, short, True, PAGE_SIZE, market, refresh).items():
+                if not isinstance(extra, Exception):
+                    base = pools[pair]
+                    pools[pair] = extra if isinstance(base, Exception) else base + extra
+    return pools
+
+
+def recommend(sp, moods, languages, latest=True, limit=10, market=MARKET):
+    """Top ``limit`` tracks for every (mood, language) pair, filtered and ranked locally.
+
+    Changing ``limit`` or ``latest`` reuses the cached pools, so it costs a
+    local re-rank instead of a Spotify round trip. With several pairs each
+    list is tagged with its ``mood`` and ``language`` and the lists are
+    interleaved; failed pairs are skipped unless all of them fail.
+    """
+    pairs = [(m, lang) for m in moods for lang in languages]
+    pools = candidate_pools(sp, pairs, latest, limit, market)
+    ranked, errors = [], []
+    for pair in pairs:
+        pool = pools[pair]
+        if isinstance(pool, Exception):
+            errors.append(pool)
+            continue
+        tracks = rank_tracks(pool, limit, latest)
+        ranked.append([t.tagged(*pair) for t in tracks] if len(pairs) > 1 else tracks)
+    if errors and not ranked:
+        raise errors[0]
+    return ranked[0] if len(ranked) == 1 and len(pairs) == 1 else interleave(ranked, limit)
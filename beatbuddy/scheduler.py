@@ -0,0 +1,191 @@
+# ------------------------------------------------
+# Process-wide Spotify request scheduler (token bucket, Retry-After, backoff, priorities)
+# ------------------------------------------------
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+from beatbuddy import perf
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("beatbuddy_priority", default=INTERACTIVE)
+
+
+class RateLimited(Exception):
+    """Spotify is rate limiting us and the caller's wait budget ran out."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Spotify rate limit, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+@contextlib.contextmanager
+def background():
+    """Run the enclosed Spotify calls at background priority (prefetch, refresh)."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _retry_after(error):
+    headers = getattr(error, "headers", None) or {}
+    try:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _classify(error):
+    """``(retriable, rate_limited)`` for an exception raised by a Spotify call."""
+    status = getattr(error, "http_status", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    if status == 429:
+        return True, True
+    if status is not None:
+        return status >= 500, False
+    # requests' ConnectionError / Timeout (and spotipy wrapping them) carry no status
+    name = type(error).__name__
+    return name in ("ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout"), False
+
+
+class SpotifyScheduler:
+    """Every Spotify request in the process passes through one of these.
+
+    * a token bucket (``rate`` requests/s, bursts up to ``burst``) paces calls;
+    * a 429 pauses *all* callers until its ``Retry-After`` (plus a little
+      jitter) has passed and empties the bucket;
+    * 5xx and connection errors are retried with full-jitter exponential backoff;
+    * waiting callers are served interactive-first, and background work
+      (warm-up, stale refreshes) never takes the last ``reserve`` tokens;
+    * a caller gives up with :class:`RateLimited` once it would wait longer
+      than ``max_wait`` (interactive) / ``background_max_wait`` seconds.
+    """
+
+    def __init__(
+        self,
+        rate=10.0,
+        burst=20,
+        reserve=4,
+        max_retries=4,
+        base_backoff=0.25,
+        max_backoff=8.0,
+        max_wait=8.0,
+        background_max_wait=120.0,
+    ):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.reserve = min(float(reserve), self.burst - 1)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.background_max_wait = background_max_wait
+        self._cond = threading.Condition()
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._counters = dict.fromkeys(("calls", "retries", "rate_limited", "gave_up", "waited_s"), 0)
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _acquire(self, priority, deadline):
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            started = time.monotonic()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    needed = 1.0 + (self.reserve if priority == BACKGROUND else 0.0)
+                    if self._waiters[0] == entry and now >= self._blocked_until and self._tokens >= needed:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1.0
+                        self._counters["waited_s"] += now - started
+                        return
+                    wait = max(self._blocked_until - now, (needed - self._tokens) / self.rate, 0.001)
+                    if now + wait > deadline:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        self._counters["gave_up"] += 1
+                        raise RateLimited(max(self._blocked_until - now, wait))
+                    self._cond.wait(min(wait, deadline - now))
+            finally:
+                self._cond.notify_all()
+
+    def _block(self, seconds):
+        with self._cond:
+            until = time.monotonic() + seconds + random.uniform(0, min(1.0, seconds * 0.1))
+            self._blocked_until = max(self._blocked_until, until)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def call(self, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` once a request slot is free, retrying transient failures."""
+        priority = _priority.get()
+        deadline = time.monotonic() + (self.max_wait if priority == INTERACTIVE else self.background_max_wait)
+        attempt = 0
+        while True:
+            with perf.phase("scheduler.wait"):
+                self._acquire(priority, deadline)
+            with self._cond:
+                self._counters["calls"] += 1
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                retriable, rate_limited = _classify(e)
+                if not retriable or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                with self._cond:
+                    self._counters["retries"] += 1
+                perf.count("scheduler.retries")
+                if rate_limited:
+                    delay = _retry_after(e) or max(delay, 1.0)
+                    with self._cond:
+                        self._counters["rate_limited"] += 1
+                    perf.count("scheduler.rate_limited")
+                    # everyone waits out the 429, not just this caller
+                    self._block(delay)
+                    if time.monotonic() + delay > deadline:
+                        raise RateLimited(delay) from e
+                    continue
+                if time.monotonic() + delay > deadline:
+                    raise
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            stats = dict(self._counters)
+            stats["waited_s"] = round(stats["waited_s"], 3)
+            stats["tokens"] = round(self._tokens, 2)
+            stats["blocked_for_s"] = round(max(0.0, self._blocked_until - now), 2)
+            stats["waiting_interactive"] = sum(1 for p, _ in self._waiters if p == INTERACTIVE)
+            stats["waiting_background"] = sum(1 for p, _ in self._waiters if p == BACKGROUND)
+        return stats
+
+
+spotify_scheduler = SpotifyScheduler(
+    rate=float(os.getenv("BEATBUDDY_SPOTIFY_RATE", "10")),
+    burst=float(os.getenv("BEATBUDDY_SPOTIFY_BURST", "20")),
+    max_wait=float(os.getenv("BEATBUDDY_SPOTIFY_MAX_WAIT", "8")),
+)
@@ -0,0 +1,397 @@
+# ------------------------------------------------
+# Spotify track search (query building, parsing, shared result cache)
+# ------------------------------------------------
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from beatbuddy import data_path, perf
+from beatbuddy.cache import ResultCache
+from beatbuddy.catalog import get_catalog
+from beatbuddy.scheduler import background, spotify_scheduler
+from beatbuddy.shared_cache import SharedCacheStore
+from beatbuddy.track import FIELDS, Track, intern_track
+
+log = logging.getLogger(__name__)
+
+MARKET = "IN"
+# "latest" means released in or after this year
+LATEST_SINCE = int(os.getenv("BEATBUDDY_LATEST_SINCE", "2022"))
+PAGE_SIZE = 50  # largest page Spotify's /search returns
+MAX_OFFSET = 1000  # Spotify refuses offset + limit beyond this
+LANGUAGES = ("English", "Hindi", "Punjabi")
+# widest album art a card renders (px); Spotify returns 640/300/64 px variants
+CARD_IMAGE_WIDTH = 120
+# a query answered by Spotify within this many seconds is served from the local catalog
+CATALOG_TTL = float(os.getenv("BEATBUDDY_CATALOG_TTL", str(6 * 60 * 60)))
+
+
+def _encode_tracks(tracks) -> str:
+    return json.dumps([[getattr(t, f) for f in FIELDS] for t in tracks], ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode_tracks(data: str) -> tuple:
+    return tuple(intern_track(Track(*row)) for row in json.loads(data))
+
+
+def _shared_tier():
+    """Host-wide tier behind ``search_cache`` (BEATBUDDY_SHARED_CACHE=0 disables it)."""
+    if os.getenv("BEATBUDDY_SHARED_CACHE", "1") == "0":
+        return None
+    try:
+        return SharedCacheStore(
+            os.getenv("BEATBUDDY_SHARED_CACHE_PATH") or data_path("shared_cache.db"), "search", _encode_tracks, _decode_tracks
+        )
+    except sqlite3.Error:
+        return None
+
+
+# One cache for the whole process: every session asking for "happy English latest"
+# shares the same entry, and a burst of identical requests costs one Spotify call.
+# Backed by a SQLite tier every worker process on the host shares: a new or
+# restarted worker starts with the newest entries already in memory, and
+# writes its own back when it shuts down.
+search_cache = ResultCache(
+    maxsize=int(os.getenv("BEATBUDDY_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("BEATBUDDY_CACHE_TTL", str(15 * 60))),
+    stale_ttl=float(os.getenv("BEATBUDDY_CACHE_STALE_TTL", str(6 * 60 * 60))),
+    background_context=background,
+    shared=_shared_tier(),
+)
+if search_cache.shared is not None:
+    search_cache.preload()
+    atexit.register(search_cache.snapshot)
+# bounded pool for concurrent Spotify calls (deep-search pages, fan-out queries)
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BEATBUDDY_FETCH_WORKERS", "8")), thread_name_prefix="beatbuddy-fetch"
+)
+# one queue per local index fed with every track fetched (typeahead, "more like this");
+# see follow_tracks. Searches only enqueue; each index drains its queue on its own thread.
+_track_queues = []
+
+
+def submit_fetch(fn, *args):
+    """Run ``fn(*args)`` on the shared Spotify fetch pool; returns its Future.
+
+    The caller's context (perf rerun record, request priority) is carried into the worker.
+    """
+    return _fetch_pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def key_context(key):
+    """``(mood, language)`` of a search cache key: ("mood" | "search", text, language, ...)."""
+    if not isinstance(key, tuple) or len(key) < 3:
+        return None, None
+    return (key[1] if key[0] == "mood" else None), key[2] or None
+
+
+def follow_tracks(add, catalog_limit, chunk, name):
+    """On a background thread named ``name``, call ``add(tracks, mood, language)`` with
+    every track seen before, then with every track fetched from now on.
+
+    Seen tracks are the search cache (with each query's mood / language),
+    then the catalog's newest ``catalog_limit`` tracks in lists of ``chunk``,
+    so the index keeps answering lookups in between. Fetched tracks wait in
+    a queue, so a search never runs ``add``; a failing ``add`` is logged and
+    the thread carries on.
+    """
+    pending = queue.SimpleQueue()
+    _track_queues.append(pending)
+    threading.Thread(target=_follow, args=(add, pending, catalog_limit, chunk), name=name, daemon=True).start()
+
+
+def _feed(tracks, mood, language):
+    for pending in _track_queues:
+        pending.put((tracks, mood, language))
+
+
+def _follow(add, pending, catalog_limit, chunk):
+    _replay_seen(add, catalog_limit, chunk)
+    while True:
+        _add_logged(add, *pending.get())
+
+
+def _add_logged(add, tracks, mood, language):
+    try:
+        add(tracks, mood, language)
+    except Exception:
+        log.exception("indexing %d track(s) failed", len(tracks))
+
+
+def _replay_seen(add, catalog_limit, chunk):
+    for key, tracks in search_cache.items():
+        _add_logged(add, tracks, *key_context(key))
+    catalog = get_catalog()
+    if catalog is None:
+        return
+    try:
+        tracks = catalog.recent(catalog_limit)
+    except Exception:
+        return
+    for start in range(0, len(tracks), chunk):
+        _add_logged(add, tracks[start:start + chunk], None, None)
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def latest_filter() -> str:
+    """Spotify's year filter for "latest": ``LATEST_SINCE`` through the current year."""
+    return f"year:{LATEST_SINCE}-{datetime.date.today().year}"
+
+
+def mood_query(mood: str, language: str, latest: bool) -> str:
+    query = f"{mood} {language} song"
+    if latest:
+        query += f" {latest_filter()}"
+    return query
+
+
+def text_query(query: str, language: str, latest: bool) -> str:
+    q = query.strip()
+    if language:
+        q = f"{q} language:{language}"
+    if latest:
+        q = f"{q} {latest_filter()}"
+    return q
+
+
+def pick_image(images, min_width=CARD_IMAGE_WIDTH):
+    """URL of the smallest image at least ``min_width`` px wide (largest if none is)."""
+    sized = [img for img in images if img.get("width")]
+    if not sized:
+        return images[0].get("url") if images else None
+    covering = [img for img in sized if img["width"] >= min_width]
+    best = min(covering, key=lambda img: img["width"]) if covering else max(sized, key=lambda img: img["width"])
+    return best.get("url")
+
+
+def parse_tracks(results) -> list:
+    """Turn a ``sp.search`` response into the (interned) Track records used everywhere else."""
+    return [
+        intern_track(Track.from_item(item, pick_image((item.get("album") or {}).get("images") or [])))
+        for item in (results or {}).get("tracks", {}).get("items", [])
+    ]
+
+
+def _search_remote_or_local(sp, catalog_key, text, q, limit, market, offset, latest, refresh=False):
+    """Local catalog first, Spotify on a miss or stale entry, catalog again if Spotify fails.
+
+    A ``refresh`` goes straight to Spotify: the catalog would only hand back
+    the answer the cache is trying to replace.
+    """
+    catalog = get_catalog()
+    if catalog is not None and not refresh:
+        try:
+            with perf.phase("catalog"):
+                tracks = catalog.lookup_query(catalog_key, max_age=CATALOG_TTL)
+            if tracks:
+                perf.count("catalog.hits")
+                return tracks
+        except Exception:
+            catalog = None
+
+    try:
+        perf.count("spotify.calls")
+        with perf.phase("spotify.search"):
+            results = spotify_scheduler.call(sp.search, q=q, type="track", limit=limit, offset=offset, market=market)
+        tracks = tuple(parse_tracks(results))
+    except Exception:
+        # Spotify down or rate limited: any local answer beats an error
+        fallback = None
+        if catalog is not None:
+            try:
+                fallback = catalog.lookup_query(catalog_key) or catalog.search(text, limit, since=LATEST_SINCE if latest else None)
+            except Exception:
+                pass
+        if fallback:
+            perf.count("catalog.fallbacks")
+            return fallback
+        raise
+
+    if catalog is not None:
+        try:
+            catalog.store_query(catalog_key, tracks)
+        except Exception:
+            pass
+    return tracks
+
+
+def _cached_search(sp, key, q, limit, market, offset=0, refresh=False):
+    key = key + (offset,)
+
+    def load(refresh=False):
+        tracks = _search_remote_or_local(sp, repr(key), key[1], q, limit, market, offset, key[3], refresh)
+        _feed(tracks, *key_context(key))
+        return tracks
+
+    def reload():
+        return load(refresh=True)
+
+    if refresh:
+        return search_cache.refresh(key, reload)
+    return search_cache.get_or_load(key, load, reload)
+
+
+def _track_key(track):
+    return track.get("url") or (track.get("title"), track.get("artist"))
+
+
+def _iter_pages(sp, key, q, total, market):
+    """Fetch every page up to ``total`` tracks concurrently and yield them as they land.
+
+    Pages are always requested at ``PAGE_SIZE`` so they share cache entries
+    whatever total was asked for. Each yielded tuple only holds tracks not seen
+    on an earlier page; order is arrival order, not Spotify's ranking.
+    """
+    total = max(1, min(int(total), MAX_OFFSET))
+    futures = [
+        submit_fetch(_cached_search, sp, key, q, PAGE_SIZE, market, offset)
+        for offset in range(0, total, PAGE_SIZE)
+    ]
+    seen = set()
+    try:
+        for fut in as_completed(futures):
+            page = []
+            for track in fut.result():
+                k = _track_key(track)
+                if k not in seen and len(seen) < total:
+                    seen.add(k)
+                    page.append(track)
+            if page:
+                yield tuple(page)
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def search_mood_tracks(sp, mood, language, latest, limit=10, market=MARKET, refresh=False):
+    """Tracks for a mood/language pair, served from the shared cache when possible.
+
+    ``refresh=True`` reloads the entry even if it is still fresh (used by warm-up).
+    """
+    mood, language, latest, limit = _normalize(mood), _normalize(language), bool(latest), int(limit)
+    key = ("mood", mood, language, latest, limit, market)
+    return _cached_search(sp, key, mood_query(mood, language, latest), limit, market, refresh=refresh)
+
+
+def search_text_tracks(sp, query, language, latest, limit=10, market=MARKET):
+    """Tracks for a free-text search, served from the shared cache when possible."""
+    query, language, latest, limit = _normalize(query), _normalize(language), bool(latest), int(limit)
+    key = ("search", query, language, latest, limit, market)
+    return _cached_search(sp, key, text_query(query, language, latest), limit, market)
+
+
+def iter_mood_pages(sp, mood, language, latest, total=200, market=MARKET):
+    """Like ``search_mood_tracks`` for up to ``total`` tracks, yielded page by page."""
+    mood, language, latest = _normalize(mood), _normalize(language), bool(latest)
+    key = ("mood", mood, language, latest, PAGE_SIZE, market)
+    return _iter_pages(sp, key, mood_query(mood, language, latest), total, market)
+
+
+def iter_text_pages(sp, query, language, latest, total=200, market=MARKET):
+    """Like ``search_text_tracks`` for up to ``total`` tracks, yielded page by page."""
+    query, language, latest = _normalize(query), _normalize(language), bool(latest)
+    key = ("search", query, language, latest, PAGE_SIZE, market)
+    return _iter_pages(sp, key, text_query(query, language, latest), total, market)
+
+
+def search_text_pool(sp, query, language, latest, total=200, market=MARKET) -> tuple:
+    """The pages ``iter_text_pages`` fetches, as one deduplicated tuple in Spotify's ranking order.
+
+    Pages still fresh in the cache are read without a thread hop, so
+    re-resolving a deep search on a rerun is a few dict lookups. Failed
+    pages are skipped unless every page fails.
+    """
+    query, language, latest = _normalize(query), _normalize(language), bool(latest)
+    total = max(1, min(int(total), MAX_OFFSET))
+    key = ("search", query, language, latest, PAGE_SIZE, market)
+    q = text_query(query, language, latest)
+    pages = []
+    for offset in range(0, total, PAGE_SIZE):
+        page = search_cache.get_fresh(key + (offset,))
+        if page is None:
+            page = submit_fetch(_cached_search, sp, key, q, PAGE_SIZE, market, offset)
+        pages.append(page)
+    tracks, seen, error = [], set(), None
+    for page in pages:
+        if isinstance(page, Future):
+            try:
+                page = page.result()
+            except Exception as e:
+                error = error or e
+                continue
+        for track in page:
+            k = _track_key(track)
+            if k not in seen and len(tracks) < total:
+                seen.add(k)
+                tracks.append(track)
+    if error is not None and not tracks:
+        raise error
+    return tuple(tracks)
+
+
+def mood_candidate_pools(sp, pairs, latest=False, total=200, market=MARKET, refresh=False) -> dict:
+    """Up to ``total`` tracks per (mood, language) pair, in Spotify's ranking order.
+
+    Every page of every pair is requested at once; pages share cache entries
+    with ``iter_mood_pages``. Maps each pair to its tuple of tracks, or to the
+    exception if none of its pages could be fetched.
+    """
+    total = max(1, min(int(total), MAX_OFFSET))
+    latest = bool(latest)
+    jobs = []
+    for pair in pairs:
+        mood, language = _normalize(pair[0]), _normalize(pair[1])
+        key = ("mood", mood, language, latest, PAGE_SIZE, market)
+        q = mood_query(mood, language, latest)
+        futures = []
+        for offset in range(0, total, PAGE_SIZE):
+            page = None if refresh else search_cache.get_fresh(key + (offset,))
+            if page is None:
+                futures.append(submit_fetch(_cached_search, sp, key, q, PAGE_SIZE, market, offset, refresh))
+            else:
+                # fresh in the cache: skip the thread hop, re-ranking stays local
+                futures.append(Future())
+                futures[-1].set_result(page)
+        jobs.append((pair, futures))
+
+    pools = {}
+    for pair, futures in jobs:
+        tracks, seen, error = [], set(), None
+        for fut in futures:
+            try:
+                page = fut.result()
+            except Exception as e:
+                error = error or e
+                continue
+            for track in page:
+                k = _track_key(track)
+                if k not in seen:
+                    seen.add(k)
+                    tracks.append(track)
+        pools[pair] = tuple(tracks) if tracks or error is None else error
+    return pools
+
+
+def interleave(track_lists, limit):
+    """Round-robin merge: every list's #1, then every list's #2, ... without duplicates."""
+    merged, seen = [], set()
+    for rank in range(max((len(tracks) for tracks in track_lists), default=0)):
+        for tracks in track_lists:
+            if rank < len(tracks):
+                k = _track_key(tracks[rank])
+                if k not in seen:
+                    seen.add(k)
+                    merged.append(tracks[rank])
+                    if len(merged) >= limit:
+                        return tuple(merged)
+    return tuple(merged)
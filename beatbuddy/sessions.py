@@ -0,0 +1,177 @@
+# ------------------------------------------------
+# Per-session state outside st.session_state: small slots, idle cleanup, memory report
+# ------------------------------------------------
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from beatbuddy.chat import GREETING, ChatHistory
+from beatbuddy.track import interned_count
+
+# a session not seen for this long is dropped (its chat archived for logged-in users)
+IDLE_TIMEOUT = float(os.getenv("BEATBUDDY_SESSION_IDLE", str(30 * 60)))
+SWEEP_INTERVAL = 60.0
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class SessionSlot:
+    """Everything one browser session keeps between reruns.
+
+    Results are not held here, only handles to them: ``search`` is the
+    ``(query, language, latest, total, deep)`` key of the last search,
+    resolved through the shared result cache on every rerun; ``similar`` is
+    ``(list key, seed tracks)`` of the open "More like this" list, resolved
+    through the similarity index.
+    """
+
+    __slots__ = ("session_id", "user", "chat", "search", "similar", "last_seen")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.user = None
+        self.chat = ChatHistory()
+        self.search = None
+        self.similar = None
+        self.last_seen = time.monotonic()
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes held by ``obj`` and everything it references that is not in ``seen`` (updated in place).
+
+    Follows containers and ``__slots__`` / ``__dict__`` attributes; functions
+    and classes are counted but not followed.
+    """
+    seen = set() if seen is None else seen
+    total, stack = 0, [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, (str, bytes, int, float, bool, type(None))) or callable(o):
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        else:
+            for name in getattr(type(o), "__slots__", ()):
+                if not name.startswith("__"):
+                    stack.append(getattr(o, name, None))
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+    return total
+
+
+class SessionRegistry:
+    """Process-wide map of session ID -> :class:`SessionSlot`.
+
+    ``touch`` is called once per rerun; every ``SWEEP_INTERVAL`` seconds it
+    also drops slots idle for ``idle_timeout``, handing each to
+    ``on_expire(slot)`` first. Streamlit keeps a session (and our slot) as
+    long as its tab is open, so this is what bounds memory for forgotten tabs.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, on_expire=None):
+        self.idle_timeout = idle_timeout
+        self.on_expire = on_expire
+        self.expired = 0
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def touch(self, session_id: str, user=None) -> SessionSlot:
+        now = time.monotonic()
+        with self._lock:
+            slot = self._slots.get(session_id)
+            if slot is None:
+                slot = self._slots[session_id] = SessionSlot(session_id)
+            slot.last_seen = now
+            slot.user = user
+            sweep = now - self._last_sweep >= SWEEP_INTERVAL
+            if sweep:
+                self._last_sweep = now
+        if sweep:
+            self.sweep(now)
+        return slot
+
+    def sweep(self, now=None) -> int:
+        """Drop idle slots now; returns how many."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [s for s in self._slots.values() if now - s.last_seen >= self.idle_timeout]
+            for slot in idle:
+                del self._slots[slot.session_id]
+            self.expired += len(idle)
+        for slot in idle:
+            if self.on_expire is not None:
+                try:
+                    self.on_expire(slot)
+                except Exception:
+                    pass
+        return len(idle)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def memory_report(self, pools=None, top=20) -> dict:
+        """Bytes per session and per shared pool (``{name: iterable of cached values}``).
+
+        Each pool is measured on its own (objects shared between pools are
+        counted in the first); session bytes exclude everything the pools hold.
+        """
+        now = time.monotonic()
+        with self._lock:
+            slots = list(self._slots.values())
+
+        shared_seen, shared = set(), {}
+        for name, values in (pools or {}).items():
+            values = list(values)
+            before = len(shared_seen)
+            nbytes = deep_size(values, shared_seen) - sys.getsizeof(values)
+            shared[name] = {"entries": len(values), "objects": len(shared_seen) - before - 1, "bytes": nbytes}
+
+        sessions = []
+        for slot in slots:
+            nbytes = deep_size(slot, set(shared_seen))
+            sessions.append(
+                {"session": slot.session_id, "user": slot.user, "bytes": nbytes, "messages": len(slot.chat), "idle_s": round(now - slot.last_seen)}
+            )
+        sessions.sort(key=lambda s: -s["bytes"])
+        total = sum(s["bytes"] for s in sessions)
+        return {
+            "sessions": len(sessions),
+            "session_bytes_total": total,
+            "session_bytes_mean": round(total / len(sessions)) if sessions else 0,
+            "session_bytes_max": sessions[0]["bytes"] if sessions else 0,
+            "expired": self.expired,
+            "idle_timeout_s": self.idle_timeout,
+            "shared": shared,
+            "interned_tracks": interned_count(),
+            "largest_sessions": sessions[:top],
+        }
+
+
+def _archive_expired(slot):
+    if slot.user:
+        from beatbuddy.store import get_user_store
+
+        messages = [m for m in slot.chat.messages if m[1] != GREETING]
+        if messages:
+            get_user_store().archive_chat(slot.user, messages)
+
+
+def get_sessions() -> SessionRegistry:
+    """Process-wide session registry; expired chats of logged-in users go to their archive."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SessionRegistry(on_expire=_archive_expired)
+    return _registry
@@ -0,0 +1,105 @@
+# ------------------------------------------------
+# Host-wide second cache tier (SQLite, WAL): shared by every worker process, kept across restarts
+# ------------------------------------------------
+import ast
+import json
+import sqlite3
+import threading
+import time
+
+from beatbuddy import thread_connection
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_by_age ON entries (namespace, stored_at);
+"""
+
+
+class SharedCacheStore:
+    """Cache entries every BeatBuddy process on the host can read.
+
+    Keys are tuples of plain literals (stored as their ``repr``); values go
+    through ``encode`` / ``decode`` (JSON by default), so nothing executable
+    is ever read back from disk. ``stored_at`` is wall-clock time, so an
+    entry keeps its age when another process, or the next deploy, picks it
+    up.
+    """
+
+    def __init__(self, path: str, namespace: str, encode=json.dumps, decode=json.loads, max_entries=20_000):
+        self.path = path
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # a short timeout: this tier is an optimization and never worth a long wait
+        return thread_connection(self._local, self.path, timeout=2)
+
+    def get(self, key):
+        """``(value, stored_at)`` for ``key``, or ``None``."""
+        row = self._conn().execute(
+            "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?", (self.namespace, repr(key))
+        ).fetchone()
+        return None if row is None else (self.decode(row[0]), row[1])
+
+    def put_many(self, items):
+        """Store ``(key, value, stored_at)`` items; an older copy never overwrites a newer one."""
+        rows = [(self.namespace, repr(key), self.encode(value), stored_at) for key, value, stored_at in items]
+        if not rows:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                """INSERT INTO entries (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at
+                   WHERE excluded.stored_at > entries.stored_at""",
+                rows,
+            )
+
+    def put(self, key, value, stored_at=None):
+        self.put_many([(key, value, time.time() if stored_at is None else stored_at)])
+
+    def recent(self, limit: int, max_age: float) -> list:
+        """Up to ``limit`` ``(key, value, stored_at)`` entries younger than ``max_age`` seconds, newest first."""
+        rows = self._conn().execute(
+            """SELECT key, value, stored_at FROM entries WHERE namespace = ? AND stored_at > ?
+               ORDER BY stored_at DESC LIMIT ?""",
+            (self.namespace, time.time() - max_age, int(limit)),
+        ).fetchall()
+        entries = []
+        for key, value, stored_at in rows:
+            try:
+                entries.append((ast.literal_eval(key), self.decode(value), stored_at))
+            except (ValueError, SyntaxError, TypeError):
+                continue  # written by an incompatible version; it will be overwritten
+        return entries
+
+    def prune(self, max_age: float) -> int:
+        """Drop entries older than ``max_age`` seconds and all but the newest ``max_entries``; returns rows removed."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            before = conn.total_changes
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND stored_at <= ?", (self.namespace, time.time() - max_age))
+            conn.execute(
+                """DELETE FROM entries WHERE namespace = ? AND stored_at < (
+                       SELECT stored_at FROM entries WHERE namespace = ? ORDER BY stored_at DESC LIMIT 1 OFFSET ?)""",
+                (self.namespace, self.namespace, self.max_entries - 1),
+            )
+            return conn.total_changes - before
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
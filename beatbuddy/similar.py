@@ -0,0 +1,287 @@
+# ------------------------------------------------
+# "More like this": NumPy similarity index over every track seen (mood, language, artist, year)
+# ------------------------------------------------
+import os
+import threading
+
+import numpy as np
+
+from beatbuddy.mood import MOODS
+from beatbuddy.mood_batch import detect_moods
+
+# score = W_MOOD * cosine(mood scores) + W_LANGUAGE * same language
+#       + W_ARTIST * same artist + W_YEAR * exp(-|year gap| / YEAR_SCALE)
+W_MOOD = np.float32(1.0)
+W_LANGUAGE = np.float32(0.5)
+W_ARTIST = np.float32(0.6)
+W_YEAR = np.float32(0.4)
+YEAR_SCALE = np.float32(4.0)
+# a track that came back for a mood query counts as this much of that mood
+MOOD_HINT = 2.0
+MAX_PER_ARTIST = 2
+# most tracks held; past this the oldest rows are reused
+MAX_TRACKS = int(os.getenv("BEATBUDDY_SIMILAR_TRACKS", "200000"))
+# release years are stored as 1 + (year - FIRST_YEAR), 0 when unknown
+FIRST_YEAR, LAST_YEAR = 1900, 2100
+
+_MOOD_COL = {m: j for j, m in enumerate(MOODS)}
+_YEARS = np.arange(FIRST_YEAR, LAST_YEAR + 1, dtype=np.float32)
+# _YEAR_KERNEL[a, b]: year closeness of year codes a and b (row / column 0: unknown)
+_YEAR_KERNEL = np.zeros((len(_YEARS) + 1, len(_YEARS) + 1), dtype=np.float32)
+_YEAR_KERNEL[1:, 1:] = np.exp(-np.abs(_YEARS[:, None] - _YEARS[None, :]) / YEAR_SCALE)
+
+
+def _year_code(year) -> int:
+    return 0 if year is None else 1 + min(max(year, FIRST_YEAR), LAST_YEAR) - FIRST_YEAR
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class SimilarityIndex:
+    """Every track seen, one row each, in preallocated NumPy columns.
+
+    A row is the track's mood vector (the mood lexicon applied to its title,
+    album and artist, plus ``MOOD_HINT`` for the mood query that returned
+    it; L2-normalized), a language code, an artist code and a release year.
+    A query, for one seed or a whole saved list, scores every row at once
+    with one matrix-vector product and three lookups, then keeps the best
+    with ``argpartition``. Rows are appended as tracks arrive (arrays double up to
+    ``capacity``, then the oldest rows are reused).
+    """
+
+    def __init__(self, capacity=MAX_TRACKS, initial=1024):
+        self.capacity = capacity
+        size = min(initial, capacity)
+        self._raw = np.zeros((size, len(MOODS)), dtype=np.float32)
+        self._mood = np.zeros((size, len(MOODS)), dtype=np.float32)
+        self._language = np.full(size, -1, dtype=np.int16)
+        self._artist = np.full(size, -1, dtype=np.int32)
+        self._year = np.zeros(size, dtype=np.int16)
+        self._tracks = []  # row -> Track
+        self._rows = {}  # track id -> row
+        self._languages = {}  # lower-cased language -> code
+        self._artists = {}  # lower-cased artist -> code
+        self._next = 0  # next row to reuse once full
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def _code(self, table, value):
+        value = (value or "").strip().lower()
+        if not value:
+            return -1
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        return code
+
+    def _compact_codes(self):
+        """Renumber a code table once reused rows have left it mostly dead codes.
+
+        Live codes never outnumber rows, so a table is rebuilt (keeping only
+        codes some row still holds) when it passes twice the row count.
+        """
+        n = len(self._tracks)
+        for name, table in (("_language", self._languages), ("_artist", self._artists)):
+            if len(table) <= 2 * len(self._year):
+                continue
+            codes = getattr(self, name)
+            live = np.unique(codes[:n])
+            live = live[live >= 0]
+            # one extra slot at the end, so code -1 (unknown) maps to -1
+            remap = np.full(len(table) + 1, -1, dtype=codes.dtype)
+            remap[live] = np.arange(len(live), dtype=codes.dtype)
+            codes[:n] = remap[codes[:n]]
+            values = {code: value for value, code in table.items()}
+            table.clear()
+            table.update((values[code], new) for new, code in enumerate(live.tolist()))
+
+    def _grow(self, need):
+        size = len(self._year)
+        if need <= size or size >= self.capacity:
+            return
+        size = min(self.capacity, max(need, 2 * size))
+        for name, fill in (("_raw", 0), ("_mood", 0), ("_language", -1), ("_artist", -1), ("_year", 0)):
+            old = getattr(self, name)
+            new = np.full((size,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _allocate(self, tracks) -> np.ndarray:
+        self._grow(len(self._tracks) + len(tracks))
+        rows = []
+        for t in tracks:
+            if len(self._tracks) < len(self._year):
+                row = len(self._tracks)
+                self._tracks.append(t)
+            else:
+                row = self._next
+                self._next = (row + 1) % len(self._year)
+                self._rows.pop(self._tracks[row].id, None)
+                self._tracks[row] = t
+            self._rows[t.id] = row
+            rows.append(row)
+        return np.array(rows, dtype=np.int64)
+
+    def add_tracks(self, tracks, mood=None, language=None) -> int:
+        """Index tracks (those without an ID are skipped); returns how many were new.
+
+        ``mood`` / ``language`` describe the query that returned them; a
+        track's own ``mood`` / ``language`` tag wins. Known tracks only pick
+        up a language or mood hint they did not have. The mood lexicon,
+        the slow part, runs before the lock is taken, so queries are not
+        kept waiting while a page is scored.
+        """
+        unseen = list({t.id: t for t in tracks if t is not None and t.get("id") and t.id not in self._rows}.values())
+        scored = dict(zip((t.id for t in unseen), _raw_moods(unseen, mood))) if unseen else {}
+        with self._lock:
+            return self._add(tracks, mood, language, scored)
+
+    def _add(self, tracks, mood=None, language=None, scored=None) -> int:
+        from beatbuddy.recommend import release_year
+
+        new, known = {}, []
+        for t in tracks:
+            if t is None or not t.get("id"):
+                continue
+            if t.id in self._rows:
+                known.append(t)
+            else:
+                new.setdefault(t.id, t)
+        if known and (mood or language):
+            self._update(known, mood, language)
+        if not new:
+            return 0
+        new = list(new.values())
+        scored = dict(scored or {})
+        # tracks another thread indexed since add_tracks looked are in ``known``; ones it added are scored here
+        missing = [t for t in new if t.id not in scored]
+        if missing:
+            scored.update(zip((t.id for t in missing), _raw_moods(missing, mood)))
+        raw = np.array([scored[t.id] for t in new], dtype=np.float32)
+
+        rows = self._allocate(new)
+        self._raw[rows] = raw
+        self._mood[rows] = _unit(raw)
+        self._language[rows] = [self._code(self._languages, t.language or language) for t in new]
+        self._artist[rows] = [self._code(self._artists, t.artist) for t in new]
+        self._year[rows] = [_year_code(release_year(t.release_date)) for t in new]
+        self._compact_codes()
+        return len(new)
+
+    def _update(self, tracks, mood, language):
+        rows = np.array([self._rows[t.id] for t in tracks], dtype=np.int64)
+        if language:
+            code = self._code(self._languages, language)
+            self._language[rows] = np.where(self._language[rows] < 0, code, self._language[rows])
+        col = _MOOD_COL.get(mood)
+        if col is not None:
+            unhinted = rows[self._raw[rows, col] < MOOD_HINT]
+            if unhinted.size:
+                self._raw[unhinted, col] += MOOD_HINT
+                self._mood[unhinted] = _unit(self._raw[unhinted])
+
+    def _scores(self, seeds) -> np.ndarray:
+        """Every row's score summed over the seed rows, without a seeds x tracks block.
+
+        Each term is a sum over seeds: the mood term is one matrix-vector
+        product with the summed seed vectors, the others are lookups of
+        per-code seed counts (years through ``_YEAR_KERNEL``).
+        """
+        n = len(self._tracks)
+        scores = self._mood[:n] @ self._mood[seeds].sum(axis=0)
+        scores *= W_MOOD
+        # one extra zero count at the end, so code -1 (unknown) looks up 0
+        for codes, table, weight in ((self._language, self._languages, W_LANGUAGE), (self._artist, self._artists, W_ARTIST)):
+            seed_codes = codes[seeds]
+            counts = np.bincount(seed_codes[seed_codes >= 0], minlength=len(table) + 1).astype(np.float32)
+            counts[-1] = 0
+            scores += weight * counts[codes[:n]]
+        years = np.bincount(self._year[seeds], minlength=len(_YEAR_KERNEL)).astype(np.float32)
+        scores += W_YEAR * (_YEAR_KERNEL @ years)[self._year[:n]]
+        return scores
+
+    def _seed_rows(self, seeds) -> np.ndarray:
+        seeds = [t for t in seeds if t is not None and t.get("id")]
+        self._add([t for t in seeds if t.id not in self._rows])
+        return np.array(list(dict.fromkeys(self._rows[t.id] for t in seeds if t.id in self._rows)), dtype=np.int64)
+
+    def _top(self, scores, k, seeds, exclude) -> tuple:
+        from beatbuddy.recommend import _song_key
+
+        skip = {_song_key(self._tracks[r]) for r in seeds}
+        drop = [self._rows[i] for i in exclude if i in self._rows]
+        scores[seeds] = -np.inf
+        scores[drop] = -np.inf
+        m = min(len(scores), (k + len(skip)) * 4 + 8)
+        best = np.argpartition(-scores, m - 1)[:m] if m < len(scores) else np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        picked, spill, per_artist = [], [], {}
+        for r in best:
+            if scores[r] == -np.inf:
+                break
+            t = self._tracks[r]
+            key = _song_key(t)
+            if key in skip:
+                continue
+            skip.add(key)
+            if per_artist.get(key[1], 0) < MAX_PER_ARTIST:
+                per_artist[key[1]] = per_artist.get(key[1], 0) + 1
+                picked.append(t)
+                if len(picked) >= k:
+                    break
+            else:
+                spill.append(t)
+        picked.extend(spill[:k - len(picked)])
+        return tuple(picked)
+
+    def similar(self, seeds, k=10, exclude=()) -> tuple:
+        """Up to ``k`` tracks most like ``seeds`` (one Track or several: closest on average).
+
+        Seeds not in the index yet are added first. Never returns a seed,
+        another version of a seed's song, or a track whose ID is in ``exclude``.
+        """
+        seeds = [seeds] if not isinstance(seeds, (list, tuple)) else seeds
+        with self._lock:
+            rows = self._seed_rows(seeds)
+            if not rows.size:
+                return ()
+            return self._top(self._scores(rows), k, rows, set(exclude))
+
+    def get(self, track_id):
+        with self._lock:
+            row = self._rows.get(track_id)
+            return None if row is None else self._tracks[row]
+
+
+def _raw_moods(tracks, mood) -> np.ndarray:
+    """Unnormalized mood rows: the lexicon on title, album and artist, plus ``MOOD_HINT``."""
+    _, scores = detect_moods([f"{t.title or ''} {t.album or ''} {t.artist or ''}" for t in tracks])
+    raw = np.maximum(scores, 0).astype(np.float32)
+    hints = [_MOOD_COL.get(t.mood or mood) for t in tracks]
+    hinted = [i for i, col in enumerate(hints) if col is not None]
+    raw[hinted, [hints[i] for i in hinted]] += MOOD_HINT
+    return raw
+
+
+def _unit(vectors) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def get_similar_index() -> SimilarityIndex:
+    """Process-wide index. A background thread adds the tracks seen earlier, then every
+    search result from then on; seeds of a query are always added before it runs."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from beatbuddy.search import follow_tracks
+
+                _index = SimilarityIndex()
+                follow_tracks(_index.add_tracks, _index.capacity // 2, 5000, "beatbuddy-similar")
+    return _index
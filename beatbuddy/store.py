@@ -0,0 +1,200 @@
+# ------------------------------------------------
+# Persistent users + saved tracks (SQLite, WAL mode)
+# ------------------------------------------------
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from beatbuddy import data_path, thread_connection
+from beatbuddy.catalog import track_id
+from beatbuddy.track import Track
+
+PBKDF2_ROUNDS = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    salt BLOB NOT NULL,
+    password_hash BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS saved_tracks (
+    username TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    release_date TEXT,
+    url TEXT,
+    image TEXT,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (username, track_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS saved_tracks_by_time ON saved_tracks (username, saved_at DESC, track_id);
+CREATE TABLE IF NOT EXISTS chat_archive (
+    username TEXT NOT NULL,
+    archived_at REAL NOT NULL,
+    sender TEXT NOT NULL,
+    text TEXT NOT NULL,
+    mood TEXT
+);
+CREATE INDEX IF NOT EXISTS chat_archive_by_user ON chat_archive (username, archived_at);
+"""
+
+
+def _hash_password(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ROUNDS)
+
+
+def saved_key(track) -> str:
+    """Key a saved track by its Spotify ID; tracks without one fall back to a title/artist hash."""
+    tid = track_id(track)
+    if tid:
+        return tid
+    raw = f"{track.get('title')}|{track.get('artist')}|{track.get('album')}"
+    return "local:" + hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class UserStore:
+    """Users and their saved tracks, shared by every session and kept across restarts.
+
+    Saved tracks are keyed by ``(username, track_id)``, so saving twice is a
+    no-op, membership and removal are index lookups, and the dashboard reads
+    one page at a time newest-first.
+    """
+
+    def __init__(self, path: str, seed_users=None):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        for username, password in (seed_users or {}).items():
+            if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is None:
+                self.register(username, password)
+
+    def _conn(self) -> sqlite3.Connection:
+        return thread_connection(self._local, self.path)
+
+    # ---- users ----
+    def register(self, username: str, password: str) -> bool:
+        if not username or not password:
+            return False
+        salt = secrets.token_bytes(16)
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO users (username, salt, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            (username, salt, _hash_password(password, salt), time.time()),
+        )
+        return cur.rowcount == 1
+
+    def authenticate(self, username: str, password: str) -> bool:
+        row = self._conn().execute("SELECT salt, password_hash FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None or password is None:
+            return False
+        return hmac.compare_digest(row["password_hash"], _hash_password(password, row["salt"]))
+
+    # ---- saved tracks ----
+    def save_tracks(self, username: str, tracks) -> int:
+        """Save tracks for ``username``; returns how many were new."""
+        now = time.time()
+        # a microsecond apart, so a batch keeps its order on the newest-first dashboard
+        rows = [
+            (username, saved_key(t), t.get("title"), t.get("artist"), t.get("album"), t.get("release_date"), t.get("url"), t.get("image"), now - i * 1e-6)
+            for i, t in enumerate(tracks)
+        ]
+        if not rows:
+            return 0
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            before = conn.total_changes
+            conn.executemany(
+                """INSERT OR IGNORE INTO saved_tracks
+                   (username, track_id, title, artist, album, release_date, url, image, saved_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def save_track(self, username: str, track) -> bool:
+        return self.save_tracks(username, [track]) == 1
+
+    def remove_track(self, username: str, track_id: str) -> bool:
+        cur = self._conn().execute("DELETE FROM saved_tracks WHERE username = ? AND track_id = ?", (username, track_id))
+        return cur.rowcount == 1
+
+    def saved_among(self, username: str, track_ids) -> set:
+        """Those of ``track_ids`` that ``username`` has saved (cost follows the IDs, not the library)."""
+        ids = list(dict.fromkeys(i for i in track_ids if i))
+        conn = self._conn()
+        saved = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            saved.update(
+                r[0] for r in conn.execute(
+                    f"SELECT track_id FROM saved_tracks WHERE username = ? AND track_id IN ({marks})", (username, *chunk)
+                )
+            )
+        return saved
+
+    def saved_count(self, username: str) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM saved_tracks WHERE username = ?", (username,)).fetchone()[0]
+
+    def saved_page(self, username: str, offset: int = 0, limit: int = 10) -> list:
+        """One page of saved tracks, newest first."""
+        rows = self._conn().execute(
+            """SELECT track_id, title, artist, album, release_date, url, image FROM saved_tracks
+               WHERE username = ? ORDER BY saved_at DESC, track_id LIMIT ? OFFSET ?""",
+            (username, int(limit), int(offset)),
+        )
+        return [Track(r["title"], r["artist"], r["album"], r["release_date"], r["url"], r["image"], r["track_id"]) for r in rows]
+
+    def iter_saved(self, username: str, batch: int = 500):
+        """Every saved track, newest first, as lists of up to ``batch`` Tracks (keyset-paged, so no OFFSET scans)."""
+        after = None
+        while True:
+            if after is None:
+                rows = self._conn().execute(
+                    """SELECT track_id, title, artist, album, release_date, url, image, saved_at FROM saved_tracks
+                       WHERE username = ? ORDER BY saved_at DESC, track_id LIMIT ?""",
+                    (username, int(batch)),
+                ).fetchall()
+            else:
+                rows = self._conn().execute(
+                    """SELECT track_id, title, artist, album, release_date, url, image, saved_at FROM saved_tracks
+                       WHERE username = ? AND (saved_at < ? OR (saved_at = ? AND track_id > ?))
+                       ORDER BY saved_at DESC, track_id LIMIT ?""",
+                    (username, after[0], after[0], after[1], int(batch)),
+                ).fetchall()
+            if not rows:
+                return
+            yield [Track(r["title"], r["artist"], r["album"], r["release_date"], r["url"], r["image"], r["track_id"]) for r in rows]
+            after = (rows[-1]["saved_at"], rows[-1]["track_id"])
+
+    # ---- chat archive ----
+    def archive_chat(self, username: str, messages):
+        """Append ``(sender, text, mood)`` messages that scrolled out of a session's chat."""
+        now = time.time()
+        rows = [(username, now, sender, text, mood) for sender, text, mood in messages]
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT INTO chat_archive (username, archived_at, sender, text, mood) VALUES (?, ?, ?, ?, ?)", rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store() -> UserStore:
+    """Process-wide user store (BEATBUDDY_USERS_DB overrides the path); seeds demo/demo."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UserStore(os.getenv("BEATBUDDY_USERS_DB") or data_path("users.db"), seed_users={"demo": "demo"})
+    return _store
@@ -0,0 +1,208 @@
+# ------------------------------------------------
+# Headless bulk mood tagging: stream JSONL / CSV through a process pool
+# ------------------------------------------------
+# Usage:
+#    python -m beatbuddy.tagger lyrics.jsonl -o tagged.jsonl
+#    python -m beatbuddy.tagger chats.csv.gz --text-field message --scores -o - | gzip > tagged.csv.gz
+#    python -m beatbuddy.tagger playlists.jsonl --resolve 5 --language Hindi -o tagged.jsonl
+#
+# Rows are read and written in chunks; at most 2 x workers chunks are in
+# flight, so memory stays flat whatever the input size. Workers parse,
+# classify (beatbuddy.mood_batch, same rules as detect_mood_from_text) and
+# serialize their chunk, so the parent only moves bytes.
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from beatbuddy.mood import MOODS
+
+CHUNK_ROWS = 20_000
+
+_worker = {}
+
+
+def _open(path, mode):
+    """Open ``path`` (``-`` for stdin/stdout, ``.gz`` transparently) in binary ``mode``."""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin.buffer if "r" in mode else sys.stdout.buffer)
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _init_worker(text_field, with_scores, tracks_by_mood):
+    _worker.update(text_field=text_field, with_scores=with_scores, tracks_by_mood=tracks_by_mood)
+
+
+def _label(texts):
+    from beatbuddy.mood_batch import detect_moods
+
+    return detect_moods(texts)
+
+
+def _tag_jsonl_chunk(lines):
+    """Raw JSONL lines -> (tagged JSONL bytes, rows, bad rows)."""
+    field, with_scores, tracks = _worker["text_field"], _worker["with_scores"], _worker["tracks_by_mood"]
+    rows, bad = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            bad += 1
+            continue
+        if isinstance(row, dict):
+            rows.append(row)
+        else:
+            bad += 1
+    labels, scores = _label([row.get(field) for row in rows])
+    out = []
+    for i, row in enumerate(rows):
+        mood = labels[i]
+        row["mood"] = mood
+        if with_scores:
+            row["mood_scores"] = dict(zip(MOODS, scores[i].tolist()))
+        if tracks is not None:
+            row["tracks"] = tracks.get(mood, [])
+        out.append(json.dumps(row, ensure_ascii=False))
+    data = ("\n".join(out) + "\n").encode() if out else b""
+    return data, len(rows), bad
+
+
+def _tag_csv_chunk(rows):
+    """CSV rows (lists, text column index in ``text_field``) -> (tagged CSV bytes, rows, bad rows)."""
+    col, with_scores, tracks = _worker["text_field"], _worker["with_scores"], _worker["tracks_by_mood"]
+    labels, scores = _label([row[col] if col < len(row) else None for row in rows])
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for i, row in enumerate(rows):
+        mood = labels[i]
+        extra = [mood]
+        if with_scores:
+            extra += scores[i].tolist()
+        if tracks is not None:
+            extra.append(" | ".join(f"{t['title']} — {t['artist']}" for t in tracks.get(mood, [])))
+        writer.writerow(row + extra)
+    return buf.getvalue().encode(), len(rows), 0
+
+
+def resolve_tracks(language, latest, limit):
+    """Top ``limit`` recommendations per mood through the cached search path (needs Spotify credentials)."""
+    from beatbuddy.client import get_shared_client
+    from beatbuddy.recommend import recommend
+
+    sp = get_shared_client(os.environ["SPOTIFY_CLIENT_ID"], os.environ["SPOTIFY_CLIENT_SECRET"])
+    return {
+        mood: [{"id": t.id, "title": t.title, "artist": t.artist, "url": t.url} for t in recommend(sp, [mood], [language], latest, limit)]
+        for mood in MOODS
+    }
+
+
+def _run(chunks, tag_chunk, out, workers, initargs, report):
+    """Tag ``chunks`` in order with up to ``2 * workers`` in flight; returns (rows, bad)."""
+    rows = bad = 0
+    if workers <= 0:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            data, n, b = tag_chunk(chunk)
+            out.write(data)
+            rows, bad = rows + n, bad + b
+            report(rows)
+        return rows, bad
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        inflight = deque()
+        for chunk in chunks:
+            inflight.append(pool.submit(tag_chunk, chunk))
+            while len(inflight) >= 2 * workers:
+                data, n, b = inflight.popleft().result()
+                out.write(data)
+                rows, bad = rows + n, bad + b
+                report(rows)
+        while inflight:
+            data, n, b = inflight.popleft().result()
+            out.write(data)
+            rows, bad = rows + n, bad + b
+            report(rows)
+    return rows, bad
+
+
+def tag_file(src, dst, fmt=None, text_field="text", workers=None, chunk_rows=CHUNK_ROWS, with_scores=False, tracks_by_mood=None, progress=None):
+    """Tag every row of ``src`` into ``dst``; returns ``{"rows", "bad_rows", "seconds", "rows_per_s"}``."""
+    fmt = fmt or ("csv" if src.removesuffix(".gz").endswith(".csv") else "jsonl")
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    started = time.perf_counter()
+    last = [started]
+
+    def report(rows):
+        now = time.perf_counter()
+        if progress is not None and now - last[0] >= 5:
+            last[0] = now
+            progress(rows, now - started)
+
+    with _open(src, "rb") as raw_in, _open(dst, "wb") as out:
+        if fmt == "jsonl":
+            chunks = iter(lambda: list(islice(raw_in, chunk_rows)), [])
+            rows, bad = _run(chunks, _tag_jsonl_chunk, out, workers, (text_field, with_scores, tracks_by_mood), report)
+        else:
+            reader = csv.reader(io.TextIOWrapper(raw_in, encoding="utf-8", newline=""))
+            header = next(reader, None)
+            if header is None:
+                rows = bad = 0
+            else:
+                if text_field not in header:
+                    raise ValueError(f"CSV has no {text_field!r} column (columns: {', '.join(header)})")
+                extra = ["mood"] + ([f"score_{m}" for m in MOODS] if with_scores else []) + (["tracks"] if tracks_by_mood is not None else [])
+                buf = io.StringIO()
+                csv.writer(buf).writerow(header + extra)
+                out.write(buf.getvalue().encode())
+                chunks = iter(lambda: list(islice(reader, chunk_rows)), [])
+                initargs = (header.index(text_field), with_scores, tracks_by_mood)
+                rows, bad = _run(chunks, _tag_csv_chunk, out, workers, initargs, report)
+        out.flush()
+
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "bad_rows": bad, "seconds": round(seconds, 3), "rows_per_s": round(rows / seconds) if seconds else 0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m beatbuddy.tagger", description="Tag texts in a JSONL / CSV file with BeatBuddy moods.")
+    parser.add_argument("input", help="JSONL or CSV file (optionally .gz); - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (same format; .gz compresses); default stdout")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from the file name, else jsonl)")
+    parser.add_argument("--text-field", default="text", help="JSON key / CSV column holding the text")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores; 0 = in-process)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--scores", action="store_true", help="also write the per-mood scores")
+    parser.add_argument("--resolve", type=int, default=0, metavar="N", help="attach N recommended tracks for each row's mood")
+    parser.add_argument("--language", default="English", help="language for --resolve")
+    parser.add_argument("--all-years", action="store_true", help="with --resolve, do not restrict to latest releases")
+    args = parser.parse_args(argv)
+
+    tracks = resolve_tracks(args.language, not args.all_years, args.resolve) if args.resolve else None
+
+    def progress(rows, seconds):
+        print(f"  {rows:,} rows  {rows / seconds:,.0f} rows/s", file=sys.stderr, flush=True)
+
+    result = tag_file(
+        args.input, args.output, args.format, args.text_field, args.workers, args.chunk_rows, args.scores, tracks, progress
+    )
+    print(
+        f"tagged {result['rows']:,} rows in {result['seconds']:.1f}s ({result['rows_per_s']:,} rows/s), "
+        f"{result['bad_rows']:,} unreadable rows skipped",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
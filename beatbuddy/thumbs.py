@@ -0,0 +1,137 @@
+# ------------------------------------------------
+# Local album-art thumbnail cache (fetch once, downscale, size-bounded disk LRU)
+# ------------------------------------------------
+import base64
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from beatbuddy import data_path
+
+# thumbnails are stored at this multiple of the rendered width so they stay sharp on HiDPI screens
+THUMB_SCALE = 2
+THUMB_QUALITY = 85
+FETCH_TIMEOUT = 5
+
+
+class ThumbnailCache:
+    """Downscaled JPEG covers on disk, evicted least-recently-used past ``max_bytes``."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="beatbuddy-thumbs")
+        self._index = OrderedDict()  # file name -> size, oldest first
+        self._bytes = 0
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._bytes += size
+        self.hits = self.misses = self.evictions = 0
+
+    def _name(self, url: str, width: int) -> str:
+        return hashlib.sha1(f"{url}|{width}".encode()).hexdigest() + ".jpg"
+
+    def get(self, url: str, width: int):
+        """Local path of the ``width``-px thumbnail for ``url``, fetching it on first use.
+
+        Returns ``None`` if the cover cannot be fetched or decoded.
+        """
+        name = self._name(url, width)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+                self.hits += 1
+                return path
+            self.misses += 1
+
+        from PIL import Image
+
+        try:
+            resp = self._session.get(url, timeout=FETCH_TIMEOUT)
+            resp.raise_for_status()
+            img = Image.open(io.BytesIO(resp.content)).convert("RGB")
+            img.thumbnail((width * THUMB_SCALE, width * THUMB_SCALE))
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=THUMB_QUALITY, optimize=True)
+        except Exception:
+            return None
+
+        data = buf.getvalue()
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                old, size = self._index.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+        return path
+
+    def data_uri(self, url: str, width: int):
+        """The thumbnail inlined as a ``data:`` URI, for HTML the browser cannot fetch from disk."""
+        path = self.get(url, width)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+        except OSError:
+            return None
+
+    def prefetch(self, urls, width: int):
+        """Fetch every missing thumbnail concurrently (call before rendering a list of cards)."""
+        urls = [u for u in dict.fromkeys(urls) if isinstance(u, str) and u]
+        list(self._pool.map(lambda u: self.get(u, width), urls))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_thumbs = None
+_thumbs_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Process-wide thumbnail cache, or ``None`` unless BEATBUDDY_THUMBS=1 and Pillow is installed
+    (without it, cards keep Spotify's own cover URLs)."""
+    global _thumbs
+    if _thumbs is None and os.getenv("BEATBUDDY_THUMBS", "0") == "1":
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            return None
+        with _thumbs_lock:
+            if _thumbs is None:
+                max_mb = float(os.getenv("BEATBUDDY_THUMB_CACHE_MB", "64"))
+                _thumbs = ThumbnailCache(data_path("thumbs"), int(max_mb * 1024 * 1024))
+    return _thumbs
@@ -0,0 +1,95 @@
+# ------------------------------------------------
+# Track record shared by search, catalog, store and cards
+# ------------------------------------------------
+import threading
+import weakref
+
+FIELDS = ("title", "artist", "album", "release_date", "url", "image", "id", "mood", "language")
+
+
+class Track:
+    """One search result: a small ``__slots__`` record instead of a dict or a DataFrame row.
+
+    Tracks are shared between sessions through the caches, so treat them as
+    immutable and use :meth:`tagged` to derive a copy. ``get`` / ``[]`` keep
+    the old dict-style access working.
+    """
+
+    __slots__ = FIELDS + ("__weakref__",)
+
+    def __init__(self, title=None, artist=None, album=None, release_date=None, url=None, image=None, id=None, mood=None, language=None):
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.release_date = release_date
+        self.url = url
+        self.image = image
+        self.id = id
+        self.mood = mood
+        self.language = language
+
+    @classmethod
+    def from_item(cls, item, image=None):
+        """Build a Track from one item of a Spotify ``sp.search`` response."""
+        album = item.get("album") or {}
+        return cls(
+            item.get("name"),
+            (item.get("artists") or [{}])[0].get("name"),
+            album.get("name"),
+            album.get("release_date"),
+            (item.get("external_urls") or {}).get("spotify"),
+            image,
+            item.get("id"),
+        )
+
+    @classmethod
+    def from_mapping(cls, data):
+        return data if isinstance(data, cls) else cls(**{f: data.get(f) for f in FIELDS})
+
+    def tagged(self, mood=None, language=None):
+        return Track(self.title, self.artist, self.album, self.release_date, self.url, self.image, self.id, mood, language)
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in FIELDS else default
+
+    def __getitem__(self, name):
+        if name not in FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def to_dict(self) -> dict:
+        return {f: getattr(self, f) for f in FIELDS}
+
+    def __eq__(self, other):
+        return isinstance(other, Track) and all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Track({self.title!r}, {self.artist!r}, id={self.id!r})"
+
+
+# Spotify ID -> the one live Track with that content (dropped once no cache holds it)
+_interned = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+
+def intern_track(track: Track) -> Track:
+    """The shared Track equal to ``track``, registering ``track`` if there is none.
+
+    The same song comes back from many queries (mood pools, text searches,
+    catalog lookups); interning keeps one object per song however many
+    cache entries and sessions point at it.
+    """
+    if track.id is None:
+        return track
+    with _intern_lock:
+        shared = _interned.get(track.id)
+        if shared is not None and shared == track:
+            return shared
+        _interned[track.id] = track
+    return track
+
+
+def interned_count() -> int:
+    return len(_interned)
@@ -0,0 +1,226 @@
+# ------------------------------------------------
+# Typeahead: in-memory prefix index of artists, titles, albums and mood/genre terms
+# ------------------------------------------------
+import bisect
+import difflib
+import heapq
+import os
+import threading
+import unicodedata
+
+from beatbuddy.mood import MOOD_KEYWORDS
+
+GENRES = (
+    "pop", "rock", "hip hop", "rap", "r&b", "indie", "edm", "lofi", "jazz", "classical",
+    "bollywood", "punjabi", "bhangra", "sufi", "ghazal", "devotional", "acoustic", "k-pop",
+)
+# earlier kinds win ties between equally common terms
+KINDS = ("artist", "title", "mood", "genre", "album")
+MIN_CHARS = 2
+# prefixes up to this long match the most keys, so each keeps a ready-made top list
+HEAD_CHARS = 4
+HEAD_SIZE = 16
+# a term is also found by the prefixes of its next few words ("singh" -> "Arijit Singh")
+WORD_KEYS = 3
+# new keys wait in a small sorted array; it is folded into the main one once this large
+# (or a quarter of the main array's size, whichever is more)
+MERGE_EVERY = 4000
+MAX_TERMS = int(os.getenv("BEATBUDDY_TYPEAHEAD_TERMS", "200000"))
+# "did you mean" needs at least this difflib ratio
+CORRECTION_CUTOFF = 0.8
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def normalize_term(text) -> str:
+    """Lowercase, accents stripped, whitespace collapsed: "Beyoncé  " -> "beyonce"."""
+    text = str(text or "")
+    if text.isascii():
+        return " ".join(text.lower().split())
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).split())
+
+
+def _keys_of(norm: str) -> list:
+    words = norm.split(" ")
+    return [norm] + [" ".join(words[i:]) for i in range(1, min(len(words), WORD_KEYS + 1))]
+
+
+class PrefixIndex:
+    """Sorted arrays of ``(key, term id)`` pairs, looked up with ``bisect``.
+
+    Every term (an artist, title, album, mood or genre name) keeps its display
+    text, kind and weight: how often it has turned up in results, so the
+    artists and songs people actually get back rank first. New keys go to a
+    small sorted array searched alongside the main one, and are folded in by
+    whoever adds the keys that make it too large, so a lookup never pays for
+    a big merge. Prefixes of up to ``HEAD_CHARS`` characters, whose ranges
+    span thousands of keys, are answered from top lists kept up to date on
+    every add instead of by a scan.
+    """
+
+    def __init__(self, max_terms=MAX_TERMS):
+        self.max_terms = max_terms
+        self._terms = []  # id -> [display, kind, weight]
+        self._ids = {}  # (kind, normalized) -> id
+        self._keys = []  # sorted (key, id)
+        self._fresh = []  # sorted (key, id), not yet in _keys
+        self._pending = []  # unsorted (key, id), not yet in _fresh
+        self._heads = {}  # short prefix -> [(rank, id)], best first
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def add(self, text, kind, weight=1):
+        norm = normalize_term(text)
+        if not norm:
+            return
+        with self._lock:
+            self._add(text, norm, kind, weight)
+
+    def add_tracks(self, tracks):
+        """Index the artist, title and album of every track."""
+        with self._lock:
+            for t in tracks:
+                for kind in ("artist", "title", "album"):
+                    value = t.get(kind)
+                    norm = normalize_term(value)
+                    if norm:
+                        self._add(value, norm, kind, 1)
+            self._memo.clear()
+            if len(self._fresh) + len(self._pending) >= max(MERGE_EVERY, len(self._keys) // 4):
+                self._merge()
+
+    def _add(self, text, norm, kind, weight):
+        keys = _keys_of(norm)
+        tid = self._ids.get((kind, norm))
+        if tid is None:
+            tid = self._ids[(kind, norm)] = len(self._terms)
+            self._terms.append([" ".join(str(text).split()), kind, weight])
+            self._pending.extend((key, tid) for key in keys)
+        else:
+            self._terms[tid][2] += weight
+        self._promote(tid, keys)
+
+    def _rank(self, tid):
+        display, kind, weight = self._terms[tid]
+        return (-weight, KINDS.index(kind), len(display))
+
+    def _promote(self, tid, keys):
+        rank = self._rank(tid)
+        for prefix in {key[:n] for key in keys for n in range(MIN_CHARS, min(len(key), HEAD_CHARS) + 1)}:
+            head = self._heads.setdefault(prefix, [])
+            # weights only grow, so a term already listed always passes this check
+            if len(head) >= HEAD_SIZE and rank >= head[-1][0]:
+                continue
+            for j, (_, other) in enumerate(head):
+                if other == tid:
+                    del head[j]
+                    break
+            bisect.insort(head, (rank, tid))
+            del head[HEAD_SIZE:]
+
+    def _merge(self):
+        self._keys.extend(self._fresh)
+        self._keys.extend(self._pending)
+        self._keys.sort()
+        self._fresh, self._pending = [], []
+        self._memo.clear()
+        if len(self._terms) > self.max_terms:
+            self._evict()
+
+    def _evict(self):
+        # keep the most common half; ids are renumbered and top lists rebuilt
+        keep = sorted(heapq.nlargest(self.max_terms // 2, range(len(self._terms)), key=lambda i: self._terms[i][2]))
+        renumber = {old: new for new, old in enumerate(keep)}
+        self._terms = [self._terms[old] for old in keep]
+        self._ids = {k: renumber[i] for k, i in self._ids.items() if i in renumber}
+        self._keys = [(key, renumber[i]) for key, i in self._keys if i in renumber]
+        self._heads = {}
+        for (_, norm), tid in self._ids.items():
+            self._promote(tid, _keys_of(norm))
+
+    def _matches(self, prefix):
+        """``(key, id)`` pairs whose key starts with ``prefix``."""
+        if self._pending:
+            self._fresh.extend(self._pending)
+            self._fresh.sort()
+            self._pending = []
+        hits = []
+        for keys in (self._keys, self._fresh):
+            lo = bisect.bisect_left(keys, (prefix,))
+            hi = bisect.bisect_left(keys, (prefix + "\uffff",), lo)
+            hits.extend(keys[lo:hi])
+        return hits
+
+    def suggest(self, prefix, limit=8) -> list:
+        """Up to ``limit`` ``(text, kind)`` terms a word of which starts with ``prefix``, most common first."""
+        prefix = normalize_term(prefix)
+        if len(prefix) < MIN_CHARS:
+            return []
+        with self._lock:
+            if len(prefix) <= HEAD_CHARS and limit <= HEAD_SIZE:
+                best = [tid for _, tid in self._heads.get(prefix, ())[:limit]]
+            else:
+                hit = self._memo.get((prefix, limit))
+                if hit is not None:
+                    return hit
+                best = heapq.nsmallest(limit, {tid for _, tid in self._matches(prefix)}, key=self._rank)
+            result = [(self._terms[i][0], self._terms[i][1]) for i in best]
+            if len(prefix) > HEAD_CHARS:
+                if len(self._memo) > 4096:
+                    self._memo.clear()
+                self._memo[(prefix, limit)] = result
+            return result
+
+    def correct(self, query):
+        """A known term ``query`` is probably a misspelling of, or ``None``.
+
+        Only when nothing starts with ``query``: the closest artist, title,
+        mood or genre key (a whole term or its trailing words) with the same
+        first two letters and a similar length.
+        """
+        norm = normalize_term(query)
+        if len(norm) < 4:
+            return None
+        with self._lock:
+            if self._matches(norm):
+                return None
+            candidates = {}
+            for key, tid in self._matches(norm[:2]):
+                if abs(len(key) - len(norm)) <= 2 and self._terms[tid][1] != "album":
+                    candidates.setdefault(key, tid)
+            close = difflib.get_close_matches(norm, candidates, n=3, cutoff=CORRECTION_CUTOFF)
+            if not close:
+                return None
+            best = min((candidates[k] for k in close), key=lambda i: (KINDS.index(self._terms[i][1]), -self._terms[i][2]))
+            return self._terms[best][0]
+
+    def __len__(self):
+        return len(self._terms)
+
+
+def _seed_vocabulary(index):
+    for mood, words in MOOD_KEYWORDS.items():
+        index.add(mood, "mood", 5)
+        for word in words:
+            index.add(word, "mood")
+    for genre in GENRES:
+        index.add(genre, "genre", 5)
+
+
+def get_prefix_index() -> PrefixIndex:
+    """Process-wide index. Created on first use with the mood/genre vocabulary; a background
+    thread adds the tracks seen earlier, then every search result from then on."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from beatbuddy.search import follow_tracks
+
+                index = PrefixIndex()
+                _seed_vocabulary(index)
+                _index = index
+                # small chunks, so keystrokes are answered between them
+                follow_tracks(lambda tracks, mood, language: index.add_tracks(tracks), index.max_terms // 4, 500, "beatbuddy-typeahead")
+    return _index
@@ -0,0 +1,118 @@
+# ------------------------------------------------
+# Startup warm-up: prefetch the quick-mood recommendation sets
+# ------------------------------------------------
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from beatbuddy.mood import MOODS
+from beatbuddy.recommend import candidate_pools
+from beatbuddy.scheduler import background
+
+# keep below the result-cache TTL so warmed entries never expire between runs
+WARMUP_INTERVAL = float(os.getenv("BEATBUDDY_WARMUP_INTERVAL", str(10 * 60)))
+
+_job = None
+_job_lock = threading.Lock()
+
+
+class WarmupJob:
+    """Background thread that loads every (mood, language) quick-mood candidate
+    pool at start-up and reloads it every ``interval`` seconds."""
+
+    def __init__(self, client_factory, moods, languages, latest, limit, interval=WARMUP_INTERVAL):
+        self.client_factory = client_factory
+        self.combos = [(m, lang) for lang in languages for m in moods]
+        self.latest = latest
+        self.limit = limit
+        self.interval = interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._status = {
+            "state": "starting",
+            "runs": 0,
+            "combos": len(self.combos),
+            "warmed": 0,
+            "failed": 0,
+            "last_started": None,
+            "last_finished": None,
+            "last_duration_s": None,
+            "next_run": None,
+            "errors": [],
+        }
+        self._thread = threading.Thread(target=self._loop, name="beatbuddy-warmup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            return dict(self._status, errors=list(self._status["errors"]))
+
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def run_once(self):
+        started = time.time()
+        self._update(state="running", last_started=started)
+        errors = []
+        warmed = 0
+        try:
+            sp = self.client_factory()
+        except Exception as e:
+            sp = None
+            errors.append(f"client: {e}")
+
+        if sp is not None:
+            def warm(combo):
+                # queued behind interactive searches when Spotify is the bottleneck
+                with background():
+                    pool = candidate_pools(sp, [combo], self.latest, self.limit, refresh=True)[combo]
+                if isinstance(pool, Exception):
+                    raise pool
+
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="beatbuddy-warmup") as pool:
+                for combo, fut in [(c, pool.submit(warm, c)) for c in self.combos]:
+                    try:
+                        fut.result()
+                        warmed += 1
+                    except Exception as e:
+                        errors.append(f"{combo[0]}/{combo[1]}: {e}")
+
+        finished = time.time()
+        with self._lock:
+            self._status.update(
+                state="ready" if warmed == len(self.combos) else "degraded",
+                runs=self._status["runs"] + 1,
+                warmed=warmed,
+                failed=len(self.combos) - warmed,
+                last_finished=finished,
+                last_duration_s=round(finished - started, 3),
+                next_run=finished + self.interval,
+                errors=errors[-10:],
+            )
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+
+def start_warmup(client_factory, languages, latest, limit, moods=MOODS):
+    """Start the process-wide warm-up job once; later calls return the running job."""
+    global _job
+    with _job_lock:
+        if _job is None:
+            _job = WarmupJob(client_factory, moods, languages, latest, limit).start()
+    return _job
+
+
+def warmup_status():
+    """Status of the warm-up job, or ``None`` if it was never started."""
+    return _job.status() if _job is not None else None
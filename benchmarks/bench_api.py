@@ -0,0 +1,101 @@
+# ==============================================
+# JSON API throughput: /mood, warm /recommend, cold /search
+# ==============================================
+# Starts beatbuddy.api in-process against a fake Spotify with network-like
+# latency and drives it with N concurrent keep-alive connections:
+#   * /mood             answered on the event loop
+#   * /recommend (warm) candidate pools already cached
+#   * /search (cold)    every request a distinct query, so a Spotify call each;
+#                       also run with the handler on the event loop, to show
+#                       what one blocking spotipy call does to every connection
+# The scheduler's rate limit is lifted (BEATBUDDY_SPOTIFY_RATE) so the numbers
+# measure the API, not Spotify's quota.
+#
+# Run:
+#    python benchmarks/bench_api.py [requests_per_scenario] [latency_ms]
+# ==============================================
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BEATBUDDY_CATALOG", "0")
+os.environ.setdefault("BEATBUDDY_SHARED_CACHE", "0")
+os.environ.setdefault("BEATBUDDY_SPOTIFY_RATE", "100000")
+os.environ.setdefault("BEATBUDDY_SPOTIFY_BURST", "100000")
+
+from bench_recommend import LatencySpotify  # noqa: E402
+
+from beatbuddy.api import BeatBuddyApi  # noqa: E402
+from beatbuddy.search import search_cache  # noqa: E402
+
+CONCURRENCY = (1, 16, 64)
+
+
+def start(api):
+    bound = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(api.serve("127.0.0.1", 0, bound.set)), daemon=True).start()
+    bound.wait(10)
+    return api.port
+
+
+async def client(port, paths, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for path in paths:
+            t = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length")))
+            json.loads(await reader.readexactly(length))
+            latencies.append(time.perf_counter() - t)
+            statuses[int(head.split(b" ")[1])] = statuses.get(int(head.split(b" ")[1]), 0) + 1
+    finally:
+        writer.close()
+
+
+async def drive(port, paths, concurrency):
+    latencies, statuses = [], {}
+    start_t = time.perf_counter()
+    await asyncio.gather(*(client(port, paths[i::concurrency], latencies, statuses) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start_t
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], statuses
+
+
+def report(label, port, make_paths, n):
+    for c in CONCURRENCY:
+        rps, p50, p99, statuses = asyncio.run(drive(port, make_paths(n), c))
+        bad = sum(v for k, v in statuses.items() if k != 200)
+        print(f"  {label:<24} c={c:<3} {rps:9.0f} req/s   p50 {p50 * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms   errors {bad}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 80.0
+    sp = LatencySpotify(latency_ms)
+    print(f"{n} requests per run, Spotify latency {latency_ms:.0f} ms")
+
+    api = BeatBuddyApi(lambda: sp)
+    port = start(api)
+    report("/mood", port, lambda k: [f"/mood?text=feeling+great+party+tonight+{i}" for i in range(k)], n)
+
+    moods = ("happy", "sad", "chill", "party")
+    search_cache.clear()
+    for m in moods:  # warm the pools once
+        asyncio.run(drive(port, [f"/recommend?mood={m}&limit=10"], 1))
+    report("/recommend (warm)", port, lambda k: [f"/recommend?mood={moods[i % 4]}&limit={5 + i % 10}" for i in range(k)], n)
+
+    cold = iter(range(10**9))
+    cold_paths = lambda k: [f"/search?q=song+{next(cold)}&limit=10" for _ in range(k)]
+    report("/search (cold)", port, cold_paths, min(n, 640))
+
+    inline = BeatBuddyApi(lambda: sp)
+    inline.routes[("GET", "/search")] = (inline.search, False)
+    report("/search (cold, on loop)", start(inline), cold_paths, min(n, 64))
@@ -0,0 +1,69 @@
+# ==============================================
+# Track catalog: local vs remote search latency
+# ==============================================
+# Fills a throwaway catalog with synthetic tracks, then times
+#   * a repeated query answered from the stored query results,
+#   * a full-text search over title / artist / album,
+#   * a live Spotify search (only when SPOTIFY_CLIENT_ID / SECRET are set).
+#
+# Run:
+#    python benchmarks/bench_catalog.py [tracks]
+# ==============================================
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beatbuddy.catalog import TrackCatalog
+
+WORDS = ["love", "night", "dil", "tere", "party", "sun", "heart", "rain", "ishq", "dance", "baby", "sad", "moon", "fire", "yaar"]
+
+
+def fake_tracks(n, seed=5):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "id": f"trk{i:08d}",
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title(),
+            "artist": f"Artist {rng.randint(1, n // 20 + 1)}",
+            "album": f"{rng.choice(WORDS).title()} Album {rng.randint(1, 999)}",
+            "release_date": f"{rng.randint(1990, 2025)}-01-01",
+            "url": f"https://open.spotify.com/track/trk{i:08d}",
+            "image": None,
+        }
+
+
+def timed_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = TrackCatalog(os.path.join(tmp, "catalog.db"))
+        tracks = list(fake_tracks(n))
+        start = time.perf_counter()
+        for i in range(0, n, 1000):
+            catalog.upsert(tracks[i:i + 1000])
+        print(f"upsert {n} tracks: {time.perf_counter() - start:.2f} s")
+
+        key = repr(("search", "love night", "english", True, 10, "IN", 0))
+        catalog.store_query(key, tracks[:10])
+        print(f"stored query lookup: {timed_ms(lambda: catalog.lookup_query(key), 1000):.3f} ms")
+        print(f"full-text search:    {timed_ms(lambda: catalog.search('love night', 10, since=2022), 200):.3f} ms")
+
+        if os.getenv("SPOTIFY_CLIENT_ID") and os.getenv("SPOTIFY_CLIENT_SECRET"):
+            from beatbuddy.client import get_shared_client
+
+            sp = get_shared_client(os.environ["SPOTIFY_CLIENT_ID"], os.environ["SPOTIFY_CLIENT_SECRET"])
+            sp.search(q="love night", type="track", limit=10, market="IN")  # token + connection warm-up
+            print(f"remote Spotify search: {timed_ms(lambda: sp.search(q='love night', type='track', limit=10, market='IN'), 10):.1f} ms")
+        else:
+            print("remote Spotify search: skipped (set SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET)")
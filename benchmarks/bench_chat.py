@@ -0,0 +1,96 @@
+# ==============================================
+# Chat rendering: unbounded per-message markdown vs bounded, batched history
+# ==============================================
+# Times Streamlit reruns (via streamlit.testing AppTest) of a chat with N
+# messages drawn the old way (one st.markdown per message, drawn a second
+# time by the Send handler) and with beatbuddy.chat.ChatHistory (last
+# MAX_MESSAGES messages, one cached HTML block per rerun), and measures
+# the session memory each keeps.
+#
+# Run:
+#    python benchmarks/bench_chat.py [messages]
+# ==============================================
+
+import os
+import sys
+import time
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from beatbuddy.chat import ChatHistory  # noqa: E402
+
+
+def unbounded_app():
+    import streamlit as st
+
+    def render_chat():
+        st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
+        for m in st.session_state["messages"]:
+            cls = "user-bubble" if m["from"] == "user" else "bot-bubble"
+            st.markdown(f"<div class='{cls}'>{m['text']}</div>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    render_chat()
+    st.session_state["messages"].append({"from": "user", "text": "feeling great"})
+    st.session_state["messages"].append({"from": "bot", "text": "I think you're feeling *happy*."})
+    render_chat()
+
+
+def bounded_app():
+    import streamlit as st
+
+    chat = st.session_state["chat"]
+    slot = st.empty()
+    chat.add("user", "feeling great")
+    chat.add("bot", "I think you're feeling *happy*.", mood="happy")
+    slot.markdown(chat.html(), unsafe_allow_html=True)
+
+
+def messages(n):
+    return [
+        {"from": "user" if i % 2 == 0 else "bot", "text": f"message {i}: " + "so many feelings " * 3}
+        for i in range(n)
+    ]
+
+
+def bounded_history(n):
+    chat = ChatHistory()
+    for m in messages(n):
+        chat.add(m["from"], m["text"], mood="happy" if m["from"] == "bot" else None)
+    return chat
+
+
+def rerun_ms(app_fn, state_key, make_state, reruns=5):
+    at = AppTest.from_function(app_fn, default_timeout=120)
+    at.session_state[state_key] = make_state()
+    at.run()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        at.run()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def kept_kb(make):
+    tracemalloc.start()
+    obj = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size / 1024
+
+
+if __name__ == "__main__":
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [20, 200, 1000]
+    for n in sizes:
+        before = rerun_ms(unbounded_app, "messages", lambda: messages(n))
+        after = rerun_ms(bounded_app, "chat", lambda: bounded_history(n))
+        mem_before = kept_kb(lambda: messages(n))
+        mem_after = kept_kb(lambda: bounded_history(n))
+        print(
+            f"{n:>5} messages: per-message markdown {before:8.1f} ms/rerun {mem_before:7.1f} KB   "
+            f"bounded history {after:6.1f} ms/rerun {mem_after:6.1f} KB"
+        )
@@ -0,0 +1,103 @@
+# ==============================================
+# Bulk import: one save per track vs batched, concurrent hydration
+# ==============================================
+# Imports N pasted track links (plus one playlist) for a user, against an
+# in-process fake Spotify with network-like latency:
+#   * old: one GET /v1/tracks/{id} and one store save per track, one after
+#     another (what N "Save" clicks cost, before counting N reruns)
+#   * new: beatbuddy.library.import_tracks, 50 IDs per request, every
+#     request at once, skipping tracks already saved
+# then times the streaming CSV / JSONL export of the resulting dashboard.
+#
+# Run:
+#    python benchmarks/bench_import.py [tracks] [latency_ms]
+# ==============================================
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_spotify import FakeSpotify, synthetic_track  # noqa: E402
+
+from beatbuddy.library import export_saved, import_tracks  # noqa: E402
+from beatbuddy.search import parse_tracks  # noqa: E402
+from beatbuddy.store import UserStore  # noqa: E402
+
+PLAYLIST = "37i9dQZF1DXcBWIGoYBM5M"
+
+
+class LatencySpotify:
+    """spotipy stand-in: FakeSpotify responses after ``latency_ms``, counting requests."""
+
+    def __init__(self, latency_ms):
+        self.api = FakeSpotify()
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _wait(self):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+
+    def track(self, track_id, market=None):
+        self._wait()
+        return synthetic_track(track_id)
+
+    def tracks(self, ids, market=None):
+        self._wait()
+        return self.api.tracks(ids)
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, market=None, additional_types=("track",)):
+        self._wait()
+        return self.api.playlist_items(playlist_id, limit, offset)
+
+
+def track_ids(n):
+    return [hashlib.sha1(str(i).encode()).hexdigest()[:22].replace("0", "a") for i in range(n)]
+
+
+def one_by_one(sp, store, ids):
+    for tid in ids:
+        item = sp.track(tid)
+        for track in parse_tracks({"tracks": {"items": [item]}}):
+            store.save_track("bench", track)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 80.0
+    ids = track_ids(n)
+    paste = "\n".join(f"https://open.spotify.com/track/{tid}?si=x" for tid in ids)
+    print(f"{n} track links, Spotify latency {latency_ms:.0f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserStore(os.path.join(tmp, "old.db"))
+        sp = LatencySpotify(latency_ms)
+        start = time.perf_counter()
+        one_by_one(sp, store, ids)
+        print(f"  one request + save per track   {sp.calls:>5} requests  {time.perf_counter() - start:7.2f} s")
+
+        store = UserStore(os.path.join(tmp, "new.db"))
+        sp = LatencySpotify(latency_ms)
+        start = time.perf_counter()
+        result = import_tracks(sp, store, "bench", paste)
+        print(
+            f"  batched import                 {sp.calls:>5} requests  {time.perf_counter() - start:7.2f} s"
+            f"   ({result['added']} added)"
+        )
+        sp.calls = 0
+        start = time.perf_counter()
+        result = import_tracks(sp, store, "bench", paste + f"\nhttps://open.spotify.com/playlist/{PLAYLIST}")
+        print(
+            f"  same links again + playlist    {sp.calls:>5} requests  {time.perf_counter() - start:7.2f} s"
+            f"   ({result['added']} added, {result['skipped']} already saved)"
+        )
+
+        for fmt in ("csv", "jsonl"):
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in export_saved(store, "bench", fmt))
+            print(f"  export {fmt:<5} {store.saved_count('bench'):>6} tracks  {size / 1024:8.1f} KB  {(time.perf_counter() - start) * 1000:7.1f} ms")
@@ -0,0 +1,316 @@
+# ==============================================
+# Load test against a local fake Spotify (no network, no rate limits)
+# ==============================================
+# Starts benchmarks/fake_spotify.py in a subprocess, points BeatBuddy at it and
+# drives N concurrent simulated sessions, then reports throughput,
+# p50/p95/p99 latency per operation, errors and memory.
+#
+# Scenarios:
+#   functions  the code behind fetch_songs / search_songs / detect_mood_from_text
+#              (beatbuddy.recommend / search / mood on the shared client),
+#              one thread per session
+#   app        full app.py reruns through streamlit.testing AppTest, one
+#              AppTest per session: detect + recommend, search, plain rerun
+#              (AppTest keeps some runtime state process-wide, so with several
+#              sessions a few ops can fail on another session's state; they
+#              count as op errors)
+#
+# A session that dies outside an operation (e.g. its first run raises) is
+# reported and makes the run exit 1, whatever the latencies of the rest.
+#
+# Run:
+#    python benchmarks/bench_load.py --scenario functions --sessions 16 --requests 50
+#    python benchmarks/bench_load.py --scenario app --sessions 4 --requests 10 --latency-ms 120 --error-rate 0.02
+#
+# Regression gate (e.g. in CI before deploy):
+#    python benchmarks/bench_load.py --save-baseline perf-baseline.json     # on a known-good build
+#    python benchmarks/bench_load.py --baseline perf-baseline.json          # exits 1 on regression
+# ==============================================
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+MOODS = ("happy", "sad", "romantic", "energetic", "chill", "party")
+LANGUAGES = ("English", "Hindi", "Punjabi")
+SEARCH_TERMS = ("lofi", "arijit", "workout", "rain", "road trip", "bhangra", "acoustic", "sufi", "edm", "retro")
+OP_WEIGHTS = {"fetch": 5, "search": 3, "detect": 2}
+APP_OP_WEIGHTS = {"detect": 5, "search": 3, "rerun": 2}
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+    """Thread-safe per-operation latencies (ms), error counts and sessions that died."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.failed = []  # (session, error)
+
+    def add(self, op, ms, error=None):
+        with self._lock:
+            self.latencies.setdefault(op, []).append(ms)
+            if error is not None:
+                self.errors[op] = self.errors.get(op, 0) + 1
+
+    def fail(self, session, error):
+        with self._lock:
+            self.failed.append((session, f"{type(error).__name__}: {error}"))
+
+    def run_session(self, session, i):
+        """Thread target: ``session(i)``, recording the session as failed if it raises."""
+        try:
+            session(i)
+        except Exception as e:
+            self.fail(i, e)
+
+    def timed(self, op, fn, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            self.add(op, (time.perf_counter() - start) * 1000, e)
+        else:
+            self.add(op, (time.perf_counter() - start) * 1000)
+
+    def summary(self, wall_s) -> dict:
+        ops = {}
+        for op, samples in sorted(self.latencies.items()):
+            ops[op] = {
+                "count": len(samples),
+                "errors": self.errors.get(op, 0),
+                "mean_ms": round(statistics.fmean(samples), 2),
+                "p50_ms": round(percentile(samples, 0.50), 2),
+                "p95_ms": round(percentile(samples, 0.95), 2),
+                "p99_ms": round(percentile(samples, 0.99), 2),
+            }
+        total = sum(len(s) for s in self.latencies.values())
+        return {
+            "wall_s": round(wall_s, 3), "ops": total, "throughput_ops_s": round(total / wall_s, 1) if wall_s else 0.0,
+            "by_op": ops, "failed_sessions": [{"session": i, "error": e} for i, e in sorted(self.failed)],
+        }
+
+
+def start_fake_spotify(args):
+    cmd = [
+        sys.executable, os.path.join(BENCH_DIR, "fake_spotify.py"), "serve",
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--rate-limit-share", str(args.rate_limit_share),
+    ]
+    if args.recordings:
+        cmd += ["--recordings", args.recordings]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    port = int(proc.stdout.readline())
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def fake_stats(base_url) -> dict:
+    import requests
+
+    return requests.get(base_url + "/_stats", timeout=5).json()
+
+
+def configure_env(base_url, args):
+    # read by beatbuddy.* at import time, so set before anything imports them
+    os.environ["BEATBUDDY_SPOTIFY_API_URL"] = base_url + "/v1"
+    os.environ["BEATBUDDY_SPOTIFY_TOKEN_URL"] = base_url + "/api/token"
+    os.environ.setdefault("BEATBUDDY_DATA_DIR", tempfile.mkdtemp(prefix="beatbuddy-bench-"))
+    os.environ.setdefault("BEATBUDDY_WARMUP", "1" if args.warmup else "0")
+    if not args.catalog:
+        os.environ["BEATBUDDY_CATALOG"] = "0"
+    os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench")
+    os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench")
+
+
+def pick(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def run_functions(args, recorder):
+    from bench_mood import random_corpus
+
+    from beatbuddy.client import get_shared_client
+    from beatbuddy.mood import detect_mood_from_text
+    from beatbuddy.recommend import recommend
+    from beatbuddy.search import search_text_tracks
+
+    sp = get_shared_client(os.environ["SPOTIFY_CLIENT_ID"], os.environ["SPOTIFY_CLIENT_SECRET"])
+    texts = random_corpus(500)
+
+    def session(i):
+        rng = random.Random(args.seed + i)
+        for _ in range(args.requests):
+            op = pick(rng, OP_WEIGHTS)
+            if op == "fetch":
+                recorder.timed(op, recommend, sp, [rng.choice(MOODS)], [rng.choice(LANGUAGES)], rng.random() < 0.7, rng.choice((5, 10, 15)))
+            elif op == "search":
+                term = f"{rng.choice(SEARCH_TERMS)} {rng.randrange(args.query_pool)}"
+                recorder.timed(op, search_text_tracks, sp, term, rng.choice(LANGUAGES), rng.random() < 0.7, 10)
+            else:
+                recorder.timed(op, detect_mood_from_text, rng.choice(texts))
+
+    return session
+
+
+def run_app(args, recorder):
+    from bench_mood import random_corpus
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    # AppTest compiles app.py again on every run, and compiles racing in several threads
+    # fail inside the interpreter (SystemError); share one cache like a real server does
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    texts = random_corpus(500)
+    app_path = os.path.join(ROOT, "app.py")
+    # session set-up is not thread-safe either: one session's first run at a time
+    first_run_lock = threading.Lock()
+
+    def session(i):
+        rng = random.Random(args.seed + i)
+        with first_run_lock:
+            at = AppTest.from_file(app_path, default_timeout=args.timeout)
+            at.session_state["user"] = f"bench{i}"
+            start = time.perf_counter()
+            at.run()
+            error = at.exception[0].message if at.exception else None
+            recorder.add("first_run", (time.perf_counter() - start) * 1000, error)
+        if error is not None:
+            # without a rendered page there are no widgets to drive
+            raise RuntimeError(f"first run: {error}")
+        for _ in range(args.requests):
+            op = pick(rng, APP_OP_WEIGHTS)
+            start = time.perf_counter()
+            try:
+                if op == "detect":
+                    at.text_area(key="d_text").input(rng.choice(texts))
+                    at.selectbox(key="ui_language").set_value(rng.choice(LANGUAGES))
+                    at.button(key="detect_btn").click()
+                elif op == "search":
+                    at.text_input(key="search_query").input(f"{rng.choice(SEARCH_TERMS)} {rng.randrange(args.query_pool)}")
+                    next(b for b in at.button if b.label == "Search").click()
+                start = time.perf_counter()
+                at.run()
+                error = at.exception[0].message if at.exception else None
+            except Exception as e:  # missing widget, AppTest timeout
+                error = e
+            recorder.add(op, (time.perf_counter() - start) * 1000, error)
+
+    return session
+
+
+def check_baseline(result, baseline, tolerance) -> list:
+    problems = []
+    if result["throughput_ops_s"] < baseline["throughput_ops_s"] * (1 - tolerance):
+        problems.append(f"throughput {result['throughput_ops_s']} ops/s < baseline {baseline['throughput_ops_s']}")
+    for op, base in baseline["by_op"].items():
+        now = result["by_op"].get(op)
+        if now is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            # ignore sub-millisecond noise
+            if now[key] > max(base[key] * (1 + tolerance), base[key] + 1.0):
+                problems.append(f"{op} {key} {now[key]} > baseline {base[key]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BeatBuddy load test against a local fake Spotify")
+    parser.add_argument("--scenario", choices=("functions", "app"), default="functions")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=25, help="operations per session")
+    parser.add_argument("--query-pool", type=int, default=50, help="distinct search suffixes; smaller means more cache hits")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-share", type=float, default=0.5)
+    parser.add_argument("--recordings", default=None, help="directory of recorded /search responses")
+    parser.add_argument("--catalog", action="store_true", help="keep the local SQLite catalog enabled")
+    parser.add_argument("--warmup", action="store_true", help="let the app start its quick-mood warm-up")
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest per-run timeout (s)")
+    parser.add_argument("--tracemalloc", action="store_true", help="report Python heap peak (slows the run)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the result here")
+    parser.add_argument("--save-baseline", help="write the result as a baseline")
+    parser.add_argument("--baseline", help="compare against this baseline and exit 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    proc, base_url = start_fake_spotify(args)
+    try:
+        configure_env(base_url, args)
+        recorder = Recorder()
+        session = (run_app if args.scenario == "app" else run_functions)(args, recorder)
+        if args.tracemalloc:
+            tracemalloc.start()
+        threads = [
+            threading.Thread(target=recorder.run_session, args=(session, i), name=f"bench-session-{i}") for i in range(args.sessions)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        result = recorder.summary(time.perf_counter() - start)
+        result["config"] = {k: v for k, v in vars(args).items() if k not in ("json", "save_baseline", "baseline")}
+        result["memory"] = {"max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+        if args.tracemalloc:
+            result["memory"]["py_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.stop()
+        result["fake_spotify"] = fake_stats(base_url)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(f"{args.scenario}: {args.sessions} sessions x {args.requests} ops, fake Spotify {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, errors {args.error_rate:.0%}")
+    print(f"  {result['ops']} ops in {result['wall_s']} s  ->  {result['throughput_ops_s']} ops/s")
+    for op, s in result["by_op"].items():
+        print(f"  {op:<18} n={s['count']:<5} err={s['errors']:<4} p50={s['p50_ms']:>8.1f}  p95={s['p95_ms']:>8.1f}  p99={s['p99_ms']:>8.1f} ms")
+    print(f"  memory: {result['memory']}")
+    print(f"  fake Spotify: {result['fake_spotify']}")
+    for failure in result["failed_sessions"]:
+        print(f"  FAILED session {failure['session']}: {failure['error']}")
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+
+    if result["failed_sessions"]:
+        # latencies from the surviving sessions alone are no pass
+        sys.exit(1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = check_baseline(result, json.load(f), args.max_regression)
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        if problems:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
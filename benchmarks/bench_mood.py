@@ -0,0 +1,123 @@
+# ==============================================
+# Mood detector: regression check + micro-benchmark
+# ==============================================
+# Compares beatbuddy.mood.detect_mood_from_text against the original nested-loop
+# implementation (kept below verbatim as `legacy_detect_mood`) on a regression
+# corpus, then times both on short chat lines and multi-kilobyte lyrics.
+#
+# Run:
+#    python benchmarks/bench_mood.py
+# ==============================================
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beatbuddy.mood import DEFAULT_MOOD, EMOJI_MAP, MOOD_KEYWORDS, NEGATIONS, detect_mood_from_text
+
+
+def legacy_detect_mood(text: str) -> str:
+    if not text or not text.strip():
+        return DEFAULT_MOOD
+
+    t = text.lower()
+
+    emoji_map = dict(EMOJI_MAP)
+    mood_keywords = {k: list(v) for k, v in MOOD_KEYWORDS.items()}
+
+    scores = {k: 0 for k in mood_keywords}
+
+    for e, m in emoji_map.items():
+        if e in text:
+            scores[m] += 2
+
+    negations = list(NEGATIONS)
+    for mood, keys in mood_keywords.items():
+        for kw in keys:
+            if kw in t:
+                negated = any(neg in t and t.find(neg) < t.find(kw) and t.find(kw) - t.find(neg) < 12 for neg in negations)
+                scores[mood] += -1 if negated else 1
+
+    if all(v == 0 for v in scores.values()):
+        if any(w in t for w in ["!", "yay", "whoa", "yeah"]):
+            return "happy"
+        if any(w in t for w in ["sad", "cry", "tears"]):
+            return "sad"
+        return DEFAULT_MOOD
+
+    best = max(scores.items(), key=lambda kv: kv[1])[0]
+    return best
+
+
+CORPUS = [
+    "",
+    "   ",
+    "I am so happy today!",
+    "not happy at all",
+    "I'm not sad, just tired",
+    "feeling joyful and blessed",
+    "I can't stop crying, tears everywhere 😭",
+    "Let's party all night at the club 🎉",
+    "I love you baby, forever and always ❤️",
+    "chill vibes, calm and mellow, laid back sunday",
+    "whoa",
+    "yeah yeah yeah",
+    "!!!",
+    "meh",
+    "don't dance, never jump",
+    "no love no pain",
+    "brunch with friends",
+    "the piano sounds nice",
+    "cant relax cant breathe",
+    "I miss you so much, goodbye",
+    "pump up the energy, hype hype hype 🔥",
+    "turn up the beat, rock the crowd, celebrate the fest",
+    "sad happy",
+    "not sad but not happy",
+    "HAPPY HAPPY JOY JOY",
+    "😊🙂😄",
+    "😍💖",
+    "🎶 easy smooth",
+    "İstanbul nights and heart breaks",
+    "I'm not in love, it's just a phase",
+    "sunshine and rainbows 😢",
+    "no... the beat goes on",
+    "cry cry sad sad tears",
+    "never gonna give you up, never gonna let you down",
+]
+
+WORDS = sorted({kw for keys in MOOD_KEYWORDS.values() for kw in keys} | set(EMOJI_MAP)) + [
+    "the", "and", "my", "you", "oh", "night", "city", "lights", "walking", "alone", "not", "never", "no", "don't", "!", "yeah",
+]
+
+
+def random_corpus(n, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25))) for _ in range(n)]
+
+
+def check_regressions():
+    corpus = CORPUS + random_corpus(5000)
+    mismatches = [t for t in corpus if legacy_detect_mood(t) != detect_mood_from_text(t)]
+    print(f"regression corpus: {len(corpus)} texts, {len(mismatches)} mismatches")
+    for t in mismatches[:10]:
+        print(f"  {t!r}: legacy={legacy_detect_mood(t)} new={detect_mood_from_text(t)}")
+    return not mismatches
+
+
+def bench(label, text, number):
+    old = timeit.timeit(lambda: legacy_detect_mood(text), number=number) / number
+    new = timeit.timeit(lambda: detect_mood_from_text(text), number=number) / number
+    print(f"{label:<28} legacy {old * 1e6:9.1f} us   compiled {new * 1e6:9.1f} us   x{old / new:5.2f}")
+
+
+if __name__ == "__main__":
+    ok = check_regressions()
+    chat = "I'm not feeling great today, kind of lonely 😢"
+    lyrics = " ".join(random_corpus(400, seed=11))
+    bench("short chat line", chat, 20000)
+    bench(f"lyrics ({len(lyrics) // 1024} KB)", lyrics, 200)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,51 @@
+# ==============================================
+# Batch mood classifier: parity check + throughput
+# ==============================================
+# Checks that beatbuddy.mood_batch.detect_moods agrees with
+# detect_mood_from_text / mood_scores row by row, then reports rows per
+# second for the per-text loop and the batch API.
+#
+# Run:
+#    python benchmarks/bench_mood_batch.py [rows]
+# ==============================================
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_mood import CORPUS, random_corpus
+
+from beatbuddy.mood import MOODS, analyze_mood
+from beatbuddy.mood_batch import detect_moods
+
+
+def check_parity(texts):
+    labels, scores = detect_moods(texts)
+    bad = 0
+    for i, text in enumerate(texts):
+        mood, expected = analyze_mood(text)
+        if labels[i] != mood or list(scores[i]) != [expected[m] for m in MOODS]:
+            bad += 1
+            if bad <= 10:
+                print(f"  {text!r}: single={mood} {expected} batch={labels[i]} {list(scores[i])}")
+    print(f"parity: {len(texts)} texts, {bad} mismatches")
+    return bad == 0
+
+
+def rows_per_second(fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    ok = check_parity(CORPUS + [None] + random_corpus(5000))
+
+    texts = random_corpus(rows, seed=3)
+    loop = rows_per_second(lambda ts: [analyze_mood(t) for t in ts], texts)
+    batch = rows_per_second(detect_moods, texts)
+    print(f"{rows} rows: per-text loop {loop:,.0f} rows/s   detect_moods {batch:,.0f} rows/s   x{batch / loop:.2f}")
+    sys.exit(0 if ok else 1)
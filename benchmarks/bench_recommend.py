@@ -0,0 +1,76 @@
+# ==============================================
+# Recommendations: one query per UI setting vs one ranked candidate pool
+# ==============================================
+# Replays a session that tweaks "number of results" and "only latest" for
+# a few moods, against an in-process fake Spotify with network-like latency:
+#   * old: search_mood_tracks, one Spotify query (cache key) per (latest, limit)
+#   * new: beatbuddy.recommend, one cached candidate pool per (mood, language)
+#     that every setting is filtered / ranked / sliced from locally
+#
+# Run:
+#    python benchmarks/bench_recommend.py [latency_ms]
+# ==============================================
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("BEATBUDDY_CATALOG", "0")
+os.environ.setdefault("BEATBUDDY_SHARED_CACHE", "0")
+
+from fake_spotify import FakeSpotify  # noqa: E402
+
+from beatbuddy.recommend import recommend  # noqa: E402
+from beatbuddy.search import search_cache, search_mood_tracks  # noqa: E402
+
+MOODS = ("happy", "sad", "chill")
+SETTINGS = [(latest, limit) for latest in (True, False) for limit in (5, 10, 15, 20)]
+
+
+class LatencySpotify:
+    """``sp.search`` stand-in: FakeSpotify responses after ``latency_ms``."""
+
+    def __init__(self, latency_ms):
+        self.api = FakeSpotify()
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def search(self, q, type="track", limit=10, offset=0, market=None):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        return self.api.search(q, limit, offset)
+
+
+def replay(fetch, latency_ms):
+    search_cache.clear()
+    sp = LatencySpotify(latency_ms)
+    tweaks = []
+    start = time.perf_counter()
+    for mood in MOODS:
+        for latest, limit in SETTINGS:
+            t = time.perf_counter()
+            fetch(sp, mood, latest, limit)
+            tweaks.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    # the first request per mood always goes to Spotify; the rest are "UI tweaks"
+    after_first = sorted(tweaks[i] for i in range(len(tweaks)) if i % len(SETTINGS))
+    return sp.calls, total, after_first[len(after_first) // 2]
+
+
+def old_fetch(sp, mood, latest, limit):
+    return search_mood_tracks(sp, mood, "English", latest, limit)
+
+
+def new_fetch(sp, mood, latest, limit):
+    return recommend(sp, [mood], ["English"], latest, limit)
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 80.0
+    print(f"{len(MOODS)} moods x {len(SETTINGS)} (latest, limit) settings, Spotify latency {latency_ms:.0f} ms")
+    for label, fetch in (("query per setting", old_fetch), ("ranked candidate pool", new_fetch)):
+        calls, total, tweak = replay(fetch, latency_ms)
+        print(f"  {label:<22} Spotify calls {calls:>3}   total {total * 1000:8.1f} ms   median UI tweak {tweak * 1e6:9.0f} us")
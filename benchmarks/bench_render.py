@@ -0,0 +1,89 @@
+# ==============================================
+# Card rendering: per-row widgets vs one batched HTML block
+# ==============================================
+# Times full Streamlit reruns (via streamlit.testing AppTest) of a result list
+# rendered the old way (columns + image + markdown/write + button per row) and
+# with beatbuddy.cards.cards_html (one markdown call per page).
+#
+# Run:
+#    python benchmarks/bench_render.py [rows]
+# ==============================================
+
+import os
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def per_row_app():
+    import streamlit as st
+
+    rows = st.session_state["rows"]
+    for idx, row in enumerate(rows):
+        st.markdown("<div class='card' style='display:flex; gap:12px; align-items:center;'>", unsafe_allow_html=True)
+        cols = st.columns([1, 4])
+        with cols[0]:
+            st.image(row["image"], width=120)
+        with cols[1]:
+            st.markdown(f"### {row['title']}")
+            st.write(f"**{row['artist']}** — {row['album']}")
+            st.write(f"📅 {row['release_date']}")
+            st.markdown(f"[▶️ Listen on Spotify]({row['url']})")
+            st.button("Save to dashboard", key=f"save_{idx}")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+
+def batched_app():
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, st.session_state["root"])
+    from beatbuddy.cards import CARDS_PER_PAGE, cards_html, page_count
+
+    rows = st.session_state["rows"]
+    pages = page_count(len(rows))
+    page = int(st.number_input("Page", min_value=1, max_value=pages, value=1, key="page")) if pages > 1 else 1
+    start = (page - 1) * CARDS_PER_PAGE
+    st.markdown(cards_html(rows[start:start + CARDS_PER_PAGE], start=start), unsafe_allow_html=True)
+    st.multiselect("Save tracks:", options=list(range(CARDS_PER_PAGE)), key="pick")
+    st.button("Save selected", key="save")
+
+
+def fake_rows(n):
+    # a 1x1 PNG data URI keeps AppTest from touching the network
+    pixel = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+    return [
+        {
+            "title": f"Song {i}",
+            "artist": f"Artist {i % 7}",
+            "album": f"Album {i % 11}",
+            "release_date": "2024-01-01",
+            "url": f"https://open.spotify.com/track/{i}",
+            "image": pixel,
+        }
+        for i in range(n)
+    ]
+
+
+def rerun_ms(app_fn, rows, reruns=10):
+    at = AppTest.from_function(app_fn, default_timeout=60)
+    at.session_state["rows"] = rows
+    at.session_state["root"] = ROOT
+    at.run()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        at.run()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+if __name__ == "__main__":
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [10, 30, 200]
+    for n in sizes:
+        rows = fake_rows(n)
+        before = rerun_ms(per_row_app, rows)
+        after = rerun_ms(batched_app, rows)
+        print(f"{n:>4} rows: per-row widgets {before:7.1f} ms/rerun   batched HTML {after:6.1f} ms/rerun   x{before / after:.1f}")
@@ -0,0 +1,92 @@
+# ==============================================
+# Session memory: results held per session vs handles to shared, interned results
+# ==============================================
+# Simulates N concurrent sessions, each with a short chat and a deep search
+# drawn from a small set of popular queries whose results overlap (the same
+# songs come back for "party", "dance", ...):
+#   * old: each session keeps its result tuple (and tracks are not interned,
+#     so every query's page holds its own copy of a shared song)
+#   * new: each session keeps a (query, ...) handle in its SessionSlot; pages
+#     hold interned Tracks, one object per song process-wide
+# and reports bytes per session and per shared pool (sessions.deep_size),
+# plus the cost of sweeping idle sessions.
+#
+# Run:
+#    python benchmarks/bench_sessions.py [sessions]
+# ==============================================
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_spotify import synthetic_item  # noqa: E402
+
+from beatbuddy.chat import ChatHistory  # noqa: E402
+from beatbuddy.search import pick_image  # noqa: E402
+from beatbuddy.sessions import SessionRegistry, deep_size  # noqa: E402
+from beatbuddy.track import Track, intern_track  # noqa: E402
+
+QUERIES = [f"popular query {i}" for i in range(20)]
+SONGS = 600  # distinct songs the popular queries draw from
+PER_QUERY = 200
+
+
+def query_results(intern):
+    """``{query: tuple of Tracks}``; queries overlap because they draw from the same songs."""
+    rng = random.Random(3)
+    results = {}
+    for q in QUERIES:
+        tracks = []
+        for song in rng.sample(range(SONGS), PER_QUERY):
+            item = synthetic_item("song", song)
+            track = Track.from_item(item, pick_image(item["album"]["images"]))
+            tracks.append(intern_track(track) if intern else track)
+        results[q] = tuple(tracks)
+    return results
+
+
+def chat():
+    history = ChatHistory()
+    for i in range(6):
+        history.add("user", f"message {i}: feeling good today")
+        history.add("bot", "I think you're feeling *happy*.", mood="happy")
+    return history
+
+
+def report(label, pool, sessions):
+    seen = set()
+    pool_bytes = deep_size(list(pool.values()), seen)
+    per_session = [deep_size(s, set(seen)) for s in sessions]
+    mean = sum(per_session) / len(per_session)
+    print(
+        f"  {label:<34} shared pool {pool_bytes / 1024:8.1f} KB   per session {mean / 1024:7.2f} KB   "
+        f"{len(sessions)} sessions {(pool_bytes + sum(per_session)) / 2**20:7.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(5)
+    print(f"{n} sessions, {len(QUERIES)} popular queries x {PER_QUERY} results drawn from {SONGS} songs")
+
+    pool = query_results(intern=False)
+    # a fresh tuple per session, as deep search built one from its pages
+    old = [{"search_results": tuple(t for t in pool[rng.choice(QUERIES)]), "messages": chat(), "session": f"s{i}"} for i in range(n)]
+    report("results in session state", pool, old)
+
+    pool = query_results(intern=True)
+    registry = SessionRegistry(idle_timeout=60)
+    for i in range(n):
+        slot = registry.touch(f"s{i}")
+        slot.chat = chat()
+        slot.search = (rng.choice(QUERIES), "english", True, PER_QUERY, True)
+    report("handles + interned shared results", pool, list(registry._slots.values()))
+
+    start = time.perf_counter()
+    expired = registry.sweep(time.monotonic() + 120)
+    print(f"  sweep of {expired} idle sessions: {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,70 @@
+# ==============================================
+# Shared cache tier: per-process caches vs one host-wide SQLite tier
+# ==============================================
+# Starts worker processes one after another (scale-out, then a restart),
+# each answering the same quick-mood recommendations against an in-process
+# fake Spotify with network-like latency, and reports per worker the
+# Spotify calls it made and its first-request latency:
+#   * per-process: BEATBUDDY_SHARED_CACHE=0, every worker starts cold
+#   * shared:      workers read / preload the host-wide tier, snapshot on exit
+#
+# Run:
+#    python benchmarks/bench_shared_cache.py [workers] [latency_ms]
+# ==============================================
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH)
+
+MOODS = ("happy", "sad", "romantic", "energetic", "chill", "party")
+LANGUAGES = ("English", "Hindi", "Punjabi")
+
+
+def worker(env, latency_ms, out):
+    # beatbuddy reads its settings at import time, so configure first
+    os.environ.update(env)
+    from bench_recommend import LatencySpotify
+
+    from beatbuddy.recommend import recommend
+
+    sp = LatencySpotify(latency_ms)
+    latencies = []
+    for mood in MOODS:
+        for language in LANGUAGES:
+            start = time.perf_counter()
+            recommend(sp, [mood], [language], True, 10)
+            latencies.append(time.perf_counter() - start)
+    out.put((sp.calls, latencies[0], sum(latencies)))
+
+
+def run(label, shared, workers, latency_ms):
+    data_dir = tempfile.mkdtemp(prefix="beatbuddy-shared-")
+    env = {"BEATBUDDY_DATA_DIR": data_dir, "BEATBUDDY_CATALOG": "0", "BEATBUDDY_SHARED_CACHE": "1" if shared else "0"}
+    ctx = multiprocessing.get_context("spawn")
+    total_calls = 0
+    print(f"  {label}")
+    for i in range(workers):
+        out = ctx.Queue()
+        proc = ctx.Process(target=worker, args=(env, latency_ms, out))
+        proc.start()
+        calls, first, total = out.get()
+        proc.join()
+        total_calls += calls
+        name = "restart" if i == workers - 1 and workers > 1 else f"worker {i + 1}"
+        print(f"    {name:<9} Spotify calls {calls:>3}   first request {first * 1000:7.1f} ms   all {len(MOODS) * len(LANGUAGES)} {total * 1000:8.1f} ms")
+    print(f"    total Spotify calls {total_calls}")
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 80.0
+    print(f"{workers} worker processes (the last one is a restart), Spotify latency {latency_ms:.0f} ms")
+    run("per-process caches", False, workers, latency_ms)
+    run("shared SQLite tier", True, workers, latency_ms)
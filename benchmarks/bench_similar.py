@@ -0,0 +1,133 @@
+# ==============================================
+# "More like this": NumPy similarity index vs a per-track Python scoring loop
+# ==============================================
+# Feeds a SimilarityIndex N synthetic tracks the way searches do (pages of 50,
+# each tagged with the (mood, language) of the query that returned it), then
+# times nearest-neighbour queries:
+#   * loop:   the same score computed track by track in Python
+#   * single: SimilarityIndex.similar(track)
+#   * set:    similar(200 saved tracks) (the dashboard's "more like my saved tracks"),
+#             the same single pass over the rows
+# and reports how often a result shares the seed's query mood / language.
+#
+# Run:
+#    python benchmarks/bench_similar.py [tracks]
+# ==============================================
+
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_typeahead import name  # noqa: E402
+
+from beatbuddy.mood import MOOD_KEYWORDS, MOODS, mood_scores  # noqa: E402
+from beatbuddy.recommend import release_year  # noqa: E402
+from beatbuddy.similar import W_ARTIST, W_LANGUAGE, W_MOOD, W_YEAR, YEAR_SCALE, SimilarityIndex  # noqa: E402
+from beatbuddy.track import Track  # noqa: E402
+
+LANGUAGES = ("english", "hindi", "punjabi")
+PAGE = 50
+QUERIES = 200
+
+
+def synthetic_pages(n, seed=4):
+    """``[(mood, language, tracks)]`` pages; a title holds one of its mood's keywords a third of the time."""
+    rng = random.Random(seed)
+    artists = [name(rng, 2) for _ in range(max(1, n // 8))]
+    pages, made = [], 0
+    while made < n:
+        mood, language = rng.choice(MOODS), rng.choice(LANGUAGES)
+        tracks = []
+        for _ in range(min(PAGE, n - made)):
+            title = name(rng, rng.randint(1, 3))
+            if rng.random() < 0.33:
+                title += " " + rng.choice(MOOD_KEYWORDS[mood])
+            year = rng.randint(1975, 2025)
+            tracks.append(Track(title, rng.choice(artists), name(rng, 2), f"{year}-01-01", None, None, f"t{made}"))
+            made += 1
+        pages.append((mood, language, tracks))
+    return pages
+
+
+def loop_similar(rows, seed, k=10):
+    """The index's score, one track at a time (no NumPy)."""
+    s_vec, s_lang, s_artist, s_year = rows[seed]
+    scored = []
+    for i, (vec, lang, artist, year) in enumerate(rows):
+        if i == seed:
+            continue
+        score = W_MOOD * sum(a * b for a, b in zip(s_vec, vec))
+        score += W_LANGUAGE * (lang == s_lang) + W_ARTIST * (artist == s_artist)
+        if year and s_year:
+            score += W_YEAR * math.exp(-abs(year - s_year) / YEAR_SCALE)
+        scored.append((score, i))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    pages = synthetic_pages(n)
+    context = {t.id: (mood, language) for mood, language, tracks in pages for t in tracks}
+    tracks = [t for _, _, page in pages for t in page]
+
+    index = SimilarityIndex(capacity=n)
+    page_ms = timed(index.add_tracks, [(page, mood, language) for mood, language, page in pages])
+    print(f"{len(index)} tracks fed in {len(pages)} pages of {PAGE}: {sum(page_ms) / 1000:.2f} s total, "
+          f"p50 {statistics.median(page_ms):.2f} ms / page, max {max(page_ms):.1f} ms")
+
+    rng = random.Random(7)
+    seeds = rng.sample(tracks, QUERIES)
+    print(f"\n{'query':<34} {'p50 ms':>8} {'p99 ms':>8}")
+
+    # per-track Python loop on the same features (a sample of seeds; it is slow)
+    rows = []
+    for t in tracks:
+        mood, language = context[t.id]
+        scores = mood_scores(f"{t.title} {t.album} {t.artist}")
+        vec = [max(scores[m], 0) + (2.0 if m == mood else 0.0) for m in MOODS]
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        rows.append(([v / norm for v in vec], language, t.artist, release_year(t.release_date)))
+    position = {t.id: i for i, t in enumerate(tracks)}
+    loop_ms = timed(loop_similar, [(rows, position[s.id]) for s in seeds[:5]])
+    print(f"{'loop (1 seed)':<34} {statistics.median(loop_ms):>8.1f} {max(loop_ms):>8.1f}")
+
+    single_ms = timed(index.similar, [(s, 10) for s in seeds])
+    print(f"{'index.similar (1 seed)':<34} {statistics.median(single_ms):>8.2f} {sorted(single_ms)[int(0.99 * len(single_ms))]:>8.2f}")
+
+    saved_sets = [rng.sample(tracks, 200) for _ in range(10)]
+    set_ms = timed(index.similar, [(s, 10) for s in saved_sets])
+    print(f"{'index.similar (200 saved tracks)':<34} {statistics.median(set_ms):>8.2f} {max(set_ms):>8.2f}")
+
+    same_mood = same_language = total = 0
+    for s in seeds:
+        for t in index.similar(s, 10):
+            total += 1
+            same_mood += context[t.id][0] == context[s.id][0]
+            same_language += context[t.id][1] == context[s.id][1]
+    print(f"\nresults sharing the seed's query mood: {same_mood / total:.0%}, language: {same_language / total:.0%} "
+          f"(random: {1 / len(MOODS):.0%} / {1 / len(LANGUAGES):.0%})")
+
+    t0 = time.perf_counter()
+    index.add_tracks([Track(f"fresh {i}", "Someone New", "New", "2025", None, None, f"fresh{i}") for i in range(PAGE)], "happy", "english")
+    print(f"incremental: {PAGE} new tracks indexed in {(time.perf_counter() - t0) * 1000:.2f} ms (index full: oldest rows reused)")
+
+
+if __name__ == "__main__":
+    main()
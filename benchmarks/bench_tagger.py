@@ -0,0 +1,67 @@
+# ==============================================
+# Bulk tagging: per-row detect_mood_from_text vs the streaming tagger
+# ==============================================
+# Writes a synthetic JSONL corpus, then tags it
+#   * old: read everything, json.loads + detect_mood_from_text + json.dumps per row
+#   * new: beatbuddy.tagger.tag_file, in-process and with 1..N worker processes
+# and reports rows/s, the speed-up per worker count and the parent's peak
+# memory (which should not grow with the input).
+#
+# Run:
+#    python benchmarks/bench_tagger.py [rows] [max_workers]
+# ==============================================
+
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_mood import random_corpus  # noqa: E402
+
+from beatbuddy.mood import detect_mood_from_text  # noqa: E402
+from beatbuddy.tagger import tag_file  # noqa: E402
+
+
+def write_corpus(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(random_corpus(rows)):
+            f.write(json.dumps({"id": i, "text": text}) + "\n")
+
+
+def per_row(src, dst):
+    start = time.perf_counter()
+    with open(src, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    with open(dst, "w", encoding="utf-8") as out:
+        for row in rows:
+            row["mood"] = detect_mood_from_text(row["text"])
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return len(rows) / (time.perf_counter() - start)
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+        write_corpus(src, rows)
+        print(f"{rows:,} rows ({os.path.getsize(src) / 2**20:.1f} MB), {os.cpu_count()} cores")
+
+        base_mem = peak_mb()
+        baseline = tag_file(src, dst, workers=0)["rows_per_s"]
+        print(f"  streaming, in-process      {baseline:>9,} rows/s   parent peak +{peak_mb() - base_mem:6.1f} MB")
+        for workers in range(1, max_workers + 1):
+            rate = tag_file(src, dst, workers=workers)["rows_per_s"]
+            print(f"  streaming, {workers:>2} worker(s)     {rate:>9,} rows/s   x{rate / baseline:4.2f} vs in-process")
+        rate = per_row(src, dst)
+        print(f"  per-row, whole file        {rate:>9,.0f} rows/s   parent peak +{peak_mb() - base_mem:6.1f} MB")
@@ -0,0 +1,141 @@
+# ==============================================
+# Result handling: dicts + pandas DataFrame vs Track records
+# ==============================================
+# Compares, for a typical 10-30 track result list:
+#   * cold import time of pandas vs the beatbuddy modules app.py imports
+#     (each measured in a fresh interpreter),
+#   * per-rerun CPU of the old path (parse to dicts, wrap in a DataFrame, walk
+#     it back with iterrows / to_dict) vs parse_tracks -> Track records,
+#   * memory per record (dict vs __slots__ Track).
+#
+# pandas is no longer an app requirement; install it to run this comparison.
+#
+# Run:
+#    python benchmarks/bench_tracks.py
+# ==============================================
+
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from beatbuddy.search import parse_tracks, pick_image  # noqa: E402
+
+# beatbuddy.client is left out: it pulls in spotipy, which app.py needs either way
+APP_MODULES = "beatbuddy.cards, beatbuddy.mood, beatbuddy.search, beatbuddy.store, beatbuddy.thumbs, beatbuddy.warmup"
+
+
+def fake_response(n):
+    return {
+        "tracks": {
+            "items": [
+                {
+                    "id": f"id{i}",
+                    "name": f"Song {i}",
+                    "artists": [{"name": f"Artist {i % 7}"}],
+                    "album": {
+                        "name": f"Album {i % 11}",
+                        "release_date": "2024-01-01",
+                        "images": [
+                            {"url": f"https://i.scdn.co/{i}/640", "width": 640},
+                            {"url": f"https://i.scdn.co/{i}/300", "width": 300},
+                            {"url": f"https://i.scdn.co/{i}/64", "width": 64},
+                        ],
+                    },
+                    "external_urls": {"spotify": f"https://open.spotify.com/track/id{i}"},
+                }
+                for i in range(n)
+            ]
+        }
+    }
+
+
+def legacy_parse(results):
+    tracks = []
+    for item in (results or {}).get("tracks", {}).get("items", []):
+        album = item.get("album", {})
+        tracks.append({
+            "title": item.get("name"),
+            "artist": (item.get("artists") or [{}])[0].get("name"),
+            "album": album.get("name"),
+            "release_date": album.get("release_date"),
+            "url": item.get("external_urls", {}).get("spotify"),
+            "image": pick_image(album.get("images") or []),
+            "id": item.get("id"),
+        })
+    return tracks
+
+
+def legacy_iterrows(results):
+    import pandas as pd
+
+    df = pd.DataFrame(list(legacy_parse(results)))
+    if df.empty:
+        return []
+    return [f"{row['title']} {row['artist']} {row['album']}" for _, row in df.iterrows()]
+
+
+def legacy_records(results):
+    import pandas as pd
+
+    df = pd.DataFrame(list(legacy_parse(results)))
+    if df.empty:
+        return []
+    return [f"{row['title']} {row['artist']} {row['album']}" for row in df.to_dict("records")]
+
+
+def track_records(results):
+    tracks = parse_tracks(results)
+    if not tracks:
+        return []
+    return [f"{t.title} {t.artist} {t.album}" for t in tracks]
+
+
+def cold_import_ms(stmt, runs=5):
+    code = f"import time; t = time.perf_counter(); {stmt}; print((time.perf_counter() - t) * 1000)"
+    samples = [
+        float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    ]
+    return statistics.median(samples)
+
+
+def per_call_us(fn, arg, number=2000):
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number * 1e6
+
+
+def bytes_per_record(make, n=10_000):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = make(fake_response(n))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del records
+    return size / n
+
+
+if __name__ == "__main__":
+    print("cold import (median of 5 fresh interpreters)")
+    print(f"  import pandas                 {cold_import_ms('import pandas'):7.1f} ms")
+    print(f"  import beatbuddy app modules  {cold_import_ms('import ' + APP_MODULES):7.1f} ms")
+
+    print("\nper-rerun result handling")
+    for n in (10, 30):
+        results = fake_response(n)
+        iterrows = per_call_us(legacy_iterrows, results, 200)
+        records = per_call_us(legacy_records, results, 500)
+        fast = per_call_us(track_records, results)
+        print(
+            f"  {n:>3} rows: DataFrame+iterrows {iterrows:8.1f} us   DataFrame+to_dict {records:7.1f} us   "
+            f"Track records {fast:6.1f} us   x{iterrows / fast:.0f} / x{records / fast:.0f}"
+        )
+
+    print("\nmemory per record")
+    print(f"  dict   {bytes_per_record(legacy_parse):6.0f} B")
+    print(f"  Track  {bytes_per_record(parse_tracks):6.0f} B")
@@ -0,0 +1,134 @@
+# ==============================================
+# Typeahead: per-keystroke lookups on the prefix index vs a linear scan
+# ==============================================
+# Builds a PrefixIndex from N synthetic tracks (artist / title / album names
+# made of random syllables, artists reused Zipf-style like real results),
+# then "types" queries one character at a time and times each lookup:
+#   * scan:  every term checked with startswith (what a naive filter does)
+#   * index: bisect range on the sorted key array (typeahead.PrefixIndex)
+# Also times building and incremental adds, and how many misspelled artist
+# searches PrefixIndex.correct can offer a "did you mean" for (the app asks
+# only when a search comes back empty).
+#
+# Run:
+#    python benchmarks/bench_typeahead.py [tracks]
+# ==============================================
+
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from beatbuddy.track import Track  # noqa: E402
+from beatbuddy.typeahead import PrefixIndex, normalize_term  # noqa: E402
+
+SYLLABLES = "ka ri ja na mo so lu ve ta shi ar em ro da ni be la to ya mi chu pa re zo an".split()
+QUERIES = 300
+MISSPELLED = 300
+
+
+def name(rng, words):
+    return " ".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize() for _ in range(words)
+    )
+
+
+def synthetic_tracks(n, seed=5):
+    rng = random.Random(seed)
+    artists = [name(rng, 2) for _ in range(max(1, n // 5))]
+    albums = [name(rng, rng.randint(1, 3)) for _ in range(max(1, n // 8))]
+    tracks = []
+    for i in range(n):
+        artist = artists[min(int(rng.paretovariate(1.2)) - 1, len(artists) - 1)] if rng.random() < 0.5 else rng.choice(artists)
+        tracks.append(Track(name(rng, rng.randint(1, 4)), artist, rng.choice(albums), "2024-01-01", None, None, f"id{i}"))
+    return tracks, artists
+
+
+def misspell(rng, text):
+    i = rng.randrange(1, len(text))
+    op = rng.choice(("drop", "swap", "double"))
+    if op == "drop":
+        return text[:i] + text[i + 1:]
+    if op == "swap" and i < len(text) - 1:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + text[i] + text[i:]
+
+
+def pct(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tracks, artists = synthetic_tracks(n)
+    rng = random.Random(9)
+
+    index = PrefixIndex(max_terms=10 * n)
+    started = time.perf_counter()
+    index.add_tracks(tracks)
+    build_s = time.perf_counter() - started
+    print(f"{n} tracks -> {len(index)} terms, {len(index._keys)} keys; built in {build_s:.2f} s")
+
+    terms = [(t[0], normalize_term(t[0]), t[1]) for t in index._terms]
+
+    def scan(prefix, limit=8):
+        prefix = normalize_term(prefix)
+        hits = [t for t in terms if t[1].startswith(prefix) or (" " + prefix) in t[1]]
+        return hits[:limit]
+
+    typed = []
+    for _ in range(QUERIES):
+        target = rng.choice(tracks)[rng.choice(("artist", "title"))]
+        typed.extend(target[:k] for k in range(2, min(len(target), 12) + 1))
+
+    print(f"\n{len(typed)} keystrokes (prefixes of {QUERIES} artists / titles)")
+    print(f"{'lookup':<8} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+    for label, fn in (("scan", scan), ("index", index.suggest)):
+        samples = []
+        for prefix in typed[:400] if label == "scan" else typed:
+            t0 = time.perf_counter()
+            fn(prefix)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        print(f"{label:<8} {statistics.median(samples):>8.1f} {pct(samples, 0.99):>8.1f} {max(samples):>8.1f}")
+
+    # cold lookups only (memo cleared before each)
+    samples = []
+    for prefix in typed:
+        index._memo.clear()
+        t0 = time.perf_counter()
+        index.suggest(prefix)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    print(f"{'cold':<8} {statistics.median(samples):>8.1f} {pct(samples, 0.99):>8.1f} {max(samples):>8.1f}")
+
+    fresh, _ = synthetic_tracks(1000, seed=11)
+    t0 = time.perf_counter()
+    index.add_tracks(fresh)
+    add_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    index.suggest("zoka")
+    next_ms = (time.perf_counter() - t0) * 1000
+    print(f"\nadd 1000 fresh tracks: {add_ms:.1f} ms; next lookup: {next_ms:.2f} ms")
+
+    caught = right = 0
+    samples = []
+    for artist in rng.sample(artists, min(MISSPELLED, len(artists))):
+        typo = misspell(rng, artist)
+        t0 = time.perf_counter()
+        fix = index.correct(typo)
+        samples.append((time.perf_counter() - t0) * 1000)
+        caught += fix is not None
+        right += fix == artist
+    print(
+        f"misspelled artists: {caught}/{len(samples)} get a 'did you mean' ({right} exact), "
+        f"correct() p50 {statistics.median(samples):.2f} ms, p99 {pct(samples, 0.99):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
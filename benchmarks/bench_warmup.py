@@ -0,0 +1,55 @@
+# ==============================================
+# Warm-up: every scheduled run must reach Spotify, not just the local catalog
+# ==============================================
+# Runs WarmupJob.run_once a few times against a throwaway catalog and an
+# in-process fake Spotify, and reports the Spotify calls and time per run.
+# The first run fills the result cache and catalog; every later run is a
+# scheduled refresh and has to fetch again, or warmed pools would never
+# change until the catalog entry aged out. Exits 1 if a refresh made fewer
+# Spotify calls than the first run.
+#
+# Run:
+#    python benchmarks/bench_warmup.py [latency_ms] [runs]
+# ==============================================
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["BEATBUDDY_CATALOG"] = "1"
+os.environ["BEATBUDDY_CATALOG_PATH"] = os.path.join(tempfile.mkdtemp(), "catalog.db")
+os.environ.setdefault("BEATBUDDY_SHARED_CACHE", "0")
+
+from bench_recommend import LatencySpotify  # noqa: E402
+
+from beatbuddy.mood import MOODS  # noqa: E402
+from beatbuddy.warmup import WarmupJob  # noqa: E402
+
+LANGUAGES = ("English", "Hindi")
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sp = LatencySpotify(latency_ms)
+    job = WarmupJob(lambda: sp, MOODS, LANGUAGES, latest=True, limit=10)
+    print(f"{len(job.combos)} (mood, language) pools, Spotify latency {latency_ms:.0f} ms")
+
+    ok, first = True, None
+    for run in range(1, runs + 1):
+        before = sp.calls
+        start = time.perf_counter()
+        job.run_once()
+        status = job.status()
+        calls = sp.calls - before
+        print(f"  run {run}: Spotify calls {calls:>3}   {(time.perf_counter() - start) * 1000:8.1f} ms   "
+              f"state {status['state']} ({status['warmed']}/{status['combos']} warmed)")
+        first = calls if first is None else first
+        ok = ok and calls >= first and status["failed"] == 0
+
+    print("every run refetched every pool" if ok else "FAIL: a warm-up refresh was answered from the catalog")
+    sys.exit(0 if ok else 1)
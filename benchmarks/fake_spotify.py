@@ -0,0 +1,253 @@
+# ==============================================
+# Local stand-in for the Spotify Web API (token, /v1/search, /v1/tracks, playlist items)
+# ==============================================
+# Replays recorded /search responses with configurable latency and error
+# rates, so load tests never touch the real API or its rate limits.
+#
+# Serve (prints the port on the first line of stdout):
+#    python benchmarks/fake_spotify.py serve --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+#
+# Record real responses once (needs SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET and spotipy):
+#    python benchmarks/fake_spotify.py record benchmarks/recordings "happy english year:2022-2025" ...
+#
+# Queries without a recording are answered with deterministic synthetic
+# tracks (seeded by the query), so distinct queries still return distinct IDs.
+#
+# Point BeatBuddy at it with:
+#    BEATBUDDY_SPOTIFY_API_URL=http://127.0.0.1:8765/v1
+#    BEATBUDDY_SPOTIFY_TOKEN_URL=http://127.0.0.1:8765/api/token
+# ==============================================
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SYNTHETIC_TOTAL = 1000  # Spotify never pages beyond offset 1000
+
+
+def recording_path(directory, q):
+    return os.path.join(directory, hashlib.sha1(q.encode()).hexdigest()[:16] + ".json")
+
+
+def load_recordings(directory):
+    """``{query: [track items]}`` from every ``*.json`` recording in ``directory``."""
+    recordings = {}
+    if directory and os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    data = json.load(f)
+                recordings[data["q"]] = data["items"]
+    return recordings
+
+
+def synthetic_item(q, index):
+    seed = hashlib.sha1(f"{q}|{index}".encode()).hexdigest()
+    rng = random.Random(seed)
+    year = rng.randint(2015, 2025)
+    return {
+        "id": seed[:22],
+        "name": f"Track {seed[:6]}",
+        "artists": [{"name": f"Artist {rng.randint(1, 400)}"}],
+        "album": {
+            "name": f"Album {seed[6:12]}",
+            "release_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "images": [
+                {"url": f"https://i.scdn.co/image/{seed[:24]}-640", "width": 640, "height": 640},
+                {"url": f"https://i.scdn.co/image/{seed[:24]}-300", "width": 300, "height": 300},
+                {"url": f"https://i.scdn.co/image/{seed[:24]}-64", "width": 64, "height": 64},
+            ],
+        },
+        "external_urls": {"spotify": f"https://open.spotify.com/track/{seed[:22]}"},
+        "popularity": rng.randint(0, 100),
+    }
+
+
+def synthetic_track(track_id):
+    """Synthetic item for a given ID (``/v1/tracks``); IDs starting with ``0`` are unknown."""
+    if track_id.startswith("0"):
+        return None
+    item = synthetic_item(f"track:{track_id}", 0)
+    item["id"] = track_id
+    item["external_urls"] = {"spotify": f"https://open.spotify.com/track/{track_id}"}
+    return item
+
+
+class FakeSpotify:
+    """Response source and fault injection shared by all handler threads."""
+
+    def __init__(self, recordings=None, latency_ms=50.0, jitter_ms=0.0, error_rate=0.0, rate_limit_share=0.5, seed=1):
+        self.recordings = recordings or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(("token", "search", "tracks", "playlist", "recorded", "synthetic", "429", "5xx"), 0)
+
+    def _bump(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def delay(self):
+        with self._lock:
+            ms = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, ms) / 1000)
+
+    def fault(self):
+        """``None``, or the HTTP status to fail this request with."""
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            status = 429 if self._rng.random() < self.rate_limit_share else self._rng.choice((500, 502, 503))
+        self._bump("429" if status == 429 else "5xx")
+        return status
+
+    def search(self, q, limit, offset):
+        self._bump("search")
+        items = self.recordings.get(q)
+        if items is not None:
+            self._bump("recorded")
+            total = len(items)
+            page = items[offset:offset + limit]
+        else:
+            self._bump("synthetic")
+            total = SYNTHETIC_TOTAL
+            page = [synthetic_item(q, i) for i in range(offset, min(offset + limit, total))]
+        return {
+            "tracks": {
+                "href": f"/v1/search?q={q}&offset={offset}&limit={limit}",
+                "items": page,
+                "limit": limit,
+                "offset": offset,
+                "total": total,
+                "next": None if offset + limit >= total else f"/v1/search?q={q}&offset={offset + limit}&limit={limit}",
+                "previous": None if offset == 0 else f"/v1/search?q={q}&offset={max(0, offset - limit)}&limit={limit}",
+            }
+        }
+
+    def tracks(self, ids):
+        self._bump("tracks")
+        return {"tracks": [synthetic_track(i) for i in ids[:50]]}
+
+    def playlist_items(self, playlist_id, limit, offset):
+        self._bump("playlist")
+        total = SYNTHETIC_TOTAL
+        items = [{"track": synthetic_item(f"playlist:{playlist_id}", i)} for i in range(offset, min(offset + limit, total))]
+        return {"items": items, "limit": limit, "offset": offset, "total": total}
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload, headers=()):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers:
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if urlparse(self.path).path != "/api/token":
+                return self._send(404, {"error": "not found"})
+            api._bump("token")
+            self._send(200, {"access_token": "fake-token", "token_type": "Bearer", "expires_in": 3600})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            # spotipy asks for "tracks/?ids=..."; playlist contents are ".../items" (older clients: ".../tracks")
+            path = url.path.rstrip("/")
+            if path == "/_stats":
+                with api._lock:
+                    return self._send(200, dict(api.stats))
+            playlist = path.startswith("/v1/playlists/") and path.endswith(("/items", "/tracks"))
+            if path != "/v1/search" and path != "/v1/tracks" and not playlist:
+                return self._send(404, {"error": {"status": 404, "message": "not found"}})
+            api.delay()
+            status = api.fault()
+            if status == 429:
+                return self._send(429, {"error": {"status": 429, "message": "API rate limit exceeded"}}, [("Retry-After", "1")])
+            if status is not None:
+                return self._send(status, {"error": {"status": status, "message": "upstream error"}})
+            params = parse_qs(url.query)
+            if path == "/v1/tracks":
+                return self._send(200, api.tracks(params.get("ids", [""])[0].split(",")))
+            if playlist:
+                limit = min(100, int(params.get("limit", ["100"])[0]))
+                offset = int(params.get("offset", ["0"])[0])
+                return self._send(200, api.playlist_items(path.split("/")[3], limit, offset))
+            q = params.get("q", [""])[0]
+            limit = min(50, int(params.get("limit", ["10"])[0]))
+            offset = int(params.get("offset", ["0"])[0])
+            self._send(200, api.search(q, limit, offset))
+
+    return Handler
+
+
+def serve(api, host="127.0.0.1", port=0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    return server
+
+
+def record(directory, queries, pages=2):
+    """Save real /search responses (``pages`` x 50 items per query) for replay."""
+    import spotipy
+    from spotipy.oauth2 import SpotifyClientCredentials
+
+    sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials())
+    os.makedirs(directory, exist_ok=True)
+    for q in queries:
+        items = []
+        for page in range(pages):
+            results = sp.search(q=q, type="track", limit=50, offset=page * 50)
+            items.extend(results["tracks"]["items"])
+        with open(recording_path(directory, q), "w", encoding="utf-8") as f:
+            json.dump({"q": q, "items": items}, f)
+        print(f"{len(items):>4} items  {q}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Spotify Web API")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=0)
+    p_serve.add_argument("--recordings", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings"))
+    p_serve.add_argument("--latency-ms", type=float, default=50.0)
+    p_serve.add_argument("--jitter-ms", type=float, default=0.0)
+    p_serve.add_argument("--error-rate", type=float, default=0.0)
+    p_serve.add_argument("--rate-limit-share", type=float, default=0.5, help="share of injected errors that are 429s")
+    p_record = sub.add_parser("record")
+    p_record.add_argument("directory")
+    p_record.add_argument("queries", nargs="+")
+    p_record.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.directory, args.queries, args.pages)
+        sys.exit(0)
+
+    api = FakeSpotify(load_recordings(args.recordings), args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_share)
+    server = serve(api, args.host, args.port)
+    print(server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass